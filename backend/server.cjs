@@ -6,6 +6,20 @@ const Fuse = require("fuse.js");
 const app = express();
 app.use(cors());
 
+// Local copies of thumbnails / avatars written by update/scripts/image-mirror.py.
+// File names are content hashes, so they never change once written.
+const MIRROR_DIR = "./mirror";
+const MIRROR_URL = "/api/mirror";
+app.use(
+  MIRROR_URL,
+  express.static(MIRROR_DIR, {
+    index: false,
+    immutable: true,
+    maxAge: "365d",
+    fallthrough: false,
+  }),
+);
+
 // ============================================================================
 // SEARCH CONFIGURATION - Fuzzy search using Fuse.js
 // ============================================================================
@@ -95,6 +109,95 @@ function getCache(key) {
   return null;
 }
 
+// author_stats / global_stats are summary tables kept current by triggers
+// (update/scripts/author-stats.py). Databases without them fall back to
+// aggregating the videos table on every request.
+function hasStatsTables(callback) {
+  db.get(
+    `SELECT COUNT(*) AS n FROM sqlite_master
+     WHERE type = 'table' AND name IN ('author_stats', 'global_stats')`,
+    [],
+    (err, row) => callback(!err && row.n === 2),
+  );
+}
+
+// Local copies, placeholders and intrinsic sizes of thumbnails / avatars, from
+// the image_mirror table (update/scripts/image-mirror.py). Each image column
+// gets <column>_src: the mirrored copy under MIRROR_URL, or the remote URL
+// when the image is not mirrored (or the table is missing). Mirrored images
+// also get <column>_srcset (the WebP variants, "<url> <width>w, ..."),
+// <column>_width / <column>_height and, once generated, <column>_placeholder
+// (a tiny data: URI).
+const IMAGE_COLUMNS = [
+  "original_thumbnail",
+  "repost_thumbnail",
+  "yt_avatar",
+  "nico_avatar",
+  "twitter_avatar",
+];
+let imageInfoCache = null;
+let imageInfoTimestamp = 0;
+
+function loadImageInfo(callback) {
+  if (imageInfoCache && Date.now() - imageInfoTimestamp < CACHE_TTL) {
+    return callback(imageInfoCache);
+  }
+  db.all(
+    `SELECT url, path, variants, placeholder, width, height FROM image_mirror
+     WHERE sha256 IS NOT NULL`,
+    [],
+    (err, rows) => {
+      const info = new Map();
+      if (!err) {
+        for (const row of rows) {
+          let variants = {};
+          try {
+            variants = JSON.parse(row.variants || "{}");
+          } catch (e) {
+            // Keep the original file only
+          }
+          info.set(row.url, {
+            src: `${MIRROR_URL}/${row.path}`,
+            srcset: Object.entries(variants)
+              .map(([width, path]) => `${MIRROR_URL}/${path} ${width}w`)
+              .join(", "),
+            placeholder: row.placeholder,
+            width: row.width,
+            height: row.height,
+          });
+        }
+      }
+      imageInfoCache = info;
+      imageInfoTimestamp = Date.now();
+      callback(info);
+    },
+  );
+}
+
+// Add the image fields to rows (in place), then call back with them
+function withImageInfo(rows, callback) {
+  loadImageInfo((info) => {
+    for (const row of rows) {
+      for (const column of IMAGE_COLUMNS) {
+        if (!row[column]) continue;
+        const image = info.get(row[column]);
+        if (!image) {
+          row[`${column}_src`] = row[column];
+          continue;
+        }
+        row[`${column}_src`] = image.src;
+        if (image.srcset) row[`${column}_srcset`] = image.srcset;
+        if (image.placeholder) {
+          row[`${column}_placeholder`] = image.placeholder;
+        }
+        row[`${column}_width`] = image.width;
+        row[`${column}_height`] = image.height;
+      }
+    }
+    callback(rows);
+  });
+}
+
 // Periodic cache cleanup to prevent memory leaks
 setInterval(() => {
   const now = Date.now();
@@ -116,6 +219,25 @@ app.get("/api/authors", (req, res) => {
   }
 
   // SQL query to get authors with video count and last update date
+  const statsQuery = `
+    SELECT 
+      a.id, 
+      a.yt_name,
+      a.yt_url,
+      a.yt_avatar,
+      a.nico_name,
+      a.nico_url,
+      a.nico_avatar,
+      a.twitter_name,
+      a.twitter_url,
+      a.twitter_avatar,
+      a.comment,
+      COALESCE(s.works_count, 0) as worksCount,
+      s.last_update as lastUpdate
+    FROM authors a
+    LEFT JOIN author_stats s ON a.id = s.author
+    ORDER BY COALESCE(a.yt_name, a.nico_name, a.twitter_name) ASC
+  `;
   const query = `
     SELECT 
       a.id, 
@@ -137,14 +259,18 @@ app.get("/api/authors", (req, res) => {
     ORDER BY COALESCE(a.yt_name, a.nico_name, a.twitter_name) ASC
   `;
 
-  db.all(query, [], (err, rows) => {
-    if (err) {
-      res.status(500).json({ error: err.message });
-      return;
-    }
-    // Cache the results and send response
-    setCache(cacheKey, rows);
-    res.json(rows);
+  hasStatsTables((useStats) => {
+    db.all(useStats ? statsQuery : query, [], (err, rows) => {
+      if (err) {
+        res.status(500).json({ error: err.message });
+        return;
+      }
+      // Cache the results and send response
+      withImageInfo(rows, () => {
+        setCache(cacheKey, rows);
+        res.json(rows);
+      });
+    });
   });
 });
 
@@ -168,8 +294,10 @@ app.get("/api/author/:id/videos", (req, res) => {
     [authorId],
     (err, rows) => {
       if (err) return res.status(500).json({ error: err.message });
-      setCache(cacheKey, rows);
-      res.json(rows);
+      withImageInfo(rows, () => {
+        setCache(cacheKey, rows);
+        res.json(rows);
+      });
     },
   );
 });
@@ -212,6 +340,17 @@ function refreshSearchCache(callback) {
   `;
 
   // Load authors for search
+  const authorStatsQuery = `
+    SELECT a.id, a.yt_name, a.yt_url, a.yt_avatar, 
+           a.nico_name, a.nico_url, a.nico_avatar,
+           a.twitter_name, a.twitter_url, a.twitter_avatar,
+           a.comment,
+           COALESCE(s.works_count, 0) as worksCount,
+           s.last_update as lastUpdate
+    FROM authors a
+    LEFT JOIN author_stats s ON a.id = s.author
+    ORDER BY a.id
+  `;
   const authorQuery = `
     SELECT a.id, a.yt_name, a.yt_url, a.yt_avatar, 
            a.nico_name, a.nico_url, a.nico_avatar,
@@ -228,28 +367,33 @@ function refreshSearchCache(callback) {
   let completed = 0;
   let error = null;
 
+  // Both queries done: attach image placeholders, then publish the caches
+  function finish() {
+    if (error) return callback(error);
+    withImageInfo(videosCache, () =>
+      withImageInfo(authorsCache, () => {
+        cacheTimestamp = now;
+        callback(null);
+      }),
+    );
+  }
+
   db.all(videoQuery, [], (err, videoRows) => {
     if (err) error = err;
     else videosCache = videoRows;
 
     completed++;
-    if (completed === 2) {
-      if (error) return callback(error);
-      cacheTimestamp = now;
-      callback(null);
-    }
+    if (completed === 2) finish();
   });
 
-  db.all(authorQuery, [], (err, authorRows) => {
-    if (err) error = err;
-    else authorsCache = authorRows;
+  hasStatsTables((useStats) => {
+    db.all(useStats ? authorStatsQuery : authorQuery, [], (err, authorRows) => {
+      if (err) error = err;
+      else authorsCache = authorRows;
 
-    completed++;
-    if (completed === 2) {
-      if (error) return callback(error);
-      cacheTimestamp = now;
-      callback(null);
-    }
+      completed++;
+      if (completed === 2) finish();
+    });
   });
 }
 
@@ -396,6 +540,16 @@ app.get("/api/authors/list", (req, res) => {
   }
 
   // Query to get simplified author list for dropdowns
+  const statsQuery = `
+    SELECT 
+      a.id, 
+      COALESCE(a.yt_name, a.nico_name, a.twitter_name) as name,
+      s.works_count as videoCount
+    FROM authors a
+    JOIN author_stats s ON a.id = s.author
+    WHERE s.works_count > 0
+    ORDER BY name ASC
+  `;
   const query = `
     SELECT 
       a.id, 
@@ -408,13 +562,15 @@ app.get("/api/authors/list", (req, res) => {
     ORDER BY name ASC
   `;
 
-  db.all(query, [], (err, rows) => {
-    if (err) {
-      res.status(500).json({ error: err.message });
-      return;
-    }
-    setCache(cacheKey, rows);
-    res.json(rows);
+  hasStatsTables((useStats) => {
+    db.all(useStats ? statsQuery : query, [], (err, rows) => {
+      if (err) {
+        res.status(500).json({ error: err.message });
+        return;
+      }
+      setCache(cacheKey, rows);
+      res.json(rows);
+    });
   });
 });
 
@@ -428,23 +584,29 @@ app.get("/api/stats", (req, res) => {
   }
 
   // Query to calculate total authors, videos, and translated videos count
-  db.all(
-    `SELECT 
+  const statsQuery = `SELECT 
+      total_authors as totalAuthors,
+      total_videos as totalVideos,
+      translated_videos as translatedVideos
+     FROM global_stats
+     WHERE id = 1`;
+  const query = `SELECT 
       COUNT(DISTINCT a.id) as totalAuthors,
       COUNT(v.id) as totalVideos,
       COUNT(CASE WHEN v.translation_status IN (1, 2) THEN 1 END) as translatedVideos
      FROM authors a
-     LEFT JOIN videos v ON a.id = v.author`,
-    [],
-    (err, rows) => {
+     LEFT JOIN videos v ON a.id = v.author`;
+
+  hasStatsTables((useStats) => {
+    db.all(useStats ? statsQuery : query, [], (err, rows) => {
       if (err) {
         res.status(500).json({ error: err.message });
         return;
       }
       setCache(cacheKey, rows[0]);
       res.json(rows[0]);
-    },
-  );
+    });
+  });
 });
 
 // Health check endpoint for monitoring and debugging
@@ -47,6 +47,11 @@ log_info "Exporting tables to SQLite: $OUTPUT_DB"
 # Ensure output directory exists
 mkdir -p "$(dirname "$OUTPUT_DB")"
 
+# Keep the old database for state that does not live in Dolt (image_mirror, thumbnail_*)
+if [[ -f $OUTPUT_DB ]]; then
+  cp "$OUTPUT_DB" "$DOLT_WORK_DIR/previous.db"
+fi
+
 # Remove existing database to start fresh
 rm -f "$OUTPUT_DB"
 
@@ -145,4 +150,25 @@ conn.close()
 print(f"SQLite database written to: {db_path}")
 EOF
 
+# Summary tables + triggers used by the backend (author counts, dashboard stats)
+STATS_SCRIPT="$PROJECT_ROOT/update/scripts/author-stats.py"
+if [[ -f $STATS_SCRIPT ]]; then
+  log_info "Installing author_stats / global_stats..."
+  python3 "$STATS_SCRIPT" install --db-path "$OUTPUT_DB"
+fi
+
+# Local thumbnail / avatar mirror: carry over what is already downloaded
+MIRROR_SCRIPT="$PROJECT_ROOT/update/scripts/image-mirror.py"
+if [[ -f $MIRROR_SCRIPT && -f "$DOLT_WORK_DIR/previous.db" ]]; then
+  log_info "Copying image_mirror state..."
+  python3 "$MIRROR_SCRIPT" --db-path "$OUTPUT_DB" --copy-state-from "$DOLT_WORK_DIR/previous.db"
+fi
+
+# Thumbnail lookup failures (backoff) and revalidation results
+THUMBNAIL_SCRIPT="$PROJECT_ROOT/update/scripts/thumbnail-updater.py"
+if [[ -f $THUMBNAIL_SCRIPT && -f "$DOLT_WORK_DIR/previous.db" ]]; then
+  log_info "Copying thumbnail_jobs / thumbnail_checks state..."
+  python3 "$THUMBNAIL_SCRIPT" --db-path "$OUTPUT_DB" --copy-state-from "$DOLT_WORK_DIR/previous.db"
+fi
+
 log_success "Done! Database saved to: $OUTPUT_DB"
@@ -26,6 +26,7 @@
           ps.yt-dlp
           ps.openpyxl
           ps.json5
+          ps.pillow
         ]);
         pyWrapper = pkgs.runCommand "py-wrapper" { } ''
           mkdir -p $out/bin
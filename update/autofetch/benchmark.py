@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+upload.py 基准测试：在本地 mockserver 上运行 upload_to_tdocs() 与 order_sheet()，
+统计每个场景的请求数、上下行字节数与耗时。
+
+用法：
+    python benchmark.py                              # 默认 1k / 10k / 100k 行
+    python benchmark.py --sizes 1000,5000 --latency 0.05
+    python benchmark.py --error-rate 0.05 --max-rows 60000
+    python benchmark.py --mirror                     # 额外对比使用本地镜像的情况
+    python benchmark.py --json bench.json            # 同时输出 JSON 结果
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import mockserver
+
+FILE_ID = "BENCHFILE"
+SHEET_ID = "bench1"
+
+
+def make_new_rows(count: int, offset: int) -> list:
+    """生成 upload_to_tdocs() 使用的 CSV 行（字符串列表）。"""
+    rows = []
+    for i in range(count):
+        n = offset + i
+        rows.append(
+            [
+                f"新作者{n % 50:03d}",
+                f"https://www.youtube.com/watch?v=new{n:07d}",
+                f"【东方MMD】新增视频 {n}",
+                f"https://www.bilibili.com/video/BV1new{n:07d}",
+                "1",
+            ]
+        )
+    return rows
+
+
+def run_case(state, name, size, func):
+    state.reset_stats()
+    buf = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        ok = func()
+    elapsed = time.perf_counter() - start
+    stats = dict(state.stats)
+    return {
+        "scenario": name,
+        "rows": size,
+        "ok": bool(ok),
+        "requests": stats["requests"],
+        "errors_injected": stats["errors_injected"],
+        "bytes_in": stats["bytes_in"],
+        "bytes_out": stats["bytes_out"],
+        "by_endpoint": dict(stats["by_endpoint"]),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def bench_size(state, upload, size, new_rows, mirror_dir):
+    results = []
+    cfg = {"file_id": FILE_ID, "sheet_id": SHEET_ID}
+    variants = [("", None)]
+    if mirror_dir:
+        variants.append(("+镜像", Path(mirror_dir) / f"mirror-{size}.db"))
+
+    for suffix, mirror_path in variants:
+        sheet = mockserver.MockSheet(SHEET_ID)
+        sheet.rows = mockserver.generate_rows(size)
+        state.add_sheet(FILE_ID, sheet)
+        mirror = upload.SheetMirror(mirror_path) if mirror_path else None
+
+        results.append(
+            run_case(
+                state,
+                "order_sheet" + suffix,
+                size,
+                lambda: upload.order_sheet(FILE_ID, SHEET_ID, False, mirror),
+            )
+        )
+        batch = make_new_rows(new_rows, size)
+        results.append(
+            run_case(
+                state,
+                f"upload_to_tdocs(+{new_rows})" + suffix,
+                size,
+                lambda: upload.upload_to_tdocs(batch, cfg, mirror=mirror),
+            )
+        )
+        results.append(
+            run_case(
+                state,
+                "upload→order" + suffix,
+                size,
+                lambda: upload.upload_to_tdocs(
+                    make_new_rows(new_rows, size * 2), cfg, mirror=mirror
+                )
+                and upload.order_sheet(FILE_ID, SHEET_ID, False, mirror),
+            )
+        )
+        if mirror:
+            mirror.close()
+    return results
+
+
+def print_table(results):
+    header = f"{'场景':<28}{'行数':>8}{'请求':>7}{'上行(KB)':>11}{'下行(KB)':>11}{'耗时(s)':>9}  结果"
+    print(header)
+    print("-" * (len(header) + 8))
+    for r in results:
+        status = "✓" if r["ok"] else "✗"
+        if r["errors_injected"]:
+            status += f" (注入错误 {r['errors_injected']})"
+        print(
+            f"{r['scenario']:<28}{r['rows']:>8}{r['requests']:>7}"
+            f"{r['bytes_in'] / 1024:>11.1f}{r['bytes_out'] / 1024:>11.1f}"
+            f"{r['seconds']:>9.2f}  {status}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="upload.py 基准测试（本地 mock）")
+    parser.add_argument(
+        "--sizes", default="1000,10000,100000", help="逗号分隔的表格行数"
+    )
+    parser.add_argument("--new-rows", type=int, default=200, help="每次上传的新行数")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="每个请求的延迟（秒）"
+    )
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rows", type=int, default=0)
+    parser.add_argument("--mirror", action="store_true", help="额外测试本地镜像")
+    parser.add_argument("--json", help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    state = mockserver.MockState(
+        args.latency, args.jitter, args.error_rate, args.max_rows
+    )
+    server, base_url = mockserver.start_server(state)
+
+    os.environ["TENCENT_DOCS_API_BASE"] = base_url
+    for key in ("ACCESS_TOKEN", "CLIENT_ID", "OPEN_ID"):
+        os.environ.setdefault(f"TENCENT_DOCS_{key}", "bench")
+    with contextlib.redirect_stdout(io.StringIO()):
+        upload = importlib.import_module("upload")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(f"→ Mock 服务: {base_url}")
+    print(
+        f"→ 行数: {sizes}，每次上传 {args.new_rows} 行，"
+        f"延迟 {args.latency}s，错误率 {args.error_rate}，行数上限 {args.max_rows or '无'}\n"
+    )
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            results.extend(
+                bench_size(
+                    state, upload, size, args.new_rows, tmp if args.mirror else None
+                )
+            )
+    server.shutdown()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n→ 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+腾讯文档在线表格 API 的本地替身，仅实现 upload.py 用到的三个接口：
+    GET  /files/{fileId}                        → 工作表属性（rowCount / rowTotal）
+    GET  /files/{fileId}/{sheetId}/{A1:Z500}     → 区域单元格（gridData）
+    POST /files/{fileId}/batchUpdate            → updateRangeRequest 写入
+另有 GET /_stats（请求数 / 字节数统计）与 POST /_reset（清空统计）。
+
+用法：
+    python mockserver.py                         # 监听 127.0.0.1:8765，空表
+    python mockserver.py --rows 10000            # 预先生成 10000 行数据
+    python mockserver.py --latency 0.05 --error-rate 0.02 --max-rows 50000
+
+配合 upload.py 使用：
+    TENCENT_DOCS_API_BASE=http://127.0.0.1:8765 python upload.py --order-only
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+RANGE_PATTERN = re.compile(r"^([A-Z]+)(\d+):([A-Z]+)(\d+)$")
+
+
+def _column_index(letters: str) -> int:
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - ord("A") + 1)
+    return idx - 1
+
+
+# ==================== 表格数据 ====================
+
+
+class MockSheet:
+    """单个工作表：按行保存 cellValue 列表。"""
+
+    def __init__(self, sheet_id: str, title: str = "Sheet1", min_rows: int = 1000):
+        self.sheet_id = sheet_id
+        self.title = title
+        self.rows = []
+        self.min_rows = min_rows
+
+    @property
+    def row_count(self) -> int:
+        return max(len(self.rows), self.min_rows)
+
+    def read(self, start: int, end: int, col_start: int, col_end: int) -> list:
+        out = []
+        for r in range(start, min(end + 1, self.row_count)):
+            row = self.rows[r] if r < len(self.rows) else []
+            cells = row[col_start : col_end + 1]
+            out.append({"values": [{"cellValue": cv} if cv else {} for cv in cells]})
+        return out
+
+    def write(self, start_row: int, start_col: int, grid_rows: list) -> int:
+        updated = 0
+        for offset, grid_row in enumerate(grid_rows):
+            r = start_row + offset
+            while len(self.rows) <= r:
+                self.rows.append([])
+            row = self.rows[r]
+            for c, cell in enumerate(grid_row.get("values", [])):
+                col = start_col + c
+                while len(row) <= col:
+                    row.append(None)
+                cv = cell.get("cellValue")
+                row[col] = cv if cv and _cell_text(cv) != "" else None
+                updated += 1
+            while row and row[-1] is None:
+                row.pop()
+        return updated
+
+
+def _cell_text(cv) -> str:
+    if "text" in cv:
+        return cv["text"]
+    if "link" in cv:
+        return cv["link"].get("text") or cv["link"].get("url", "")
+    if "number" in cv:
+        return str(cv["number"])
+    return ""
+
+
+def generate_rows(count: int, seed: int = 0, authors: int = 0) -> list:
+    """
+    生成与「待添加视频」格式一致的乱序数据：
+    原作者 / 原视频链接 / 转载标题 / 转载链接 / 翻译状态，约 5% 为重复行。
+    """
+    rnd = random.Random(seed)
+    authors = authors or max(1, count // 8)
+    rows = []
+    for i in range(count):
+        if rows and rnd.random() < 0.05:
+            rows.append(list(rows[rnd.randrange(len(rows))]))
+            continue
+        author = f"作者{rnd.randrange(authors):05d}"
+        yt = f"https://www.youtube.com/watch?v=mock{i:07d}"
+        bv = f"https://www.bilibili.com/video/BV1mock{i:07d}"
+        rows.append(
+            [
+                {"text": author},
+                {"link": {"url": yt, "text": yt}},
+                {"text": f"【东方MMD】测试视频 {i}"},
+                {"link": {"url": bv, "text": bv}},
+                {"number": float(rnd.randint(1, 5))},
+            ]
+        )
+    return rows
+
+
+# ==================== HTTP 服务 ====================
+
+
+class MockState:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, max_rows=0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_rows = max_rows
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.files = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            "requests": 0,
+            "errors_injected": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "by_endpoint": {},
+        }
+
+    def add_sheet(self, file_id: str, sheet: MockSheet):
+        self.files.setdefault(file_id, {})[sheet.sheet_id] = sheet
+
+    def count(self, endpoint: str, bytes_in: int, bytes_out: int):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+            self.stats["by_endpoint"][endpoint] = (
+                self.stats["by_endpoint"].get(endpoint, 0) + 1
+            )
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    state: MockState
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict, endpoint: str, bytes_in: int = 0):
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        # 先计数再响应，避免客户端返回后统计尚未更新
+        if not endpoint.startswith("_"):
+            self.state.count(endpoint, bytes_in, len(raw))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _simulate_network(self, endpoint: str, bytes_in: int) -> bool:
+        """注入延迟与随机错误，返回 False 表示已发送错误响应。"""
+        state = self.state
+        delay = state.latency
+        if state.jitter:
+            delay += state.random.uniform(0, state.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if state.error_rate and state.random.random() < state.error_rate:
+            with state.lock:
+                state.stats["errors_injected"] += 1
+            self._send(
+                503,
+                {"code": 503, "message": "injected error"},
+                endpoint,
+                bytes_in,
+            )
+            return False
+        return True
+
+    def _sheet(self, file_id: str, sheet_id: str):
+        return self.state.files.get(file_id, {}).get(sheet_id)
+
+    def do_GET(self):
+        parts = [unquote(p) for p in urlparse(self.path).path.split("/") if p]
+        if parts == ["_stats"]:
+            with self.state.lock:
+                return self._send(200, self.state.stats, "_stats")
+        if len(parts) < 2 or parts[0] != "files":
+            return self._send(404, {"code": 404, "message": "not found"}, "unknown")
+
+        file_id = parts[1]
+        if len(parts) == 2:
+            if not self._simulate_network("files", 0):
+                return
+            sheets = self.state.files.get(file_id)
+            if sheets is None:
+                return self._send(404, {"code": 404, "message": "no file"}, "files")
+            props = [
+                {
+                    "sheetId": s.sheet_id,
+                    "title": s.title,
+                    "rowCount": s.row_count,
+                    "rowTotal": self.state.max_rows or 1000000,
+                }
+                for s in sheets.values()
+            ]
+            return self._send(200, {"properties": props}, "files")
+
+        if len(parts) == 4:
+            if not self._simulate_network("range", 0):
+                return
+            sheet = self._sheet(file_id, parts[2])
+            m = RANGE_PATTERN.match(parts[3])
+            if sheet is None or not m:
+                return self._send(404, {"code": 404, "message": "bad range"}, "range")
+            col_start, col_end = _column_index(m[1]), _column_index(m[3])
+            start, end = int(m[2]) - 1, int(m[4]) - 1
+            with self.state.lock:
+                rows = sheet.read(start, end, col_start, col_end)
+            body = {"gridData": {"startRow": start, "startColumn": 0, "rows": rows}}
+            return self._send(200, body, "range")
+
+        self._send(404, {"code": 404, "message": "not found"}, "unknown")
+
+    def do_POST(self):
+        parts = [unquote(p) for p in urlparse(self.path).path.split("/") if p]
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if parts == ["_reset"]:
+            with self.state.lock:
+                self.state.reset_stats()
+            return self._send(200, {"ok": True}, "_reset")
+        if len(parts) != 3 or parts[0] != "files" or parts[2] != "batchUpdate":
+            return self._send(404, {"code": 404, "message": "not found"}, "unknown")
+        if not self._simulate_network("batchUpdate", len(raw)):
+            return
+
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            return self._send(
+                400, {"code": 400, "message": "bad json"}, "batchUpdate", len(raw)
+            )
+
+        responses = []
+        with self.state.lock:
+            for req in payload.get("requests", []):
+                upd = req.get("updateRangeRequest")
+                sheet = self._sheet(parts[1], str((upd or {}).get("sheetId")))
+                if not upd or sheet is None:
+                    responses.append(
+                        {"error": {"code": 400, "message": "unknown request/sheet"}}
+                    )
+                    continue
+                grid = upd.get("gridData", {})
+                start_row = int(grid.get("startRow", 0))
+                rows = grid.get("rows", [])
+                if self.state.max_rows and start_row + len(rows) > self.state.max_rows:
+                    responses.append(
+                        {
+                            "error": {
+                                "code": 400,
+                                "message": f"row limit {self.state.max_rows} exceeded",
+                            }
+                        }
+                    )
+                    continue
+                updated = sheet.write(start_row, int(grid.get("startColumn", 0)), rows)
+                responses.append({"updateRangeResponse": {"updatedCells": updated}})
+        self._send(200, {"responses": responses}, "batchUpdate", len(raw))
+
+
+def start_server(state: MockState, host="127.0.0.1", port=0):
+    """在后台线程启动服务，返回 (server, base_url)。port=0 时自动分配端口。"""
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="腾讯文档在线表格 API 本地替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file-id", default="DVW5KdEZmSmxZSXVq")
+    parser.add_argument("--sheet-id", default="6zzy76")
+    parser.add_argument("--rows", type=int, default=0, help="预先生成的数据行数")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="每个请求的延迟（秒）"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="额外随机延迟上限（秒）"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="随机返回 503 的概率"
+    )
+    parser.add_argument("--max-rows", type=int, default=0, help="行数上限，0 为不限")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    state = MockState(
+        args.latency, args.jitter, args.error_rate, args.max_rows, args.seed
+    )
+    sheet = MockSheet(args.sheet_id)
+    sheet.rows = generate_rows(args.rows, args.seed)
+    state.add_sheet(args.file_id, sheet)
+
+    server, base_url = start_server(state, args.host, args.port)
+    print(f"→ Mock 腾讯文档 API: {base_url}")
+    print(f"  fileId={args.file_id} sheetId={args.sheet_id} 行数={sheet.row_count}")
+    print(f"  TENCENT_DOCS_API_BASE={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+作者备注在线表格 ↔ 数据库 authors.comment 双向同步
+用法：
+    python sync.py                  # 拉取表格 → 比对 → 更新数据库备注 + 向表格追加新作者
+    python sync.py --dry-run        # 仅显示差异，不修改数据库和表格
+    python sync.py --allow-clear    # 表格中被清空的备注也同步清空数据库
+    python sync.py --no-push        # 只更新数据库，不向表格追加新作者
+    python sync.py --file-id <ID> --sheet-id <ID>  # 手动指定表格
+
+表格格式（与 export-author-comments.py 导出的一致）：
+    作者 | 链接（https://.../author/<id>）| 备注
+作者以链接列中的 id 识别；表格是备注的编辑入口，数据库是作者列表的来源。
+"""
+
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any
+
+import json5
+import requests
+
+import upload
+from upload import (
+    TDOCS_API_BASE,
+    SheetReadError,
+    _cell_value_to_text,
+    _fetch_all_api_rows,
+    _is_empty_api_row,
+    get_sheet_info,
+)
+
+HEADER = ["作者", "链接", "备注"]
+AUTHOR_ID_PATTERN = re.compile(r"/author/(\d+)")
+
+
+# ==================== 1. 配置与参数 ====================
+def load_sync_config() -> dict:
+    config_file = Path("config/sync.jsonc")
+    if not config_file.exists():
+        config_file = upload.SCRIPT_DIR / "config" / "sync.jsonc"
+    if not config_file.exists():
+        print(f"[提示] 配置文件 {config_file} 不存在，使用默认值")
+        return {}
+    with open(config_file, "r", encoding="utf-8") as f:
+        cfg: Any = json5.loads(f.read())
+    if not isinstance(cfg, dict):
+        raise TypeError(f"配置文件顶层应为对象/字典，实际为 {type(cfg).__name__}")
+    return cfg
+
+
+def parse_args():
+    opts = {
+        "dry_run": False,
+        "allow_clear": False,
+        "no_push": False,
+        "file_id": None,
+        "sheet_id": None,
+    }
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        if arg == "--dry-run":
+            opts["dry_run"] = True
+        elif arg == "--allow-clear":
+            opts["allow_clear"] = True
+        elif arg == "--no-push":
+            opts["no_push"] = True
+        elif arg == "--file-id" and i + 1 < len(sys.argv):
+            opts["file_id"] = sys.argv[i + 1]
+            i += 1
+        elif arg == "--sheet-id" and i + 1 < len(sys.argv):
+            opts["sheet_id"] = sys.argv[i + 1]
+            i += 1
+        i += 1
+    return opts
+
+
+def _headers(json_body: bool = False) -> dict:
+    headers = {
+        "Access-Token": upload.ACCESS_TOKEN,
+        "Client-Id": upload.CLIENT_ID,
+        "Open-Id": upload.OPEN_ID,
+    }
+    if json_body:
+        headers["Content-Type"] = "application/json"
+    return headers
+
+
+def resolve_sheet_id(file_id: str) -> str:
+    """未配置 sheet_id 时取第一个工作表。"""
+    try:
+        resp = requests.get(
+            f"{TDOCS_API_BASE}/files/{file_id}", headers=_headers(), timeout=15
+        )
+        props = resp.json().get("properties", []) if resp.status_code == 200 else []
+    except Exception as e:
+        print(f"  [警告] GET files 异常: {e}")
+        return ""
+    return str(props[0].get("sheetId", "")) if props else ""
+
+
+# ==================== 2. 读取表格与数据库 ====================
+def _author_id_from_cell(cv):
+    if not cv:
+        return None
+    candidates = [_cell_value_to_text(cv)]
+    if "link" in cv:
+        candidates.append(cv["link"].get("url", ""))
+    for text in candidates:
+        m = AUTHOR_ID_PATTERN.search(text or "")
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def read_sheet(file_id: str, sheet_id: str):
+    """
+    返回 (按作者 id 的备注, 最后有内容行, 无法识别的行号列表)。
+    同一作者出现多次时以最后一行为准。
+    最后有内容行决定追加位置，因此表格必须完整读取，否则抛出 SheetReadError。
+    """
+    row_count, _ = get_sheet_info(file_id, sheet_id)
+    if row_count == 0:
+        raise SheetReadError("无法获取工作表行数（或工作表为空）")
+    rows = _fetch_all_api_rows(file_id, sheet_id, row_count, strict=True)
+    comments = {}
+    unknown = []
+    last_content = -1
+    for idx, row in enumerate(rows):
+        if _is_empty_api_row(row):
+            continue
+        last_content = idx
+        author_id = _author_id_from_cell(row[1] if len(row) > 1 else None)
+        if author_id is None:
+            if idx > 0 or _cell_value_to_text(row[0]).strip() != HEADER[0]:
+                unknown.append(idx + 1)
+            continue
+        cv = row[2] if len(row) > 2 else None
+        comments[author_id] = _cell_value_to_text(cv).strip()
+    return comments, last_content, unknown
+
+
+def read_authors(conn: sqlite3.Connection) -> dict:
+    cur = conn.execute(
+        """
+        SELECT id,
+               COALESCE(NULLIF(yt_name, ''), NULLIF(nico_name, ''), NULLIF(twitter_name, '')),
+               comment
+        FROM authors
+        ORDER BY id
+        """
+    )
+    return {row[0]: (row[1] or "", (row[2] or "").strip()) for row in cur}
+
+
+# ==================== 3. 比对 ====================
+def diff_comments(sheet_comments: dict, authors: dict, allow_clear: bool):
+    """返回 (需要更新的 [(id, 新备注)], 表格中缺少的作者 id, 数据库中不存在的作者 id)。"""
+    updates = []
+    for author_id, sheet_comment in sheet_comments.items():
+        if author_id not in authors:
+            continue
+        db_comment = authors[author_id][1]
+        if sheet_comment == db_comment:
+            continue
+        if not sheet_comment and not allow_clear:
+            continue
+        updates.append((author_id, sheet_comment))
+    missing = [a for a in authors if a not in sheet_comments]
+    orphaned = sorted(a for a in sheet_comments if a not in authors)
+    return updates, missing, orphaned
+
+
+# ==================== 4. 写入 ====================
+def apply_db_updates(conn: sqlite3.Connection, updates) -> int:
+    """在一个事务中写入全部变更的备注。"""
+    with conn:
+        conn.executemany(
+            "UPDATE authors SET comment = ? WHERE id = ?",
+            [(comment or None, author_id) for author_id, comment in updates],
+        )
+    return len(updates)
+
+
+def append_authors(file_id: str, sheet_id: str, start_row: int, rows) -> bool:
+    """从 start_row 开始追加 [作者, 链接, 备注] 行。"""
+    grid_rows = []
+    for row in rows:
+        vals = []
+        for cell in row:
+            if cell.startswith(("http://", "https://")):
+                vals.append({"cellValue": {"link": {"url": cell, "text": cell}}})
+            else:
+                vals.append({"cellValue": {"text": cell}})
+        grid_rows.append({"values": vals})
+    payload = {
+        "requests": [
+            {
+                "updateRangeRequest": {
+                    "sheetId": sheet_id,
+                    "gridData": {
+                        "startRow": start_row,
+                        "startColumn": 0,
+                        "rows": grid_rows,
+                    },
+                }
+            }
+        ]
+    }
+    try:
+        resp = requests.post(
+            f"{TDOCS_API_BASE}/files/{file_id}/batchUpdate",
+            json=payload,
+            headers=_headers(json_body=True),
+            timeout=30,
+        )
+        if resp.status_code != 200:
+            print(f"  响应: HTTP {resp.status_code} {resp.text[:300]}")
+            return False
+        for r in resp.json().get("responses", []):
+            if "error" in r:
+                err = r["error"]
+                print(f"  子请求错误: code={err.get('code')}, msg={err.get('message')}")
+                return False
+        return True
+    except Exception as e:
+        print(f"  请求异常: {e}")
+        return False
+
+
+# ==================== 5. 主流程 ====================
+def main():
+    opts = parse_args()
+    cfg = load_sync_config()
+    file_id = opts["file_id"] or cfg.get("file_id")
+    sheet_id = opts["sheet_id"] or cfg.get("sheet_id")
+    if not file_id:
+        print("[错误] 缺少 file_id")
+        sys.exit(1)
+    if not all([upload.ACCESS_TOKEN, upload.CLIENT_ID, upload.OPEN_ID]):
+        print("[错误] 缺少认证信息")
+        sys.exit(1)
+    if not sheet_id:
+        sheet_id = resolve_sheet_id(file_id)
+        if not sheet_id:
+            print("[错误] 无法确定 sheet_id")
+            sys.exit(1)
+
+    db_path = Path(cfg["db_path"]) if cfg.get("db_path") else upload.default_db_path()
+    if not db_path.exists():
+        print(f"[错误] 未找到数据库 {db_path}")
+        sys.exit(1)
+    url_base = cfg.get(
+        "author_url_base", "https://random-2hu-stuff.randomneet.me/author/"
+    )
+
+    print(f"→ 读取作者备注表格 fileId={file_id} sheetId={sheet_id}")
+    try:
+        sheet_comments, last_content, unknown = read_sheet(file_id, sheet_id)
+    except SheetReadError as e:
+        print(f"[错误] 表格未能完整读取，已中止同步（未修改数据库和表格）: {e}")
+        sys.exit(1)
+    print(f"  表格中共 {len(sheet_comments)} 位作者")
+    if unknown:
+        print(f"  [警告] {len(unknown)} 行无法从链接列识别作者 id: {unknown[:10]}")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        authors = read_authors(conn)
+        print(f"→ 数据库中共 {len(authors)} 位作者")
+        updates, missing, orphaned = diff_comments(
+            sheet_comments, authors, opts["allow_clear"]
+        )
+
+        print(f"\n→ 需要更新的备注: {len(updates)} 条")
+        for author_id, comment in updates:
+            name, old = authors[author_id]
+            print(f"  [{author_id}] {name}: 「{old}」 → 「{comment}」")
+        if orphaned:
+            print(f"→ 表格中存在但数据库中没有的作者 id: {orphaned}")
+        print(f"→ 表格中缺少的作者: {len(missing)} 位")
+
+        if opts["dry_run"]:
+            print("\n[试运行结束，未修改数据库和表格]")
+            return
+
+        if updates:
+            apply_db_updates(conn, updates)
+            print(f"✓ 已在一个事务中更新 {len(updates)} 条备注")
+
+        if missing and not opts["no_push"]:
+            rows = [[authors[a][0], f"{url_base}{a}", authors[a][1]] for a in missing]
+            start_row = last_content + 1
+            if last_content < 0:
+                rows.insert(0, HEADER)
+            print(f"→ 正在从第 {start_row + 1} 行起追加 {len(missing)} 位新作者 ...")
+            if append_authors(file_id, sheet_id, start_row, rows):
+                print(f"✓ 已追加 {len(missing)} 位新作者")
+            else:
+                print("❌ 追加新作者失败")
+                sys.exit(1)
+    finally:
+        conn.close()
+
+    print("\n✅ 同步完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,25 +8,37 @@
     python upload.py --order-only     # 仅整理在线表格（不处理本地文件）
     python upload.py --dry-run        # 试运行（所有写操作均为预览）
     python upload.py --order-only --file-id <ID> --sheet-id <ID>  # 手动指定表格
+    python upload.py --refresh-mirror # 忽略本地镜像的缓存，重新下载整张表格
+    python upload.py --no-mirror      # 不使用本地镜像（config/sheet-mirror.db）
+    python upload.py --db-dedup drop  # 与数据库比对：annotate(标注) / drop(移除已收录) / off
 """
 
 import copy
 import csv
+import hashlib
+import importlib.util
 import json
 import os
 import re
+import sqlite3
 import sys
+import time
 from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, List
+from typing import Any, List, Optional
 
 import json5
 import requests
 
-
 # ==================== 1. 加载 .env ====================
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
 def load_dotenv(dotenv_path: Path = Path("config/.env")):
+    # 从其它目录运行（或被 csv-import.py 等脚本加载）时回退到脚本所在目录
+    if not dotenv_path.exists() and not dotenv_path.is_absolute():
+        dotenv_path = SCRIPT_DIR / dotenv_path
     if not dotenv_path.exists():
         print(f"[提示] 未找到 {dotenv_path}，将使用已存在的环境变量")
         return
@@ -49,11 +61,17 @@ load_dotenv()
 ACCESS_TOKEN = os.getenv("TENCENT_DOCS_ACCESS_TOKEN")
 CLIENT_ID = os.getenv("TENCENT_DOCS_CLIENT_ID")
 OPEN_ID = os.getenv("TENCENT_DOCS_OPEN_ID")
+# 可指向本地 mockserver.py 以便测试 / 基准测试
+TDOCS_API_BASE = os.getenv(
+    "TENCENT_DOCS_API_BASE", "https://docs.qq.com/openapi/spreadsheet/v3"
+).rstrip("/")
 
 
 # ==================== 2. 配置加载 ====================
 def load_upload_config() -> dict:
     config_file = Path("config/upload.jsonc")
+    if not config_file.exists():
+        config_file = SCRIPT_DIR / "config" / "upload.jsonc"
     if not config_file.exists():
         print(f"[提示] 配置文件 {config_file} 不存在，将尝试 fallback")
         return {}
@@ -95,6 +113,9 @@ def parse_args():
     dry_run = False
     file_id = None
     sheet_id = None
+    no_mirror = False
+    refresh_mirror = False
+    db_dedup = None
     i = 1
     while i < len(sys.argv):
         arg = sys.argv[i]
@@ -106,6 +127,13 @@ def parse_args():
             order_only = True
         elif arg == "--dry-run":
             dry_run = True
+        elif arg == "--no-mirror":
+            no_mirror = True
+        elif arg == "--refresh-mirror":
+            refresh_mirror = True
+        elif arg == "--db-dedup" and i + 1 < len(sys.argv):
+            db_dedup = sys.argv[i + 1]
+            i += 1
         elif arg == "--file-id" and i + 1 < len(sys.argv):
             file_id = sys.argv[i + 1]
             i += 1
@@ -113,7 +141,17 @@ def parse_args():
             sheet_id = sys.argv[i + 1]
             i += 1
         i += 1
-    return check_only, upload_only, order_only, dry_run, file_id, sheet_id
+    return (
+        check_only,
+        upload_only,
+        order_only,
+        dry_run,
+        file_id,
+        sheet_id,
+        no_mirror,
+        refresh_mirror,
+        db_dedup,
+    )
 
 
 # ==================== 4. 时间范围处理 ====================
@@ -243,6 +281,116 @@ def process_rows(rows: List[List[str]]) -> List[List[str]]:
     return combined
 
 
+# 数据库中已收录的视频：原视频 / 转载链接统一转换为规范 key 后比较。
+# 规范化规则直接复用 csv-import.py 的 canonical_video_url()（即 videos.original_key
+# 所用的规则），两个脚本对“同一个视频”的判断始终一致。
+CSV_IMPORT_PATH = SCRIPT_DIR.parent / "scripts" / "csv-import.py"
+_csv_import = None
+
+
+def load_csv_import():
+    global _csv_import
+    if _csv_import is None:
+        spec = importlib.util.spec_from_file_location("csv_import", CSV_IMPORT_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _csv_import = module
+    return _csv_import
+
+
+DB_DUP_NOTES = {
+    "imported": "已收录",
+    "original": "原视频已收录",
+    "repost": "转载视频已收录",
+}
+
+
+def canonical_video_key(url: str) -> str:
+    """单元格中第一个链接的规范形式（csv-import.py 的 canonical_video_url()）。"""
+    parts = (url or "").split()
+    if not parts:
+        return ""
+    return load_csv_import().canonical_video_url(parts[0])
+
+
+def default_db_path() -> Path:
+    project_root = Path(
+        os.environ.get("PROJECT_ROOT", str(Path(__file__).resolve().parents[2]))
+    )
+    return project_root / "backend" / "random-2hu-stuff.db"
+
+
+def load_db_video_keys(db_path: Path) -> Optional[dict]:
+    """一次性读取 videos 表，返回原视频 / 转载 / (原视频, 转载) 三个 key 集合。"""
+    if not db_path.exists():
+        print(f"[提示] 未找到数据库 {db_path}，跳过数据库去重")
+        return None
+    try:
+        load_csv_import()
+    except Exception as e:
+        print(f"[警告] 无法加载 {CSV_IMPORT_PATH}，跳过数据库去重: {e}")
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            cur = conn.execute("SELECT original_url, repost_url FROM videos")
+            originals, reposts, pairs = set(), set(), set()
+            for original_url, repost_url in cur:
+                o_key = canonical_video_key(original_url)
+                r_key = canonical_video_key(repost_url)
+                if o_key:
+                    originals.add(o_key)
+                if r_key:
+                    reposts.add(r_key)
+                pairs.add((o_key, r_key))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"[警告] 读取数据库失败，跳过数据库去重: {e}")
+        return None
+    print(f"→ 已从数据库载入 {len(originals)} 个原视频、{len(reposts)} 个转载链接")
+    return {"original": originals, "repost": reposts, "pair": pairs}
+
+
+def dedup_against_db(rows: List[List[str]], db_keys: dict, mode: str = "annotate"):
+    """
+    与数据库比对：
+      已收录       —— 原视频与转载链接的组合已存在，drop 模式下直接移除；
+      原视频已收录 —— 原视频已存在但转载链接不同（可能是替换生肉 / 合集），仅标注；
+      转载视频已收录 —— 转载链接已存在但原视频不同，仅标注。
+    返回 (保留的行, 各原因计数)。
+    """
+    COLLISION_COL = 6
+    counts = defaultdict(int)
+    kept = []
+    for r in rows:
+        o_key = canonical_video_key(r[1] if len(r) > 1 else "")
+        r_key = canonical_video_key(r[3] if len(r) > 3 else "")
+        if not o_key and not r_key:
+            kept.append(r)
+            continue
+        if (o_key, r_key) in db_keys["pair"]:
+            reason = "imported"
+        elif o_key and o_key in db_keys["original"]:
+            reason = "original"
+        elif r_key and r_key in db_keys["repost"]:
+            reason = "repost"
+        else:
+            kept.append(r)
+            continue
+
+        counts[reason] += 1
+        if reason == "imported" and mode == "drop":
+            continue
+        while len(r) <= COLLISION_COL:
+            r.append("")
+        note = DB_DUP_NOTES[reason]
+        existing = r[COLLISION_COL]
+        r[COLLISION_COL] = existing + "；" + note if existing else note
+        kept.append(r)
+    return kept, dict(counts)
+
+
 # ==================== 7. 在线表格工具函数（共用） ====================
 def _cell_value_to_text(cv) -> str:
     if not cv:
@@ -253,6 +401,9 @@ def _cell_value_to_text(cv) -> str:
         return cv["link"].get("text") or cv["link"].get("url", "")
     if "location" in cv:
         return cv["location"].get("name", "")
+    if "number" in cv:
+        num = cv["number"]
+        return str(int(num)) if float(num).is_integer() else str(num)
     return ""
 
 
@@ -269,7 +420,7 @@ def get_sheet_info(file_id: str, sheet_id: str):
         "Client-Id": CLIENT_ID,
         "Open-Id": OPEN_ID,
     }
-    url = f"https://docs.qq.com/openapi/spreadsheet/v3/files/{file_id}"
+    url = f"{TDOCS_API_BASE}/files/{file_id}"
     try:
         resp = requests.get(url, headers=headers, timeout=15)
         if resp.status_code != 200:
@@ -291,43 +442,109 @@ def get_sheet_info(file_id: str, sheet_id: str):
         return 0, 0
 
 
-def _fetch_all_api_rows(file_id: str, sheet_id: str, total_rows: int) -> list:
+class SheetReadError(Exception):
+    """在线表格未能完整读取（strict 模式下某个区块拉取失败）"""
+
+
+def _fetch_api_range(file_id: str, sheet_id: str, start: int, end: int, headers):
+    """拉取第 start ~ end 行（0-based，含 end），失败返回 None。"""
+    range_str = f"A{start+1}:Z{end+1}"
+    try:
+        resp = requests.get(
+            f"{TDOCS_API_BASE}/files/{file_id}/{sheet_id}/{range_str}",
+            headers=headers,
+            timeout=20,
+        )
+        if resp.status_code != 200:
+            return None
+        data = resp.json()
+    except Exception:
+        return None
+    rows = []
+    for row_obj in data.get("gridData", {}).get("rows", []):
+        values = row_obj.get("values", [])
+        rows.append([cell.get("cellValue", None) for cell in values])
+    return rows
+
+
+def iter_api_ranges(
+    file_id: str,
+    sheet_id: str,
+    total_rows: int,
+    mirror: Optional["SheetMirror"] = None,
+    strict: bool = False,
+):
+    """
+    按 MIRROR_RANGE_SIZE 行一个区块拉取数据，逐个产出 (起始行, 行列表)。
+    提供 mirror 时每个区块都会写回镜像（供试运行预览使用）；区块总是重新拉取，
+    因为协作者在空白行中输入内容不会改变 rowCount，镜像无法判断是否过期。
+    拉取失败的区块回退到镜像中的旧值。
+    strict 时拉取失败直接抛出 SheetReadError（不跳过、不回退到镜像），
+    供要根据读取结果决定写入位置的调用方使用。
+    """
     headers = {
         "Access-Token": ACCESS_TOKEN,
         "Client-Id": CLIENT_ID,
         "Open-Id": OPEN_ID,
     }
-    all_rows = []
-    batch_size = 500
+    batch_size = MIRROR_RANGE_SIZE
+    fetched = changed = 0
     for start in range(0, total_rows, batch_size):
         end = min(start + batch_size, total_rows) - 1
         if start > end:
             break
-        range_str = f"A{start+1}:Z{end+1}"
-        try:
-            resp = requests.get(
-                f"https://docs.qq.com/openapi/spreadsheet/v3/files/{file_id}/{sheet_id}/{range_str}",
-                headers=headers,
-                timeout=20,
-            )
-            if resp.status_code != 200:
-                continue
-            data = resp.json()
-            rows_data = data.get("gridData", {}).get("rows", [])
-            for row_obj in rows_data:
-                values = row_obj.get("values", [])
-                row = [cell.get("cellValue", None) for cell in values]
-                all_rows.append(row)
-        except Exception:
+        cached = mirror.get_range(file_id, sheet_id, start) if mirror else None
+        rows = _fetch_api_range(file_id, sheet_id, start, end, headers)
+        if rows is None:
+            if strict:
+                raise SheetReadError(f"第 {start + 1} ~ {end + 1} 行拉取失败")
+            if cached:
+                print(f"  [镜像] 第 {start + 1} 行起的区块拉取失败，使用镜像中的旧值")
+                yield start, cached["rows"]
+            else:
+                print(f"  [警告] 第 {start + 1} ~ {end + 1} 行拉取失败，已跳过")
             continue
+        fetched += 1
+        if mirror:
+            if cached and _hash_api_rows(rows) != cached["content_hash"]:
+                changed += 1
+            mirror.put_range(file_id, sheet_id, start, rows)
+        yield start, rows
+    if mirror:
+        mirror.set_row_count(file_id, sheet_id, total_rows)
+        print(f"  [镜像] 拉取 {fetched} 个区块（其中 {changed} 个与镜像记录不同）")
+
+
+def _fetch_all_api_rows(
+    file_id: str,
+    sheet_id: str,
+    total_rows: int,
+    mirror: Optional["SheetMirror"] = None,
+    strict: bool = False,
+) -> list:
+    all_rows = []
+    for start, rows in iter_api_ranges(file_id, sheet_id, total_rows, mirror, strict):
+        # 区块末尾的空行可能不返回：补齐，保证下标始终等于表格行号
+        all_rows.extend([] for _ in range(start - len(all_rows)))
+        all_rows.extend(rows)
     return all_rows
 
 
-def find_last_content_row(file_id: str, sheet_id: str, row_count: int) -> int:
+def find_last_content_row(
+    file_id: str,
+    sheet_id: str,
+    row_count: int,
+    mirror: Optional["SheetMirror"] = None,
+) -> int:
+    """最后有内容行决定写入位置，因此整张表必须读取成功，否则抛出 SheetReadError。"""
     if row_count == 0:
         return -1
     print("→ 正在扫描表格，定位最后有内容行（跳过空白行）...")
-    rows = _fetch_all_api_rows(file_id, sheet_id, row_count)
+    rows = _fetch_all_api_rows(file_id, sheet_id, row_count, mirror, strict=True)
+    return _last_content_index(rows)
+
+
+def _last_content_index(rows) -> int:
     for i in range(len(rows) - 1, -1, -1):
         if not _is_empty_api_row(rows[i]):
             print(f"  最后有内容行: 第 {i + 1} 行（0-based: {i}）")
@@ -336,8 +553,186 @@ def find_last_content_row(file_id: str, sheet_id: str, row_count: int) -> int:
     return -1
 
 
-# ==================== 8. 上传功能 ====================
-def upload_to_tdocs(processed_rows: List[List[str]], config: dict, dry_run=False):
+# ==================== 8. 在线表格本地镜像 ====================
+MIRROR_RANGE_SIZE = 500
+
+
+def _hash_api_rows(rows) -> str:
+    raw = json.dumps(rows, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _grid_rows_to_api_rows(grid_rows) -> list:
+    """把 batchUpdate 的 gridData.rows 还原成与拉取结果相同的 cellValue 列表。"""
+    return [[v.get("cellValue") for v in g.get("values", [])] for g in grid_rows]
+
+
+class SheetMirror:
+    """
+    在线表格的本地镜像（SQLite）。
+    以 MIRROR_RANGE_SIZE 行为一个区块，保存单元格值、内容哈希与同步时间；
+    本脚本写入后也会更新镜像。试运行 / 预览直接读取镜像，正式写入前总是重新拉取。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sheets (
+                file_id   TEXT NOT NULL,
+                sheet_id  TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (file_id, sheet_id)
+            );
+            CREATE TABLE IF NOT EXISTS ranges (
+                file_id      TEXT NOT NULL,
+                sheet_id     TEXT NOT NULL,
+                start_row    INTEGER NOT NULL,
+                rows_json    TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at   REAL NOT NULL,
+                PRIMARY KEY (file_id, sheet_id, start_row)
+            );
+            """
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def forget(self, file_id: str, sheet_id: str):
+        with self.conn:
+            for table in ("sheets", "ranges"):
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE file_id = ? AND sheet_id = ?",
+                    (file_id, str(sheet_id)),
+                )
+
+    def get_row_count(self, file_id: str, sheet_id: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT row_count FROM sheets WHERE file_id = ? AND sheet_id = ?",
+            (file_id, str(sheet_id)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def synced_at(self, file_id: str, sheet_id: str) -> Optional[float]:
+        row = self.conn.execute(
+            "SELECT synced_at FROM sheets WHERE file_id = ? AND sheet_id = ?",
+            (file_id, str(sheet_id)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_row_count(self, file_id: str, sheet_id: str, row_count: int):
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO sheets (file_id, sheet_id, row_count, synced_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (file_id, sheet_id)
+                DO UPDATE SET row_count = excluded.row_count, synced_at = excluded.synced_at
+                """,
+                (file_id, str(sheet_id), row_count, time.time()),
+            )
+            # 行数缩小后，超出部分的区块已无意义
+            self.conn.execute(
+                "DELETE FROM ranges WHERE file_id = ? AND sheet_id = ? AND start_row >= ?",
+                (file_id, str(sheet_id), row_count),
+            )
+
+    def get_range(self, file_id: str, sheet_id: str, start_row: int):
+        row = self.conn.execute(
+            """
+            SELECT rows_json, content_hash, fetched_at FROM ranges
+            WHERE file_id = ? AND sheet_id = ? AND start_row = ?
+            """,
+            (file_id, str(sheet_id), start_row),
+        ).fetchone()
+        if not row:
+            return None
+        return {
+            "rows": json.loads(row[0]),
+            "content_hash": row[1],
+            "fetched_at": row[2],
+        }
+
+    def put_range(self, file_id: str, sheet_id: str, start_row: int, rows):
+        content_hash = _hash_api_rows(rows)
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO ranges
+                    (file_id, sheet_id, start_row, rows_json, content_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (file_id, sheet_id, start_row) DO UPDATE SET
+                    rows_json = excluded.rows_json,
+                    content_hash = excluded.content_hash,
+                    fetched_at = excluded.fetched_at
+                """,
+                (
+                    file_id,
+                    str(sheet_id),
+                    start_row,
+                    json.dumps(rows, ensure_ascii=False),
+                    content_hash,
+                    time.time(),
+                ),
+            )
+
+    def load_rows(self, file_id: str, sheet_id: str) -> list:
+        row_count = self.get_row_count(file_id, sheet_id) or 0
+        rows = []
+        for (rows_json,) in self.conn.execute(
+            """
+            SELECT rows_json FROM ranges
+            WHERE file_id = ? AND sheet_id = ? AND start_row < ?
+            ORDER BY start_row
+            """,
+            (file_id, str(sheet_id), row_count),
+        ):
+            rows.extend(json.loads(rows_json))
+        return rows
+
+    def record_write(self, file_id: str, sheet_id: str, start_row: int, rows):
+        """把本次写入的行合并进镜像（供之后的试运行预览）。"""
+        if not rows:
+            return
+        end_row = start_row + len(rows)
+        first = start_row - start_row % MIRROR_RANGE_SIZE
+        for block in range(first, end_row, MIRROR_RANGE_SIZE):
+            cached = self.get_range(file_id, sheet_id, block)
+            block_rows = cached["rows"] if cached else []
+            lo = max(start_row, block)
+            hi = min(end_row, block + MIRROR_RANGE_SIZE)
+            while len(block_rows) < hi - block:
+                block_rows.append([])
+            block_rows[lo - block : hi - block] = rows[lo - start_row : hi - start_row]
+            self.put_range(file_id, sheet_id, block, block_rows)
+        old_count = self.get_row_count(file_id, sheet_id) or 0
+        self.set_row_count(file_id, sheet_id, max(old_count, end_row))
+
+
+def open_mirror(config: dict) -> Optional[SheetMirror]:
+    path = config.get("mirror_path", "config/sheet-mirror.db")
+    if not path:
+        return None
+    # 相对路径以脚本目录为准，从其它目录运行时也共用同一个镜像
+    path = SCRIPT_DIR / path
+    try:
+        return SheetMirror(path)
+    except sqlite3.Error as e:
+        print(f"[警告] 无法打开本地镜像 {path}: {e}，将不使用镜像")
+        return None
+
+
+# ==================== 9. 上传功能 ====================
+def upload_to_tdocs(
+    processed_rows: List[List[str]],
+    config: dict,
+    dry_run=False,
+    mirror: Optional[SheetMirror] = None,
+):
     file_id = config.get("file_id")
     sheet_id = config.get("sheet_id")
     if not file_id or not sheet_id:
@@ -345,24 +740,33 @@ def upload_to_tdocs(processed_rows: List[List[str]], config: dict, dry_run=False
         return False
 
     if dry_run:
-        start_row = 0
-        print(f"\n[DRY RUN] 起始行: 第 1 行（0-based: 0）")
+        if mirror and mirror.get_row_count(file_id, sheet_id) is not None:
+            print("\n[DRY RUN] 使用本地镜像定位起始行")
+            last_content = _last_content_index(mirror.load_rows(file_id, sheet_id))
+            start_row = last_content + 2 if last_content >= 0 else 0
+        else:
+            start_row = 0
+        print(f"\n[DRY RUN] 起始行: 第 {start_row + 1} 行（0-based: {start_row}）")
     else:
         row_count, _ = get_sheet_info(file_id, sheet_id)
-        if row_count > 0:
-            last_content = find_last_content_row(file_id, sheet_id, row_count)
-            if last_content >= 0:
-                start_row = last_content + 2
-                print(f"→ 最后有内容行: 第 {last_content + 1} 行")
-                print(
-                    f"→ 将从第 {start_row + 1} 行开始追加（第 {last_content + 2} 行为空行）"
-                )
-            else:
-                start_row = 0
-                print("→ 表格全空，将从第 1 行开始写入")
+        if row_count == 0:
+            # 新建的工作表也有默认行数，0 说明获取工作表信息失败
+            print("[错误] 无法获取工作表行数，已取消上传")
+            return False
+        try:
+            last_content = find_last_content_row(file_id, sheet_id, row_count, mirror)
+        except SheetReadError as e:
+            print(f"[错误] 表格未能完整读取，无法确定起始行，已取消上传: {e}")
+            return False
+        if last_content >= 0:
+            start_row = last_content + 2
+            print(f"→ 最后有内容行: 第 {last_content + 1} 行")
+            print(
+                f"→ 将从第 {start_row + 1} 行开始追加（第 {last_content + 2} 行为空行）"
+            )
         else:
             start_row = 0
-            print("→ 表格为空，将从第 1 行开始写入")
+            print("→ 表格全空，将从第 1 行开始写入")
 
     if not dry_run:
         if not all([ACCESS_TOKEN, CLIENT_ID, OPEN_ID]):
@@ -419,7 +823,7 @@ def upload_to_tdocs(processed_rows: List[List[str]], config: dict, dry_run=False
         )
         return True
 
-    url = f"https://docs.qq.com/openapi/spreadsheet/v3/files/{file_id}/batchUpdate"
+    url = f"{TDOCS_API_BASE}/files/{file_id}/batchUpdate"
     print("→ 正在上传...")
     try:
         resp = requests.post(url, json=payload, headers=headers, timeout=30)
@@ -444,6 +848,10 @@ def upload_to_tdocs(processed_rows: List[List[str]], config: dict, dry_run=False
                     .get("updatedCells", 0)
                 )
                 new_total = start_row + len(grid_rows)
+                if mirror:
+                    mirror.record_write(
+                        file_id, sheet_id, start_row, _grid_rows_to_api_rows(grid_rows)
+                    )
                 print(
                     f"✓ 成功上传 {len(grid_rows)} 行，更新了 {updated} 个单元格（新总行数: {new_total}）"
                 )
@@ -462,7 +870,7 @@ def upload_to_tdocs(processed_rows: List[List[str]], config: dict, dry_run=False
         return False
 
 
-# ==================== 9. 整理功能（原 order.py） ====================
+# ==================== 10. 整理功能（原 order.py） ====================
 # 以下函数全部基于原 order.py 逻辑，但复用公用工具函数
 def clean_cell_urls(cv):
     """清理单元格内重复 URL，返回新 cellValue（不修改原对象）。"""
@@ -628,25 +1036,45 @@ def build_order_batch_requests(sheet_id, sorted_rows, num_columns, total_rows):
     return reqs
 
 
-def order_sheet(file_id, sheet_id, dry_run=False):
+def order_sheet(file_id, sheet_id, dry_run=False, mirror: Optional[SheetMirror] = None):
     """
     整理在线表格：下载 → 清理 URL → 去重 → 分组 → 空行分隔 → 清空+写入
+    试运行且本地镜像可用时，完全基于镜像预览，不访问网络。
+    正式运行会清空并重写整张表，因此必须完整读取全部区块，任何区块失败都取消整理。
     """
-    if not all([ACCESS_TOKEN, CLIENT_ID, OPEN_ID]):
-        print("[错误] 缺少认证信息，无法整理")
-        return False
+    mirror_count = mirror.get_row_count(file_id, sheet_id) if mirror else None
+    if dry_run and mirror_count is not None:
+        # 1+2. 试运行：直接读取本地镜像
+        synced = datetime.fromtimestamp(mirror.synced_at(file_id, sheet_id))
+        print(f"→ 使用本地镜像（同步于 {synced:%Y-%m-%d %H:%M:%S}）")
+        row_count = mirror_count
+        rows = mirror.load_rows(file_id, sheet_id)
+        print(f"  镜像中共 {len(rows)} 行")
+        if row_count == 0:
+            print("没有数据，无需整理")
+            return True
+    else:
+        if not all([ACCESS_TOKEN, CLIENT_ID, OPEN_ID]):
+            print("[错误] 缺少认证信息，无法整理")
+            return False
 
-    # 1. 获取行数
-    row_count, row_total = get_sheet_info(file_id, sheet_id)
-    print(f"工作表当前行数: {row_count} (总上限: {row_total})")
-    if row_count == 0:
-        print("没有数据，无需整理")
-        return True
+        # 1. 获取行数
+        row_count, row_total = get_sheet_info(file_id, sheet_id)
+        print(f"工作表当前行数: {row_count} (总上限: {row_total})")
+        if row_count == 0:
+            print("没有数据，无需整理")
+            return True
 
-    # 2. 下载全部数据
-    print("→ 正在下载全部数据 ...")
-    rows = _fetch_all_api_rows(file_id, sheet_id, row_count)
-    print(f"  成功获取 {len(rows)} 行")
+        # 2. 下载全部数据（下载结果写回镜像）
+        print("→ 正在下载全部数据 ...")
+        try:
+            rows = _fetch_all_api_rows(
+                file_id, sheet_id, row_count, mirror, strict=not dry_run
+            )
+        except SheetReadError as e:
+            print(f"[错误] 表格未能完整读取，已取消整理: {e}")
+            return False
+        print(f"  成功获取 {len(rows)} 行")
 
     # 3. 清理单元格内重复URL
     print("→ 正在清理单元格内重复URL ...")
@@ -695,7 +1123,7 @@ def order_sheet(file_id, sheet_id, dry_run=False):
         "Open-Id": OPEN_ID,
         "Content-Type": "application/json",
     }
-    url = f"https://docs.qq.com/openapi/spreadsheet/v3/files/{file_id}/batchUpdate"
+    url = f"{TDOCS_API_BASE}/files/{file_id}/batchUpdate"
     try:
         resp = requests.post(url, json=payload, headers=headers, timeout=120)
         if resp.status_code == 200:
@@ -710,6 +1138,16 @@ def order_sheet(file_id, sheet_id, dry_run=False):
                     for r in body["responses"]
                 )
                 print(f"✓ 整理完成，更新了 {updated} 个单元格")
+                if mirror:
+                    written = _grid_rows_to_api_rows(
+                        batch_reqs[1]["updateRangeRequest"]["gridData"]["rows"]
+                    )
+                    cleared = _grid_rows_to_api_rows(
+                        batch_reqs[0]["updateRangeRequest"]["gridData"]["rows"]
+                    )
+                    mirror.record_write(
+                        file_id, sheet_id, 0, written + cleared[len(written) :]
+                    )
                 return True
             elif "code" in body and body.get("code") != 0:
                 print(f"  错误: {body.get('code')} - {body.get('message')}")
@@ -725,7 +1163,7 @@ def order_sheet(file_id, sheet_id, dry_run=False):
         return False
 
 
-# ==================== 10. 主流程 ====================
+# ==================== 11. 主流程 ====================
 def main():
     (
         check_only,
@@ -734,23 +1172,30 @@ def main():
         dry_run,
         file_id_override,
         sheet_id_override,
+        no_mirror,
+        refresh_mirror,
+        db_dedup,
     ) = parse_args()
 
+    upload_cfg = load_upload_config()
+    mirror = None if no_mirror else open_mirror(upload_cfg)
+
     # 如果指定了 file_id/sheet_id 且运行 order_only，则用指定的覆盖配置
     if order_only:
         if file_id_override and sheet_id_override:
             file_id = file_id_override
             sheet_id = sheet_id_override
         else:
-            cfg = load_upload_config()
-            file_id = cfg.get("file_id")
-            sheet_id = cfg.get("sheet_id")
+            file_id = upload_cfg.get("file_id")
+            sheet_id = upload_cfg.get("sheet_id")
         if not file_id or not sheet_id:
             print("[错误] 缺少 file_id 或 sheet_id")
             sys.exit(1)
+        if mirror and refresh_mirror:
+            mirror.forget(file_id, sheet_id)
 
         print("→ 模式：仅整理在线表格")
-        success = order_sheet(file_id, sheet_id, dry_run)
+        success = order_sheet(file_id, sheet_id, dry_run, mirror)
         if success and not dry_run:
             print("\n✅ 整理完成")
         elif dry_run:
@@ -761,9 +1206,11 @@ def main():
         return
 
     # 以下是原 upload 模式的流程（含 check-only / upload-only）
+    if mirror and refresh_mirror and upload_cfg.get("file_id"):
+        mirror.forget(upload_cfg["file_id"], upload_cfg.get("sheet_id", ""))
+
     if upload_only:
         print("→ 模式：仅上传已有的 combined CSV")
-        upload_cfg = load_upload_config()
         csv_dir = upload_cfg.get("csv_dir", "output")
         today_str = datetime.now().strftime("%Y%m%d")
         combined_path = Path(csv_dir) / f"combined-{today_str}.csv"
@@ -773,7 +1220,7 @@ def main():
         rows = read_csv(combined_path)
         rows = trim_empty_first_column(rows)
         print(f"→ 读取到 {len(rows)} 行（含空行）")
-        ok = upload_to_tdocs(rows, upload_cfg, dry_run=dry_run)
+        ok = upload_to_tdocs(rows, upload_cfg, dry_run=dry_run, mirror=mirror)
         if ok and not dry_run:
             print("\n[上传成功]")
             # 上传后自动整理
@@ -781,7 +1228,7 @@ def main():
             fid = upload_cfg.get("file_id")
             sid = upload_cfg.get("sheet_id")
             if fid and sid:
-                order_sheet(fid, sid, dry_run=False)
+                order_sheet(fid, sid, False, mirror)
             else:
                 print("[警告] 缺少 file_id/sheet_id，无法自动整理")
         elif dry_run:
@@ -792,7 +1239,6 @@ def main():
         return
 
     print("→ 模式：本地整理" + (" (仅本地)" if check_only else " + 上传"))
-    upload_cfg = load_upload_config()
     time_range_str = get_time_range(upload_cfg)
     csv_dir_name = upload_cfg.get("csv_dir", "output")
     csv_dir_path = Path(csv_dir_name)
@@ -843,6 +1289,26 @@ def main():
     unique_rows = deduplicate(all_rows)
     print(f"→ 去除了 {len(all_rows) - len(unique_rows)} 个完全相同的行")
 
+    dedup_mode = db_dedup or upload_cfg.get("db_dedup", "annotate")
+    if dedup_mode not in ("annotate", "drop", "off"):
+        print(f"[警告] 无法识别的 db_dedup '{dedup_mode}'，回退到 annotate")
+        dedup_mode = "annotate"
+    if dedup_mode != "off":
+        db_path = upload_cfg.get("db_path")
+        db_keys = load_db_video_keys(Path(db_path) if db_path else default_db_path())
+        if db_keys:
+            before = len(unique_rows)
+            unique_rows, reasons = dedup_against_db(unique_rows, db_keys, dedup_mode)
+            if reasons:
+                summary = "，".join(
+                    f"{DB_DUP_NOTES[k]} {v}" for k, v in sorted(reasons.items())
+                )
+                print(f"→ 数据库比对（{dedup_mode}）: {summary}")
+                if before != len(unique_rows):
+                    print(f"  已移除 {before - len(unique_rows)} 行已收录的视频")
+            else:
+                print("→ 数据库比对：没有已收录的视频")
+
     processed = process_rows(unique_rows)
     print(f"→ 整理后得到 {len(processed)} 行（含分隔空行）")
 
@@ -861,7 +1327,7 @@ def main():
         return
 
     print("\n→ 开始上传...")
-    ok = upload_to_tdocs(processed, upload_cfg, dry_run=dry_run)
+    ok = upload_to_tdocs(processed, upload_cfg, dry_run=dry_run, mirror=mirror)
     if ok and not dry_run:
         print("\n[上传成功]")
         # 上传后自动整理
@@ -869,7 +1335,7 @@ def main():
         fid = upload_cfg.get("file_id")
         sid = upload_cfg.get("sheet_id")
         if fid and sid:
-            order_sheet(fid, sid, dry_run=False)
+            order_sheet(fid, sid, False, mirror)
         else:
             print("[警告] 缺少 file_id/sheet_id，无法自动整理")
     elif dry_run:
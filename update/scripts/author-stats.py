@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Materialized author / site statistics
+
+Maintains two summary tables so the backend does not have to GROUP BY the
+whole videos table for every author list or dashboard request:
+    author_stats  - per author: works_count, translated_count, last_update
+    global_stats  - single row: total_authors, total_videos, translated_videos
+Their definitions match the backend queries (COUNT(v.id), MAX(v.date),
+translation_status IN (1, 2), videos counted only when their author exists).
+
+SQLite triggers on authors and videos keep both tables current, so every
+writer - csv-import.py, the thumbnail / author updaters, one-off fix scripts -
+updates them without any code of its own. get-db.sh rebuilds the database from
+Dolt without these tables; run `install` afterwards (get-db.sh does).
+
+Usage:
+python3 author-stats.py install            # create tables + triggers, fill them
+python3 author-stats.py rebuild            # recompute from scratch
+python3 author-stats.py verify             # diff against a full recomputation
+python3 author-stats.py verify --db-path other.db
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+TRANSLATED = "COALESCE(translation_status IN (1, 2), 0)"
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS author_stats (
+        author INTEGER PRIMARY KEY REFERENCES authors(id),
+        works_count INTEGER NOT NULL DEFAULT 0,
+        translated_count INTEGER NOT NULL DEFAULT 0,
+        last_update TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS global_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_authors INTEGER NOT NULL DEFAULT 0,
+        total_videos INTEGER NOT NULL DEFAULT 0,
+        translated_videos INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    # MAX(date) after a delete / move is recomputed per author through this index
+    "CREATE INDEX IF NOT EXISTS idx_videos_author ON videos(author)",
+]
+
+
+def _add_video(row):
+    """Statements counting video `row` (NEW / OLD) in, if its author exists"""
+    translated = TRANSLATED.replace("translation_status", f"{row}.translation_status")
+    return f"""
+        UPDATE author_stats SET
+            works_count = works_count + 1,
+            translated_count = translated_count + {translated},
+            last_update = CASE
+                WHEN last_update IS NULL OR {row}.date > last_update THEN COALESCE({row}.date, last_update)
+                ELSE last_update
+            END
+        WHERE author = {row}.author;
+        UPDATE global_stats SET
+            total_videos = total_videos + 1,
+            translated_videos = translated_videos + {translated}
+        WHERE id = 1 AND EXISTS (SELECT 1 FROM authors WHERE id = {row}.author);
+    """
+
+
+def _remove_video(row):
+    translated = TRANSLATED.replace("translation_status", f"{row}.translation_status")
+    return f"""
+        UPDATE author_stats SET
+            works_count = works_count - 1,
+            translated_count = translated_count - {translated},
+            last_update = (SELECT MAX(date) FROM videos WHERE author = {row}.author)
+        WHERE author = {row}.author;
+        UPDATE global_stats SET
+            total_videos = total_videos - 1,
+            translated_videos = translated_videos - {translated}
+        WHERE id = 1 AND EXISTS (SELECT 1 FROM authors WHERE id = {row}.author);
+    """
+
+
+TRIGGERS = {
+    "author_stats_video_insert": f"""
+        CREATE TRIGGER author_stats_video_insert AFTER INSERT ON videos
+        BEGIN {_add_video("NEW")} END
+    """,
+    "author_stats_video_delete": f"""
+        CREATE TRIGGER author_stats_video_delete AFTER DELETE ON videos
+        BEGIN {_remove_video("OLD")} END
+    """,
+    # Thumbnail / URL updates do not touch these columns and skip the trigger
+    "author_stats_video_update": f"""
+        CREATE TRIGGER author_stats_video_update
+        AFTER UPDATE OF author, date, translation_status ON videos
+        BEGIN {_remove_video("OLD")} {_add_video("NEW")} END
+    """,
+    "author_stats_author_insert": """
+        CREATE TRIGGER author_stats_author_insert AFTER INSERT ON authors
+        BEGIN
+            INSERT OR IGNORE INTO author_stats (author) VALUES (NEW.id);
+            UPDATE author_stats SET
+                works_count = (SELECT COUNT(*) FROM videos WHERE author = NEW.id),
+                translated_count = (
+                    SELECT COUNT(*) FROM videos
+                    WHERE author = NEW.id AND translation_status IN (1, 2)
+                ),
+                last_update = (SELECT MAX(date) FROM videos WHERE author = NEW.id)
+            WHERE author = NEW.id;
+            UPDATE global_stats SET
+                total_authors = total_authors + 1,
+                total_videos = total_videos
+                    + (SELECT works_count FROM author_stats WHERE author = NEW.id),
+                translated_videos = translated_videos
+                    + (SELECT translated_count FROM author_stats WHERE author = NEW.id)
+            WHERE id = 1;
+        END
+    """,
+    "author_stats_author_delete": """
+        CREATE TRIGGER author_stats_author_delete AFTER DELETE ON authors
+        BEGIN
+            UPDATE global_stats SET
+                total_authors = total_authors - 1,
+                total_videos = total_videos
+                    - COALESCE((SELECT works_count FROM author_stats WHERE author = OLD.id), 0),
+                translated_videos = translated_videos
+                    - COALESCE((SELECT translated_count FROM author_stats WHERE author = OLD.id), 0)
+            WHERE id = 1;
+            DELETE FROM author_stats WHERE author = OLD.id;
+        END
+    """,
+}
+
+# Full recomputation, the same aggregates the backend used to run per request
+EXPECTED_AUTHOR_STATS = """
+    SELECT a.id,
+           COUNT(v.id),
+           COUNT(CASE WHEN v.translation_status IN (1, 2) THEN 1 END),
+           MAX(v.date)
+    FROM authors a
+    LEFT JOIN videos v ON a.id = v.author
+    GROUP BY a.id
+"""
+EXPECTED_GLOBAL_STATS = """
+    SELECT COUNT(DISTINCT a.id),
+           COUNT(v.id),
+           COUNT(CASE WHEN v.translation_status IN (1, 2) THEN 1 END)
+    FROM authors a
+    LEFT JOIN videos v ON a.id = v.author
+"""
+
+
+def is_installed(conn):
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'author_stats'"
+        ).fetchone()
+        is not None
+    )
+
+
+def rebuild(conn):
+    """Recompute both tables from authors / videos in one transaction"""
+    with conn:
+        conn.execute("DELETE FROM author_stats")
+        conn.execute(
+            "INSERT INTO author_stats (author, works_count, translated_count, last_update) "
+            + EXPECTED_AUTHOR_STATS
+        )
+        conn.execute("DELETE FROM global_stats")
+        conn.execute(
+            "INSERT INTO global_stats (id, total_authors, total_videos, translated_videos) "
+            "SELECT 1, * FROM (" + EXPECTED_GLOBAL_STATS + ")"
+        )
+
+
+def install(conn):
+    """Create the tables and triggers (replacing older trigger versions), then rebuild"""
+    with conn:
+        for ddl in SCHEMA:
+            conn.execute(ddl)
+        for name, ddl in TRIGGERS.items():
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(ddl)
+    rebuild(conn)
+
+
+def verify(conn):
+    """Return a list of human-readable differences from a full recomputation"""
+    problems = []
+    expected = {row[0]: row[1:] for row in conn.execute(EXPECTED_AUTHOR_STATS)}
+    stored = {
+        row[0]: row[1:]
+        for row in conn.execute(
+            "SELECT author, works_count, translated_count, last_update FROM author_stats"
+        )
+    }
+    for author_id in sorted(expected.keys() | stored.keys()):
+        want = expected.get(author_id)
+        have = stored.get(author_id)
+        if want != have:
+            problems.append(f"author {author_id}: stored {have}, expected {want}")
+
+    want = conn.execute(EXPECTED_GLOBAL_STATS).fetchone()
+    have = conn.execute(
+        "SELECT total_authors, total_videos, translated_videos FROM global_stats WHERE id = 1"
+    ).fetchone()
+    if tuple(want) != (tuple(have) if have else None):
+        problems.append(f"global: stored {have}, expected {tuple(want)}")
+    return problems
+
+
+def main():
+    _default_db = str(
+        Path(os.environ.get("PROJECT_ROOT", str(Path(__file__).parent.parent.parent)))
+        / "backend"
+        / "random-2hu-stuff.db"
+    )
+    parser = argparse.ArgumentParser(
+        description="Maintain the author_stats / global_stats summary tables"
+    )
+    parser.add_argument("command", choices=["install", "rebuild", "verify"])
+    parser.add_argument("--db-path", default=_default_db, help="Database path")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"Error: Database file does not exist: {args.db_path}")
+        return 1
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        if args.command == "install":
+            install(conn)
+            print(
+                f"✅ Installed author_stats / global_stats and {len(TRIGGERS)} triggers"
+            )
+        elif not is_installed(conn):
+            print("Error: author_stats is not installed, run: author-stats.py install")
+            return 1
+        elif args.command == "rebuild":
+            rebuild(conn)
+            print("✅ Rebuilt author_stats / global_stats")
+
+        if args.command in ("install", "verify"):
+            problems = verify(conn)
+            for problem in problems[:50]:
+                print(f"❌ {problem}")
+            if len(problems) > 50:
+                print(f"   ... and {len(problems) - 50} more")
+            if problems:
+                print(f"{len(problems)} differences, run: author-stats.py rebuild")
+                return 1
+            total = conn.execute(
+                "SELECT total_authors, total_videos, translated_videos FROM global_stats"
+            ).fetchone()
+            print(
+                f"✅ Stats match a full recomputation "
+                f"(authors: {total[0]}, videos: {total[1]}, translated: {total[2]})"
+            )
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
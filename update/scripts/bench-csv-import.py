@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+csv-import.py benchmark
+
+Imports a synthetic CSV into a fresh temporary database with yt-dlp stubbed
+out, so only parsing, author lookup and database writes are measured.
+
+Scenarios:
+    per-row commit (rollback journal)  - the old behaviour: one COMMIT per insert
+    per-row commit (WAL)
+    batched (WAL, --commit-every N)
+    single transaction (WAL, --commit-every 0 --commit-interval 0)
+
+Usage:
+python3 bench-csv-import.py                 # 10,000 rows
+python3 bench-csv-import.py --rows 2000 --authors 300 --commit-every 500
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCHEMA = [
+    """
+    CREATE TABLE "authors" (
+        "id"    INTEGER NOT NULL UNIQUE,
+        "yt_name"       TEXT,
+        "yt_url"        TEXT,
+        "yt_avatar"     TEXT,
+        "nico_name"     TEXT,
+        "nico_url"      TEXT,
+        "nico_avatar"   TEXT,
+        "twitter_name"  TEXT,
+        "twitter_url"   TEXT,
+        "twitter_avatar"        TEXT,
+        "comment"       TEXT,
+        PRIMARY KEY("id" AUTOINCREMENT)
+    )
+    """,
+    """
+    CREATE TABLE "videos" (
+        "id"    INTEGER NOT NULL UNIQUE,
+        "author"        INTEGER,
+        "original_name" TEXT,
+        "original_url"  TEXT,
+        "original_thumbnail"    TEXT,
+        "date"  TEXT,
+        "repost_name"   TEXT,
+        "repost_url"    TEXT,
+        "repost_thumbnail"      TEXT,
+        "translation_status"    INTEGER,
+        "comment"       TEXT,
+        PRIMARY KEY("id" AUTOINCREMENT),
+        FOREIGN KEY("author") REFERENCES "authors"("id")
+    )
+    """,
+]
+
+
+class StubYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL; returns a fixed-shape info dict"""
+
+    calls = 0
+
+    def __init__(self, options=None):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def close(self):
+        pass
+
+    def extract_info(self, url, download=False):
+        StubYoutubeDL.calls += 1
+        video_id = url.rsplit("=", 1)[-1]
+        channel = f"channel{int(video_id[1:]) % 997:03d}"
+        return {
+            "title": f"Video {video_id}",
+            "uploader": channel,
+            "uploader_url": f"https://www.youtube.com/@{channel}",
+            "upload_date": "20240102",
+        }
+
+
+def load_csv_import():
+    import yt_dlp
+
+    yt_dlp.YoutubeDL = StubYoutubeDL
+    path = Path(__file__).resolve().parent / "csv-import.py"
+    spec = importlib.util.spec_from_file_location("csv_import", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_synthetic_csv(path, rows, authors, seed=0):
+    """Rows look like the 待添加视频 sheet; about 5% repeat an earlier original link"""
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(rows):
+        video = i if i < 10 or rnd.random() >= 0.05 else rnd.randrange(i)
+        author = f"channel{video % 997 % authors:03d}"
+        lines.append(
+            f"{author},https://www.youtube.com/watch?v=v{video:010d},"
+            f"【东方MMD】测试视频 {i},https://www.bilibili.com/video/BV1t{i:08d},"
+            f"{rnd.randint(1, 5)}"
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def run_scenario(csv_import, csv_path, db_path, journal_mode, batch):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    setup = sqlite3.connect(db_path)
+    for ddl in SCHEMA:
+        setup.execute(ddl)
+    setup.commit()
+    setup.close()
+
+    conn = csv_import.create_connection(db_path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        csv_import.ensure_original_key(conn)
+    db = conn if batch is None else csv_import.BatchConnection(conn, *batch)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = csv_import.process_csv(
+            csv_path, db, interactive_mode=False, metadata_cache=None
+        )
+        if db is not conn:
+            db.finish()
+    elapsed = time.perf_counter() - start
+
+    videos = conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+    conn.close()
+    return {
+        "seconds": elapsed,
+        "videos": videos,
+        "errors": stats["errors"],
+        "commits": db.commits if db is not conn else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark csv-import.py writes")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic CSV rows")
+    parser.add_argument("--authors", type=int, default=997, help="Distinct authors")
+    parser.add_argument(
+        "--commit-every", type=int, default=200, help="Batch size for the batched run"
+    )
+    args = parser.parse_args()
+
+    csv_import = load_csv_import()
+    scenarios = [
+        ("per-row commit (rollback journal)", "DELETE", None),
+        ("per-row commit (WAL)", "WAL", None),
+        (
+            f"batched every {args.commit_every} rows (WAL)",
+            "WAL",
+            (args.commit_every, 0),
+        ),
+        ("single transaction (WAL)", "WAL", (0, 0)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "bench.csv")
+        db_path = os.path.join(tmp, "bench.db")
+        write_synthetic_csv(csv_path, args.rows, args.authors)
+        print(f"📄 Synthetic CSV: {args.rows} rows, {args.authors} authors")
+        print()
+        print(
+            f"{'Scenario':<40}{'Seconds':>10}{'Rows/s':>10}{'Commits':>10}{'Videos':>9}"
+        )
+        print("-" * 79)
+        for name, journal_mode, batch in scenarios:
+            result = run_scenario(csv_import, csv_path, db_path, journal_mode, batch)
+            commits = result["commits"] if result["commits"] is not None else "per row"
+            print(
+                f"{name:<40}{result['seconds']:>10.2f}"
+                f"{args.rows / result['seconds']:>10.0f}{commits:>10}{result['videos']:>9}"
+            )
+    print(f"\nStub extractions: {StubYoutubeDL.calls}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
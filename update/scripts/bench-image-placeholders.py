@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+image-mirror.py placeholder benchmark
+
+Mirrors a few thousand generated thumbnails / avatars from a local
+mock-image-server.py into a temporary database and mirror directory, so only
+decoding, resizing, placeholder encoding and database writes are measured
+(the images are rendered before the clock starts).
+
+Scenarios:
+    mirror (download, variants, placeholder)  - first run, --workers threads
+    rerun                                     - unchanged URLs are skipped
+    placeholders from files, 1 thread         - backfill of existing rows
+    placeholders from files, N threads
+
+Usage:
+python3 bench-image-placeholders.py                   # 3,000 images, 8 threads
+python3 bench-image-placeholders.py --images 5000 --workers 16
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCHEMA = [
+    """
+    CREATE TABLE "authors" (
+        "id"    INTEGER NOT NULL UNIQUE,
+        "yt_name"       TEXT,
+        "yt_avatar"     TEXT,
+        "nico_avatar"   TEXT,
+        "twitter_avatar"        TEXT,
+        PRIMARY KEY("id" AUTOINCREMENT)
+    )
+    """,
+    """
+    CREATE TABLE "videos" (
+        "id"    INTEGER NOT NULL UNIQUE,
+        "author"        INTEGER,
+        "original_thumbnail"    TEXT,
+        "repost_thumbnail"      TEXT,
+        PRIMARY KEY("id" AUTOINCREMENT)
+    )
+    """,
+]
+
+# (size, format) per image column, close to what the platforms serve
+SHAPES = {
+    "original_thumbnail": ((1280, 720), "jpg"),
+    "repost_thumbnail": ((480, 270), "webp"),
+    "yt_avatar": ((176, 176), "jpg"),
+    "twitter_avatar": ((400, 400), "png"),
+}
+
+
+def load_script(name, module_name):
+    path = Path(__file__).resolve().parent / name
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_database(db_path, base_url, images):
+    """About 80% video thumbnails, 20% avatars; returns the image keys to render"""
+    conn = sqlite3.connect(db_path)
+    for ddl in SCHEMA:
+        conn.execute(ddl)
+    keys = []
+
+    def url(column, i):
+        (width, height), ext = SHAPES[column]
+        keys.append((width, height, f"{column}{i}", "1", ext))
+        return f"{base_url}/{width}x{height}/{column}{i}.{ext}"
+
+    authors = max(images // 10, 1)
+    videos = max((images - 2 * authors) // 2, 1)
+    conn.executemany(
+        "INSERT INTO authors (yt_name, yt_avatar, twitter_avatar) VALUES (?, ?, ?)",
+        [
+            (f"author{i}", url("yt_avatar", i), url("twitter_avatar", i))
+            for i in range(authors)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO videos (author, original_thumbnail, repost_thumbnail) "
+        "VALUES (?, ?, ?)",
+        [
+            (
+                i % authors + 1,
+                url("original_thumbnail", i),
+                url("repost_thumbnail", i),
+            )
+            for i in range(videos)
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return keys
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark image-mirror.py placeholders"
+    )
+    parser.add_argument("--images", type=int, default=3000, help="Images to mirror")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Threads for the parallel runs"
+    )
+    args = parser.parse_args()
+
+    mirror = load_script("image-mirror.py", "image_mirror")
+    server_module = load_script("mock-image-server.py", "mock_image_server")
+    server, base_url = server_module.start_server()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        mirror_dir = os.path.join(tmp, "mirror")
+        keys = build_database(db_path, base_url, args.images)
+
+        # Render every image up front so the server side costs nothing
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for key, body in zip(
+                keys, pool.map(lambda k: server_module.render_image(*k), keys)
+            ):
+                server_module.ImageHandler.cache[key] = body
+        source_bytes = sum(map(len, server_module.ImageHandler.cache.values()))
+        print(
+            f"🖼️  {len(keys)} generated images "
+            f"({source_bytes / 1024 / 1024:.1f} MiB) from {base_url}"
+        )
+        print()
+        print(f"{'Scenario':<44}{'Seconds':>10}{'Images/s':>10}{'Done':>8}")
+        print("-" * 72)
+
+        conn = sqlite3.connect(db_path)
+        mirror.ensure_schema(conn)
+
+        def report(name, seconds, done):
+            rate = done / seconds if seconds and done else 0
+            print(f"{name:<44}{seconds:>10.2f}{rate:>10.0f}{done:>8}")
+
+        for name in ("mirror (download, variants, placeholder)", "rerun"):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = mirror.mirror_images(conn, mirror_dir, workers=args.workers)
+            report(name, time.perf_counter() - start, stats["mirrored"])
+
+        for workers in (1, args.workers):
+            conn.execute("UPDATE image_mirror SET placeholder = NULL")
+            conn.commit()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                filled, _ = mirror.backfill_placeholders(conn, mirror_dir, workers)
+            report(
+                f"placeholders from files, {workers} thread(s)",
+                time.perf_counter() - start,
+                filled,
+            )
+
+        sizes = conn.execute(
+            "SELECT COUNT(*), AVG(LENGTH(placeholder)), MAX(LENGTH(placeholder)) "
+            "FROM image_mirror WHERE placeholder IS NOT NULL"
+        ).fetchone()
+        conn.close()
+        server.shutdown()
+
+    print(
+        f"\nPlaceholders: {sizes[0]}, data: URI {sizes[1]:.0f} bytes on average, "
+        f"{sizes[2]} max"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+yt-dlp per-call overhead benchmark
+
+Compares the old csv-import.py behaviour (a new YoutubeDL for every URL,
+browser cookies loaded again each time) with YoutubeDLPool. The real
+yt_dlp.YoutubeDL is used, but extraction itself is stubbed out: the stub only
+touches the cookie jar and returns a fixed info dict, and reading the browser
+cookie database is replaced by a sleep of --cookie-delay seconds.
+
+Usage:
+python3 bench-ytdlp-pool.py                       # 200 calls, 0.2s cookie load
+python3 bench-ytdlp-pool.py --calls 500 --cookie-delay 0.5
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+import yt_dlp
+import yt_dlp.cookies
+
+
+def stub_extract_info(self, url, download=False):
+    # A real extraction sends requests through the instance's cookie jar
+    self.cookiejar
+    return {"title": url, "uploader": "stub", "upload_date": "20240102"}
+
+
+def install_stubs(cookie_delay):
+    def extract_cookies_from_browser(browser_name, profile=None, logger=None, **kw):
+        time.sleep(cookie_delay)
+        return yt_dlp.cookies.YoutubeDLCookieJar()
+
+    yt_dlp.YoutubeDL.extract_info = stub_extract_info
+    yt_dlp.cookies.extract_cookies_from_browser = extract_cookies_from_browser
+
+
+def load_csv_import():
+    path = Path(__file__).resolve().parent / "csv-import.py"
+    spec = importlib.util.spec_from_file_location("csv_import", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_fresh(csv_import, urls, browser_cookies):
+    """Old behaviour: one YoutubeDL per call"""
+    for url in urls:
+        options = csv_import.ydl_options(False, browser_cookies, None)
+        with yt_dlp.YoutubeDL(options) as ydl:
+            ydl.extract_info(url, download=False)
+
+
+def run_pooled(csv_import, urls, browser_cookies):
+    pool = csv_import.YoutubeDLPool()
+    try:
+        for url in urls:
+            pool.extract(url, False, browser_cookies, None)
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YoutubeDL reuse")
+    parser.add_argument("--calls", type=int, default=200, help="Extractions per run")
+    parser.add_argument(
+        "--cookie-delay",
+        type=float,
+        default=0.2,
+        help="Simulated seconds to read and decrypt the browser cookie database",
+    )
+    args = parser.parse_args()
+
+    install_stubs(args.cookie_delay)
+    csv_import = load_csv_import()
+    urls = [f"https://www.youtube.com/watch?v=v{i:010d}" for i in range(args.calls)]
+
+    print(
+        f"📄 {args.calls} stubbed extractions, simulated cookie load {args.cookie_delay}s"
+    )
+    print()
+    print(f"{'Scenario':<44}{'Seconds':>10}{'ms/call':>10}")
+    print("-" * 64)
+    for cookies_label, browser_cookies in (
+        ("no cookies", None),
+        ("--cookies-from-browser firefox", "firefox"),
+    ):
+        for name, runner in (("new instance", run_fresh), ("pooled", run_pooled)):
+            start = time.perf_counter()
+            runner(csv_import, urls, browser_cookies)
+            elapsed = time.perf_counter() - start
+            label = f"{name}, {cookies_label}"
+            print(f"{label:<44}{elapsed:>10.2f}{elapsed / args.calls * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
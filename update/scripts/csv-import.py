@@ -4,23 +4,47 @@ CSV Video Data Import Script
 
 Import video data from CSV file to database. CSV format:
 Author,Original Video Link,Repost Title,Repost Link,Translation Status,Notes,Supplementary Note
+Standard CSV quoting is supported (commas, doubled quotes and line breaks inside
+quoted cells, UTF-8 BOM); the file is streamed in batches rather than read into memory.
 
 Usage:
 python3 csv_import.py input.csv
+python3 csv_import.py --from-sheet    # read the 待添加视频 sheet directly, no CSV export
+python3 csv-preflight.py input.csv && python3 csv_import.py input.csv   # offline check first
 
 Optional arguments:
+--from-sheet: Import straight from the Tencent Docs sheet (file_id / sheet_id from
+              update/autofetch/config/upload.jsonc); rows are committed like a CSV import,
+              see --commit-every / --commit-interval
+--file-id / --sheet-id: Override the sheet used by --from-sheet
 --db-path: Database path (default: ../backend/random-2hu-stuff.db)
 --debug: Enable debug mode
---dry-run: Check only, do not actually import
+--dry-run: Run the real import against an in-memory copy of the database and print
+           exact counts plus a per-row outcome report; nothing is written
+--fast-metadata: Use YouTube oEmbed / NicoNico getthumbinfo / fxtwitter, yt-dlp as fallback
+--offline-metadata: Never call yt-dlp, use only --metadata-cache entries (handy with --dry-run)
 --skip-metadata: Skip metadata retrieval from links, use titles from CSV
+--metadata-cache: JSON file that keeps extracted metadata across runs
+--workers: Threads for the metadata prefetch phase (default 4, 0 = inline)
+--rate-limit: PLATFORM=RPS request rate per platform during prefetch, repeatable
+--commit-every / --commit-interval: Commit every N rows or T seconds (default 200 / 5s);
+                   each row runs in its own savepoint, 0 / 0 imports in one transaction
 --cookies: Netscape formatted cookie file to read cookies from
 --cookies-from-browser: Extract cookies from specified browser to handle restricted videos
                        Supported browsers: brave, chrome, chromium, edge, firefox, opera, safari, vivaldi, whale, qutebrowser
                        Format: BROWSER[+KEYRING][:PROFILE][::CONTAINER]
                        Examples: firefox, chrome, edge+gnomekeyring, safari:Default::Facebook Container, qutebrowser
                        Supported keyrings: basictext, gnomekeyring, kwallet, kwallet5, kwallet6
+--fuzzy-authors auto|suggest|off: Match author names that differ only in width, case,
+                   punctuation or spaces to existing authors (default auto)
 --interactive: Interactive mode - manually choose handling method when encountering duplicate links (default mode)
 --auto-merge: Auto-merge mode - intelligently handle duplicate links, skip interaction
+--defer-conflicts REVIEW_CSV: Interactive mode without prompts, conflicts go to a review file
+--apply-conflicts REVIEW_CSV: Apply the decisions filled into a review file
+
+Duplicate links are found through videos.original_key (the canonical original link,
+or the repost link when there is no original), which the script adds on first run
+together with a unique index.
 
 Two modes for handling duplicate links:
 1. Interactive mode (default): Ask for your choice each time duplicates are encountered
@@ -29,30 +53,103 @@ Two modes for handling duplicate links:
    - Merge: Intelligently merge information
    - Add: Force add as new record (will have duplicate links)
 2. Auto-merge mode (--auto-merge): Intelligently merge information, keep best data
+3. Deferred review (--defer-conflicts review.csv): Import everything else unattended,
+   write each conflict to review.csv, then apply the chosen options in one batch
+   with --apply-conflicts review.csv (same skip/overwrite/merge/add semantics)
 """
 
 import argparse
 import csv
+import importlib.util
+import io
+import json
 import os
+import queue
+import re
 import sqlite3
 import sys
-from datetime import datetime
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import NamedTuple, Optional
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 import yt_dlp
 
+# Endpoints used by --fast-metadata; override to point at a local fixture
+# server (see mock-metadata-server.py)
+YOUTUBE_API_BASE = os.environ.get("YOUTUBE_API_BASE", "https://www.youtube.com")
+NICO_THUMBINFO_API_BASE = os.environ.get(
+    "NICO_THUMBINFO_API_BASE", "https://ext.nicovideo.jp/api/getthumbinfo"
+)
+FXTWITTER_API_BASE = os.environ.get("FXTWITTER_API_BASE", "https://api.fxtwitter.com")
+
 
-def create_connection(db_path):
-    """Create database connection"""
+def create_connection(db_path, busy_timeout=30.0):
+    """Create database connection (WAL, so the backend can keep reading during imports)"""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(db_path, timeout=busy_timeout)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
         return conn
     except sqlite3.Error as e:
         print(f"Database connection error: {e}")
         return None
 
 
+def copy_to_memory(conn):
+    """Copy the whole database into :memory: with the backup API (for --dry-run)"""
+    mem_conn = sqlite3.connect(":memory:")
+    conn.backup(mem_conn)
+    return mem_conn
+
+
+def ensure_original_key(conn, debug=False):
+    """
+    Migration: videos.original_key plus a unique partial index on it.
+
+    original_key is the canonical original link (see original_video_key()),
+    so duplicate detection is an index lookup instead of a scan over
+    original_url. Intentional duplicates (the "Add" choice, one original
+    split into several reposts) keep original_key NULL; for each key only
+    the oldest row carries it. Keys are recomputed on every run because other
+    scripts edit original_url / repost_url without knowing about the column.
+    Returns the number of rows whose key changed.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(videos)")]
+    with conn:
+        if "original_key" not in columns:
+            print("🛠️  Adding videos.original_key and its unique index...")
+            conn.execute("ALTER TABLE videos ADD COLUMN original_key TEXT")
+
+        seen = set()
+        changed = []
+        for video_id, original_url, repost_url, key in conn.execute(
+            "SELECT id, original_url, repost_url, original_key FROM videos ORDER BY id"
+        ).fetchall():
+            new_key = original_video_key(original_url, repost_url)
+            if new_key in seen:
+                new_key = None
+            elif new_key is not None:
+                seen.add(new_key)
+            if new_key != key:
+                changed.append((new_key, video_id))
+        if changed:
+            # Rebuilt afterwards, so keys can move between rows in any order
+            conn.execute("DROP INDEX IF EXISTS idx_videos_original_key")
+            conn.executemany("UPDATE videos SET original_key = ? WHERE id = ?", changed)
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_videos_original_key "
+            "ON videos(original_key) WHERE original_key IS NOT NULL"
+        )
+    if debug and changed:
+        print(f"Updated original_key for {len(changed)} videos")
+    return len(changed)
+
+
 def clean_author_name(name):
     """Clean author name, remove BOM characters and extra whitespace"""
     if not name:
@@ -72,9 +169,22 @@ def clean_author_name(name):
     return name
 
 
+def author_name_key(name):
+    """
+    Loose author key for near-miss matching: NFKC (full-width → half-width),
+    case-folded, with whitespace, punctuation and symbols removed.
+    Keys shorter than 2 characters are too unspecific and return None.
+    """
+    if not name:
+        return None
+    folded = unicodedata.normalize("NFKC", name).casefold()
+    key = "".join(ch for ch in folded if unicodedata.category(ch)[0] in "LMN")
+    return key if len(key) >= 2 else None
+
+
 def clean_bilibili_url(url):
     """Clean Bilibili links, keep only necessary parameters"""
-    if not url or "bilibili.com" not in url:
+    if not url or "bilibili.com" not in url or "?" not in url:
         return url
 
     try:
@@ -117,7 +227,7 @@ def _fxtwitter_request(screen_name):
     """Fetch user info from fxtwitter API, trying requests first, then system curl"""
     import json
 
-    url = f"https://api.fxtwitter.com/{screen_name}"
+    url = f"{FXTWITTER_API_BASE}/{screen_name}"
     headers = {"User-Agent": "Mozilla/5.0"}
 
     try:
@@ -168,158 +278,769 @@ def get_twitter_avatar(screen_name, debug=False):
         return None
 
 
-def get_video_metadata(url, debug=False, browser_cookies=None, cookies_file=None):
-    """Get video metadata from URL"""
+def _fast_get(url, params=None):
+    import requests
+
+    resp = requests.get(
+        url,
+        params=params,
+        timeout=10,
+        headers={"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.8"},
+    )
+    resp.raise_for_status()
+    return resp
+
+
+def _utc_upload_date(value):
+    """YYYYMMDD in UTC, like yt-dlp derives upload_date from a timestamp"""
+    if isinstance(value, (int, float)):
+        moment = datetime.fromtimestamp(value, timezone.utc)
+    else:
+        moment = datetime.fromisoformat(value).astimezone(timezone.utc)
+    return moment.strftime("%Y%m%d")
+
+
+def _youtube_fast_info(video_id):
+    watch_url = f"https://www.youtube.com/watch?v={video_id}"
+    oembed = _fast_get(
+        f"{YOUTUBE_API_BASE}/oembed", {"url": watch_url, "format": "json"}
+    ).json()
+    # oEmbed has no date; the watch page carries it as microdata / microformat
+    page = _fast_get(f"{YOUTUBE_API_BASE}/watch", {"v": video_id}).text
+    m = re.search(
+        r'itemprop="(?:datePublished|uploadDate)" content="(\d{4})-(\d{2})-(\d{2})',
+        page,
+    ) or re.search(r'"(?:uploadDate|publishDate)":"(\d{4})-(\d{2})-(\d{2})', page)
+    if not m or not oembed.get("title"):
+        return None
+    return {
+        "title": oembed["title"],
+        "uploader": oembed.get("author_name"),
+        "uploader_url": oembed.get("author_url"),
+        "upload_date": "".join(m.groups()),
+    }
+
+
+def _niconico_fast_info(video_id):
+    import xml.etree.ElementTree as ET
+
+    root = ET.fromstring(_fast_get(f"{NICO_THUMBINFO_API_BASE}/{video_id}").content)
+    thumb = root.find("thumb")
+    if root.get("status") != "ok" or thumb is None:
+        return None
+    user_id = thumb.findtext("user_id")
+    if not user_id:
+        # Channel videos have ch_id / ch_name; leave those to yt-dlp
+        return None
+    return {
+        "title": thumb.findtext("title"),
+        "uploader": thumb.findtext("user_nickname"),
+        "uploader_id": user_id,
+        "upload_date": _utc_upload_date(thumb.findtext("first_retrieve")),
+    }
+
+
+def _twitter_fast_info(screen_name, status_id):
+    tweet = (
+        _fast_get(f"{FXTWITTER_API_BASE}/{screen_name}/status/{status_id}").json()
+    ).get("tweet")
+    if not tweet or not (tweet.get("media") or {}).get("videos"):
+        # yt-dlp rejects tweets without a video; let it report the error
+        return None
+    author = tweet.get("author") or {}
+    uploader = author.get("name") or author.get("screen_name")
+    # Same shape as yt-dlp's title: "<name> - <text without t.co links>"
+    text = re.sub(r"\s*https://t\.co/\S+", "", tweet.get("text") or "")
+    text = " ".join(text.split())
+    if len(text) > 72:
+        text = text[:72] + "..."
+    avatar = author.get("avatar_url")
+    return {
+        "title": f"{uploader} - {text}",
+        "uploader": uploader,
+        "uploader_id": author.get("screen_name"),
+        "upload_date": _utc_upload_date(tweet["created_timestamp"]),
+        "uploader_avatar": (
+            avatar.replace("_normal.jpg", "_400x400.jpg") if avatar else None
+        ),
+    }
+
+
+FAST_METADATA_STATS = {"resolved": 0, "fallback": 0}
+_fast_stats_lock = threading.Lock()
+
+
+def fast_video_info(url, debug=False):
+    """
+    Cheap metadata lookup without yt-dlp (--fast-metadata): YouTube oEmbed +
+    watch page, NicoNico getthumbinfo, fxtwitter for X. Returns a yt-dlp
+    style info dict, or None when the platform is not covered or the
+    endpoint fails, in which case the caller falls back to yt-dlp.
+    """
+    canonical = canonical_video_url(url)
+    info = None
+    try:
+        m = re.match(r"https://www\.youtube\.com/watch\?v=(.+)$", canonical)
+        if m:
+            info = _youtube_fast_info(m.group(1))
+        m = re.match(r"https://www\.nicovideo\.jp/watch/(.+)$", canonical)
+        if m:
+            info = _niconico_fast_info(m.group(1))
+        m = re.match(r"https://x\.com/([^/]+)/status/(\d+)$", canonical)
+        if m:
+            info = _twitter_fast_info(m.group(1), m.group(2))
+    except Exception as e:
+        if debug:
+            print(f"Fast metadata failed for {url}, falling back to yt-dlp: {e}")
+        info = None
+    with _fast_stats_lock:
+        FAST_METADATA_STATS["resolved" if info else "fallback"] += 1
+    return info
+
+
+def get_video_metadata(
+    url, debug=False, browser_cookies=None, cookies_file=None, fast=False
+):
+    """Get video metadata from URL (fast: try fast_video_info() before yt-dlp)"""
     if not url or url.strip() == "" or url == "未转载":
         return None, None, None
 
     try:
-        options = {
-            "quiet": not debug,
-            "skip_download": True,
-            "extract_flat": False,
+        info = fast_video_info(url, debug) if fast else None
+        if info is None:
+            info = extract_video_info(url, debug, browser_cookies, cookies_file)
+        return parse_video_metadata(url, info, debug)
+
+    except Exception as e:
+        if debug:
+            print(f"Failed to get video metadata {url}: {e}")
+        # Raise exception for upper-level handling
+        raise e
+
+
+YOUTUBE_ID_PATTERN = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|live/|embed/)|youtu\.be/)"
+    r"([A-Za-z0-9_-]{11})"
+)
+NICO_ID_PATTERN = re.compile(r"(?:nicovideo\.jp|nico\.ms)/(?:watch/)?((?:sm|nm|so)\d+)")
+# Status links without a screen name (x.com/i/web/status/…, x.com/i/status/…,
+# twitter.com/statuses/…) leave group 1 empty
+TWITTER_STATUS_PATTERN = re.compile(
+    r"(?:twitter\.com|x\.com)/(?:i/web/|i/|([^/?#]+)/)?status(?:es)?/(\d+)"
+)
+
+
+def canonical_video_url(url):
+    """Normalize a video URL so that equivalent links share one cache entry"""
+    url = url.strip()
+    m = YOUTUBE_ID_PATTERN.search(url)
+    if m:
+        return f"https://www.youtube.com/watch?v={m.group(1)}"
+    m = NICO_ID_PATTERN.search(url)
+    if m:
+        return f"https://www.nicovideo.jp/watch/{m.group(1)}"
+    m = TWITTER_STATUS_PATTERN.search(url)
+    if m:
+        return f"https://x.com/{m.group(1) or 'i'}/status/{m.group(2)}"
+    return clean_bilibili_url(url)
+
+
+def original_video_key(original_url, repost_url=None):
+    """
+    Duplicate-detection key stored in videos.original_key: the canonical
+    original link, or the canonical repost link when the original is missing
+    """
+    if original_url and original_url.strip():
+        return canonical_video_url(original_url)
+    if repost_url and repost_url.strip():
+        return "repost:" + canonical_video_url(repost_url)
+    return None
+
+
+def video_platform(url):
+    """Platform name used for per-platform rate limits"""
+    if "youtube.com" in url or "youtu.be" in url:
+        return "youtube"
+    if "nicovideo.jp" in url or "nico.ms" in url:
+        return "niconico"
+    if "twitter.com" in url or "x.com" in url:
+        return "twitter"
+    if "bilibili.com" in url or "b23.tv" in url:
+        return "bilibili"
+    return "other"
+
+
+# Requests per second allowed per platform during the prefetch phase
+DEFAULT_RATE_LIMITS = {
+    "youtube": 2.0,
+    "niconico": 1.0,
+    "twitter": 1.0,
+    "bilibili": 1.0,
+    "other": 1.0,
+}
+
+
+class RateLimiter:
+    """Spaces out request starts so that at most `rate` start per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next_start = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class MetadataCache:
+    """
+    Memoizes get_video_metadata() per canonical URL for the whole run, so the
+    author lookup and the title/date lookup share one yt-dlp extraction.
+    Failures are remembered too and re-raised instead of retried.
+    With cache_file, successful results are also kept on disk across runs.
+    With offline, nothing is extracted: URLs missing from the cache resolve to
+    (None, None, None), like --skip-metadata for that row.
+    With fast, extraction tries fast_video_info() before yt-dlp.
+
+    prefetch() resolves a batch of URLs up front in a thread pool (workers > 0),
+    with one RateLimiter per platform; get() then only reads the results.
+    """
+
+    def __init__(
+        self, cache_file=None, workers=0, rate_limits=None, offline=False, fast=False
+    ):
+        self.cache_file = cache_file
+        self.workers = workers
+        self.offline = offline
+        self.fast = fast
+        self.limiters = {
+            platform: RateLimiter(rate)
+            for platform, rate in {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}.items()
         }
+        self.results = {}
+        self.disk = {}
+        self.lock = threading.Lock()
+        self.stats = {
+            "extractions": 0,
+            "prefetched": 0,
+            "cache_hits": 0,
+            "disk_hits": 0,
+            "failed": 0,
+            "offline_misses": 0,
+        }
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    self.disk = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable metadata cache {cache_file}: {e}")
+
+    def _lookup(self, key):
+        """Return the memoized result (or exception) for key, or None"""
+        with self.lock:
+            if key in self.results:
+                self.stats["cache_hits"] += 1
+                return self.results[key]
+            if key in self.disk:
+                self.stats["disk_hits"] += 1
+                entry = self.disk[key]
+                result = (entry["title"], entry["date"], entry["author_info"])
+                self.results[key] = result
+                return result
+        return None
+
+    def _extract(self, key, url, debug, browser_cookies, cookies_file):
+        with self.lock:
+            self.stats["extractions"] += 1
+        try:
+            result = get_video_metadata(
+                url, debug, browser_cookies, cookies_file, self.fast
+            )
+        except Exception as e:
+            with self.lock:
+                self.stats["failed"] += 1
+                self.results[key] = e
+            return e
+        with self.lock:
+            self.results[key] = result
+            if self.cache_file:
+                title, date, author_info = result
+                self.disk[key] = {
+                    "title": title,
+                    "date": date,
+                    "author_info": author_info,
+                }
+        return result
+
+    def get(self, url, debug=False, browser_cookies=None, cookies_file=None):
+        if not url or url.strip() == "" or url == "未转载":
+            return None, None, None
+
+        key = canonical_video_url(url)
+        result = self._lookup(key)
+        if result is None and self.offline:
+            with self.lock:
+                self.stats["offline_misses"] += 1
+                self.results[key] = result = (None, None, None)
+        if result is None:
+            result = self._extract(key, url, debug, browser_cookies, cookies_file)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def prefetch(self, urls, debug=False, browser_cookies=None, cookies_file=None):
+        """Resolve every not-yet-known URL concurrently; errors are kept for get()"""
+        if self.workers <= 0 or self.offline:
+            return
+        pending = {}
+        for url in urls:
+            if not url or url.strip() == "" or url == "未转载":
+                continue
+            key = canonical_video_url(url)
+            with self.lock:
+                known = key in self.results or key in self.disk
+            if not known and key not in pending:
+                pending[key] = url
+        if not pending:
+            return
+
+        def resolve(item):
+            key, url = item
+            self.limiters[video_platform(url)].wait()
+            return self._extract(key, url, debug, browser_cookies, cookies_file)
+
+        print(
+            f"🔎 Prefetching metadata for {len(pending)} URLs with {self.workers} workers..."
+        )
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(resolve, pending.items()))
+        failed = sum(isinstance(r, Exception) for r in results)
+        with self.lock:
+            self.stats["prefetched"] += len(pending)
+        print(
+            f"   Done in {time.monotonic() - start:.1f}s ({failed} failed, errors are reported per line below)"
+        )
+
+    def save(self):
+        if not self.cache_file:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.disk, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+
+def ydl_options(debug=False, browser_cookies=None, cookies_file=None):
+    """yt-dlp options for one cookie configuration"""
+    options = {
+        "quiet": not debug,
+        "skip_download": True,
+        "extract_flat": False,
+    }
 
-        # If cookies file is specified, use it
-        if cookies_file:
-            options["cookiefile"] = cookies_file
-
-        # If cookies are enabled, extract cookies from specified browser
-        elif browser_cookies:
-            # Parse browser cookies parameter
-            # Format: BROWSER[+KEYRING][:PROFILE][::CONTAINER]
-            if "+" in browser_cookies and ":" in browser_cookies:
-                # Full format: browser+keyring:profile::container
-                parts = browser_cookies.split("+", 1)
-                browser = parts[0]
-                keyring_profile_container = parts[1]
-
-                if "::" in keyring_profile_container:
-                    keyring_profile, container = keyring_profile_container.split(
-                        "::", 1
+    # If cookies file is specified, use it
+    if cookies_file:
+        options["cookiefile"] = cookies_file
+
+    # If cookies are enabled, extract cookies from specified browser
+    elif browser_cookies:
+        # Parse browser cookies parameter
+        # Format: BROWSER[+KEYRING][:PROFILE][::CONTAINER]
+        if "+" in browser_cookies and ":" in browser_cookies:
+            # Full format: browser+keyring:profile::container
+            parts = browser_cookies.split("+", 1)
+            browser = parts[0]
+            keyring_profile_container = parts[1]
+
+            if "::" in keyring_profile_container:
+                keyring_profile, container = keyring_profile_container.split("::", 1)
+                if ":" in keyring_profile:
+                    keyring, profile = keyring_profile.split(":", 1)
+                    options["cookiesfrombrowser"] = (
+                        browser,
+                        keyring,
+                        profile,
+                        container,
                     )
-                    if ":" in keyring_profile:
-                        keyring, profile = keyring_profile.split(":", 1)
-                        options["cookiesfrombrowser"] = (
-                            browser,
-                            keyring,
-                            profile,
-                            container,
-                        )
-                    else:
-                        keyring = keyring_profile
-                        options["cookiesfrombrowser"] = (
-                            browser,
-                            keyring,
-                            None,
-                            container,
-                        )
                 else:
-                    if ":" in keyring_profile_container:
-                        keyring, profile = keyring_profile_container.split(":", 1)
-                        options["cookiesfrombrowser"] = (browser, keyring, profile)
-                    else:
-                        keyring = keyring_profile_container
-                        options["cookiesfrombrowser"] = (browser, keyring)
-            elif "::" in browser_cookies:
-                # Format: browser::container or browser:profile::container
-                if browser_cookies.count(":") == 2:
-                    browser_profile, container = browser_cookies.split("::", 1)
-                    if ":" in browser_profile:
-                        browser, profile = browser_profile.split(":", 1)
-                        options["cookiesfrombrowser"] = (
-                            browser,
-                            None,
-                            profile,
-                            container,
-                        )
-                    else:
-                        browser = browser_profile
-                        options["cookiesfrombrowser"] = (browser, None, None, container)
+                    keyring = keyring_profile
+                    options["cookiesfrombrowser"] = (
+                        browser,
+                        keyring,
+                        None,
+                        container,
+                    )
+            else:
+                if ":" in keyring_profile_container:
+                    keyring, profile = keyring_profile_container.split(":", 1)
+                    options["cookiesfrombrowser"] = (browser, keyring, profile)
+                else:
+                    keyring = keyring_profile_container
+                    options["cookiesfrombrowser"] = (browser, keyring)
+        elif "::" in browser_cookies:
+            # Format: browser::container or browser:profile::container
+            if browser_cookies.count(":") == 2:
+                browser_profile, container = browser_cookies.split("::", 1)
+                if ":" in browser_profile:
+                    browser, profile = browser_profile.split(":", 1)
+                    options["cookiesfrombrowser"] = (
+                        browser,
+                        None,
+                        profile,
+                        container,
+                    )
                 else:
-                    browser, container = browser_cookies.split("::", 1)
+                    browser = browser_profile
                     options["cookiesfrombrowser"] = (browser, None, None, container)
-            elif ":" in browser_cookies:
-                # Format: browser:profile
-                browser, profile = browser_cookies.split(":", 1)
-                options["cookiesfrombrowser"] = (browser, None, profile)
             else:
-                # Browser name only
-                options["cookiesfrombrowser"] = (browser_cookies,)
+                browser, container = browser_cookies.split("::", 1)
+                options["cookiesfrombrowser"] = (browser, None, None, container)
+        elif ":" in browser_cookies:
+            # Format: browser:profile
+            browser, profile = browser_cookies.split(":", 1)
+            options["cookiesfrombrowser"] = (browser, None, profile)
+        else:
+            # Browser name only
+            options["cookiesfrombrowser"] = (browser_cookies,)
+
+    return options
 
-        with yt_dlp.YoutubeDL(options) as ydl:
-            info = ydl.extract_info(url, download=False)
 
-            title = info.get("title", None)
-            uploader = info.get("uploader", None)
+class YoutubeDLPool:
+    """
+    Long-lived YoutubeDL instances keyed by cookie configuration
+
+    Building a YoutubeDL costs tens of milliseconds, and with
+    --cookies-from-browser every new instance reads and decrypts the browser
+    cookie database again. The pool keeps idle instances per configuration
+    and extracts browser cookies once per run into a shared in-memory jar.
+    An instance is only used by one thread at a time, so prefetch workers
+    each get their own.
+    """
 
-            # Get release date
-            upload_date = (
-                info.get("upload_date")
-                or info.get("release_date")
-                or info.get("timestamp")
-                or info.get("upload_timestamp")
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.jars = {}
+        self.jar_locks = {}
+        self.instances = []
+        self.stats = {"created": 0, "reused": 0, "cookie_loads": 0}
+
+    def _cookie_jar(self, key, spec, ydl):
+        with self.lock:
+            jar_lock = self.jar_locks.setdefault(key, threading.Lock())
+        with jar_lock:
+            if key not in self.jars:
+                self.jars[key] = yt_dlp.cookies.load_cookies(None, spec, ydl)
+                with self.lock:
+                    self.stats["cookie_loads"] += 1
+            return self.jars[key]
+
+    def acquire(self, debug=False, browser_cookies=None, cookies_file=None):
+        key = (bool(debug), browser_cookies, cookies_file)
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if idle:
+                self.stats["reused"] += 1
+                return key, idle.pop()
+
+        options = ydl_options(debug, browser_cookies, cookies_file)
+        spec = options.pop("cookiesfrombrowser", None)
+        ydl = yt_dlp.YoutubeDL(options)
+        if spec is not None:
+            # cookiejar is a cached property; pre-seeding it skips load_cookies()
+            ydl.cookiejar = self._cookie_jar(key, spec, ydl)
+        with self.lock:
+            self.stats["created"] += 1
+            self.instances.append(ydl)
+        return key, ydl
+
+    def release(self, key, ydl):
+        with self.lock:
+            self.idle[key].append(ydl)
+
+    def extract(self, url, debug=False, browser_cookies=None, cookies_file=None):
+        key, ydl = self.acquire(debug, browser_cookies, cookies_file)
+        try:
+            return ydl.extract_info(url, download=False)
+        finally:
+            self.release(key, ydl)
+
+    def close(self):
+        with self.lock:
+            instances, self.instances = self.instances, []
+            self.idle.clear()
+            self.jars.clear()
+        for ydl in instances:
+            ydl.close()
+
+
+YDL_POOL = YoutubeDLPool()
+
+
+def extract_video_info(url, debug=False, browser_cookies=None, cookies_file=None):
+    """Run a single yt-dlp extraction and return the info dict"""
+    return YDL_POOL.extract(url, debug, browser_cookies, cookies_file)
+
+
+def parse_video_metadata(url, info, debug=False):
+    """Get (title, formatted_date, author_info) from a yt-dlp info dict"""
+    title = info.get("title", None)
+    uploader = info.get("uploader", None)
+
+    # Get release date
+    upload_date = (
+        info.get("upload_date")
+        or info.get("release_date")
+        or info.get("timestamp")
+        or info.get("upload_timestamp")
+    )
+
+    formatted_date = None
+    if upload_date:
+        try:
+            if isinstance(upload_date, (int, float)):
+                formatted_date = datetime.fromtimestamp(upload_date).strftime(
+                    "%Y-%m-%d"
+                )
+            else:
+                date_str = str(upload_date)
+                if len(date_str) == 8 and date_str.isdigit():
+                    formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+                else:
+                    formatted_date = date_str
+        except Exception as e:
+            if debug:
+                print(f"Date formatting error: {upload_date} -> {e}")
+
+    # Get author information with platform identification
+    author_info = {
+        "name": uploader,
+        "url": None,
+        "avatar": None,
+        "platform": None,  # Add platform identification
+    }
+
+    # Build author URL and identify platform
+    if "youtube.com" in url or "youtu.be" in url:
+        author_info["platform"] = "youtube"
+        uploader_url = info.get("uploader_url") or info.get("channel_url")
+        if uploader_url:
+            author_info["url"] = uploader_url
+
+    elif "nicovideo.jp" in url:
+        author_info["platform"] = "niconico"
+        uploader_id = info.get("uploader_id")
+        if uploader_id:
+            author_info["url"] = f"https://www.nicovideo.jp/user/{uploader_id}"
+
+    elif "twitter.com" in url or "x.com" in url:
+        author_info["platform"] = "twitter"
+        uploader_id = info.get("uploader_id")
+        if uploader_id:
+            author_info["url"] = f"https://x.com/{uploader_id}"
+        avatar = info.get("uploader_avatar") or get_twitter_avatar(uploader_id, debug)
+        if avatar:
+            author_info["avatar"] = avatar
+
+    return title, formatted_date, author_info
+
+
+AUTHOR_FIELDS = (
+    "yt_name",
+    "yt_url",
+    "nico_name",
+    "nico_url",
+    "twitter_name",
+    "twitter_url",
+    "twitter_avatar",
+)
+AUTHOR_NAME_FIELDS = ("yt_name", "nico_name", "twitter_name")
+AUTHOR_URL_FIELDS = {
+    "youtube": "yt_url",
+    "niconico": "nico_url",
+    "twitter": "twitter_url",
+}
+_MISSING = object()
+
+
+class AuthorIndex:
+    """
+    In-memory name/URL → author id index, loaded once per import so that
+    get_or_create_author() does not scan the authors table for every name.
+
+    Names are indexed as stored and as cleaned by clean_author_name(); exact
+    names win over cleaned variants, and lower ids win like the SQL lookup.
+    They are also indexed by author_name_key() for near-miss matching
+    (fuzzy: "auto" reuses the match, "suggest" only reports it, "off");
+    a reused match is remembered under the CSV spelling as an alias.
+    Changes are journaled per row so a rolled-back row can be undone.
+    """
+
+    def __init__(self, conn, fuzzy="auto"):
+        self.authors = {}
+        self.names = {}
+        self.urls = {field: {} for field in AUTHOR_URL_FIELDS.values()}
+        self.fuzzy = fuzzy
+        self.fuzzy_names = {}  # author_name_key → lowest author id
+        self.fuzzy_ambiguous = {}  # keys shared by more than one author
+        self.fuzzy_matches = (
+            {}
+        )  # CSV name → (author id, "resolved"/"suggested", reason)
+        self.aliases = {}  # CSV name → author id of a resolved fuzzy match
+        self._journal = []
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT id, {', '.join(AUTHOR_FIELDS)} FROM authors ORDER BY id"
+        )
+        rows = cursor.fetchall()
+        for row in rows:
+            self.authors[row[0]] = dict(zip(AUTHOR_FIELDS, row[1:]))
+            self._index(row[0], exact_only=True)
+        for row in rows:
+            self._index(row[0], exact_only=False)
+        self._journal.clear()  # The loaded index is not part of any row
+
+    def _set(self, mapping, key, value):
+        if key in mapping:
+            return
+        self._journal.append((mapping, key, _MISSING))
+        mapping[key] = value
+
+    def _index(self, author_id, exact_only=False):
+        author = self.authors[author_id]
+        for field in AUTHOR_NAME_FIELDS:
+            name = author[field]
+            if not name:
+                continue
+            self._set(
+                self.names,
+                clean_author_name(name) if not exact_only else name,
+                author_id,
             )
+            key = author_name_key(name) if not exact_only else None
+            if key:
+                owner = self.fuzzy_names.get(key)
+                if owner is None:
+                    self._set(self.fuzzy_names, key, author_id)
+                elif owner != author_id:
+                    self._set(self.fuzzy_ambiguous, key, True)
+        for field, urls in self.urls.items():
+            if author[field]:
+                self._set(urls, author[field], author_id)
+
+    def find_by_name(self, name):
+        author_id = self.names.get(name)
+        if author_id is None:
+            author_id = self.aliases.get(name)
+        if author_id is None:
+            return None
+        return self.find_by_id(author_id)
 
-            formatted_date = None
-            if upload_date:
-                try:
-                    if isinstance(upload_date, (int, float)):
-                        formatted_date = datetime.fromtimestamp(upload_date).strftime(
-                            "%Y-%m-%d"
-                        )
-                    else:
-                        date_str = str(upload_date)
-                        if len(date_str) == 8 and date_str.isdigit():
-                            formatted_date = (
-                                f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-                            )
-                        else:
-                            formatted_date = date_str
-                except Exception as e:
-                    if debug:
-                        print(f"Date formatting error: {upload_date} -> {e}")
-
-            # Get author information with platform identification
-            author_info = {
-                "name": uploader,
-                "url": None,
-                "avatar": None,
-                "platform": None,  # Add platform identification
-            }
+    def find_by_fuzzy_name(self, name, author_info=None):
+        """
+        Near-miss lookup for a name with no exact match. Returns the author row
+        (as find_by_name) when the match may be reused, otherwise None; every
+        candidate is recorded in fuzzy_matches. A match is only suggested when
+        the key is ambiguous, the metadata URL belongs to a different channel,
+        or fuzzy is "suggest".
+        """
+        if self.fuzzy == "off":
+            return None
+        key = author_name_key(name)
+        author_id = self.fuzzy_names.get(key) if key else None
+        if author_id is None:
+            return None
 
-            # Build author URL and identify platform
-            if "youtube.com" in url or "youtu.be" in url:
-                author_info["platform"] = "youtube"
-                uploader_url = info.get("uploader_url") or info.get("channel_url")
-                if uploader_url:
-                    author_info["url"] = uploader_url
-
-            elif "nicovideo.jp" in url:
-                author_info["platform"] = "niconico"
-                uploader_id = info.get("uploader_id")
-                if uploader_id:
-                    author_info["url"] = f"https://www.nicovideo.jp/user/{uploader_id}"
-
-            elif "twitter.com" in url or "x.com" in url:
-                author_info["platform"] = "twitter"
-                uploader_id = info.get("uploader_id")
-                if uploader_id:
-                    author_info["url"] = f"https://x.com/{uploader_id}"
-                avatar = get_twitter_avatar(uploader_id, debug)
-                if avatar:
-                    author_info["avatar"] = avatar
-
-            return title, formatted_date, author_info
+        platform = author_info.get("platform") if author_info else None
+        url = author_info.get("url") if author_info else None
+        if url and self.find_by_url(platform, url) is not None:
+            return None  # The URL lookup finds the author
+
+        url_field = AUTHOR_URL_FIELDS.get(platform)
+        known_url = self.authors[author_id][url_field] if url_field else None
+        if key in self.fuzzy_ambiguous:
+            reason = "several authors share this name"
+        elif url and known_url and known_url != url:
+            reason = "different channel URL"
+        elif self.fuzzy != "auto":
+            reason = "suggest mode"
+        else:
+            reason = None
+        self.fuzzy_matches[name] = (
+            author_id,
+            "suggested" if reason else "resolved",
+            reason,
+        )
+        if reason:
+            return None
+        # Not journaled: the author predates this row, so the alias stays valid
+        self.aliases[name] = author_id
+        return self.find_by_id(author_id)
+
+    def find_by_id(self, author_id):
+        author = self.authors[author_id]
+        return (author_id,) + tuple(author[field] for field in AUTHOR_FIELDS)
+
+    def find_by_url(self, platform, url):
+        field = AUTHOR_URL_FIELDS.get(platform)
+        if field:
+            return self.urls[field].get(url)
+        for urls in self.urls.values():
+            if url in urls:
+                return urls[url]
+        return None
 
-    except Exception as e:
-        if debug:
-            print(f"Failed to get video metadata {url}: {e}")
-        # Raise exception for upper-level handling
-        raise e
+    def get(self, author_id):
+        return self.authors.get(author_id)
+
+    def set_field(self, author_id, field, value):
+        author = self.authors[author_id]
+        self._journal.append((author, field, author[field]))
+        author[field] = value
+        self._index(author_id, exact_only=True)
+        self._index(author_id, exact_only=False)
+
+    def add(self, author_id, fields):
+        self._journal.append((self.authors, author_id, _MISSING))
+        self.authors[author_id] = {field: fields.get(field) for field in AUTHOR_FIELDS}
+        self._index(author_id, exact_only=True)
+        self._index(author_id, exact_only=False)
+
+    def commit_row(self):
+        self._journal.clear()
+
+    def rollback_row(self):
+        while self._journal:
+            mapping, key, previous = self._journal.pop()
+            if previous is _MISSING:
+                mapping.pop(key, None)
+            else:
+                mapping[key] = previous
 
 
-def get_or_create_author(conn, csv_author_name, author_info, debug=False):
+def _set_author_field(cursor, author_index, author_id, field, value):
+    cursor.execute(f"UPDATE authors SET {field} = ? WHERE id = ?", (value, author_id))
+    if author_index is not None:
+        author_index.set_field(author_id, field, value)
+
+
+def _check_author_index(what, indexed, queried):
+    if indexed != queried:
+        print(f"⚠️  Author index mismatch for {what}: index={indexed} db={queried}")
+
+
+def get_or_create_author(
+    conn, csv_author_name, author_info, debug=False, author_index=None
+):
     """Get or create author with new platform-specific fields, return author ID"""
     cursor = conn.cursor()
 
@@ -327,15 +1048,44 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
     csv_author_name = clean_author_name(csv_author_name)
 
     # Step 1: Try to find by CSV author name in both platform name fields
-    cursor.execute(
-        """
-        SELECT id, yt_name, yt_url, nico_name, nico_url, twitter_name, twitter_url, twitter_avatar
-        FROM authors 
-        WHERE yt_name = ? OR nico_name = ? OR twitter_name = ?
-    """,
-        (csv_author_name, csv_author_name, csv_author_name),
-    )
-    result = cursor.fetchone()
+    if author_index is not None:
+        result = author_index.find_by_name(csv_author_name)
+    if author_index is None or debug:
+        cursor.execute(
+            """
+            SELECT id, yt_name, yt_url, nico_name, nico_url, twitter_name, twitter_url, twitter_avatar
+            FROM authors 
+            WHERE yt_name = ? OR nico_name = ? OR twitter_name = ?
+        """,
+            (csv_author_name, csv_author_name, csv_author_name),
+        )
+        queried = cursor.fetchone()
+        if author_index is None:
+            result = queried
+        elif queried is not None:
+            # Cleaned-name variants may match where SQL does not; only compare hits
+            _check_author_index(f"name '{csv_author_name}'", result, queried)
+
+    # Step 1b: Near-miss name (width, case, punctuation) when neither the exact
+    # name nor the metadata URL is known
+    if not result and author_index is not None:
+        result = author_index.find_by_fuzzy_name(csv_author_name, author_info)
+        match = author_index.fuzzy_matches.get(csv_author_name)
+        if match:
+            author = author_index.get(match[0])
+            known_name = next(
+                (author[f] for f in AUTHOR_NAME_FIELDS if author[f]), None
+            )
+            if result:
+                print(
+                    f"🔗 Matched author '{csv_author_name}' to existing "
+                    f"'{known_name}' (ID: {match[0]})"
+                )
+            else:
+                print(
+                    f"💡 Author '{csv_author_name}' looks like existing "
+                    f"'{known_name}' (ID: {match[0]}), {match[2]}; creating a new author"
+                )
 
     if result:
         author_id = result[0]
@@ -351,30 +1101,23 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
             if platform == "youtube" and url:
                 # Update YouTube fields if empty
                 if not result[2]:  # yt_url is empty
-                    cursor.execute(
-                        "UPDATE authors SET yt_url = ? WHERE id = ?", (url, author_id)
-                    )
+                    _set_author_field(cursor, author_index, author_id, "yt_url", url)
                     if debug:
                         print(f"Updated YouTube URL for author: {csv_author_name}")
                 if not result[1] and name:  # yt_name is empty
-                    cursor.execute(
-                        "UPDATE authors SET yt_name = ? WHERE id = ?", (name, author_id)
-                    )
+                    _set_author_field(cursor, author_index, author_id, "yt_name", name)
                     if debug:
                         print(f"Updated YouTube name for author: {csv_author_name}")
 
             elif platform == "niconico" and url:
                 # Update NicoNico fields if empty
                 if not result[4]:  # nico_url is empty
-                    cursor.execute(
-                        "UPDATE authors SET nico_url = ? WHERE id = ?", (url, author_id)
-                    )
+                    _set_author_field(cursor, author_index, author_id, "nico_url", url)
                     if debug:
                         print(f"Updated NicoNico URL for author: {csv_author_name}")
                 if not result[3] and name:  # nico_name is empty
-                    cursor.execute(
-                        "UPDATE authors SET nico_name = ? WHERE id = ?",
-                        (name, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "nico_name", name
                     )
                     if debug:
                         print(f"Updated NicoNico name for author: {csv_author_name}")
@@ -382,24 +1125,21 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
             elif platform == "twitter" and url:
                 # Update Twitter fields if empty
                 if not result[6]:  # twitter_url is empty
-                    cursor.execute(
-                        "UPDATE authors SET twitter_url = ? WHERE id = ?",
-                        (url, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "twitter_url", url
                     )
                     if debug:
                         print(f"Updated Twitter URL for author: {csv_author_name}")
                 if not result[5] and name:  # twitter_name is empty
-                    cursor.execute(
-                        "UPDATE authors SET twitter_name = ? WHERE id = ?",
-                        (name, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "twitter_name", name
                     )
                     if debug:
                         print(f"Updated Twitter name for author: {csv_author_name}")
                 avatar = author_info.get("avatar")
                 if not result[7] and avatar:  # twitter_avatar is empty
-                    cursor.execute(
-                        "UPDATE authors SET twitter_avatar = ? WHERE id = ?",
-                        (avatar, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "twitter_avatar", avatar
                     )
                     if debug:
                         print(f"Updated Twitter avatar for author: {csv_author_name}")
@@ -413,30 +1153,47 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
         platform = author_info.get("platform")
         url = author_info["url"]
 
-        if platform == "youtube":
-            cursor.execute("SELECT id FROM authors WHERE yt_url = ?", (url,))
-        elif platform == "niconico":
-            cursor.execute("SELECT id FROM authors WHERE nico_url = ?", (url,))
-        elif platform == "twitter":
-            cursor.execute("SELECT id FROM authors WHERE twitter_url = ?", (url,))
-        else:
-            cursor.execute(
-                "SELECT id FROM authors WHERE yt_url = ? OR nico_url = ? OR twitter_url = ?",
-                (url, url, url),
-            )
+        if author_index is not None:
+            result = author_index.find_by_url(platform, url)
+            result = (result,) if result is not None else None
+        if author_index is None or debug:
+            if platform == "youtube":
+                cursor.execute("SELECT id FROM authors WHERE yt_url = ?", (url,))
+            elif platform == "niconico":
+                cursor.execute("SELECT id FROM authors WHERE nico_url = ?", (url,))
+            elif platform == "twitter":
+                cursor.execute("SELECT id FROM authors WHERE twitter_url = ?", (url,))
+            else:
+                cursor.execute(
+                    "SELECT id FROM authors WHERE yt_url = ? OR nico_url = ? OR twitter_url = ?",
+                    (url, url, url),
+                )
+            queried = cursor.fetchone()
+            if author_index is None:
+                result = queried
+            else:
+                _check_author_index(f"URL '{url}'", result, queried)
 
-        result = cursor.fetchone()
         if result:
             author_id = result[0]
             if debug:
                 print(f"Found existing author by URL (ID: {author_id})")
 
             # Get current author names to check if update is needed
-            cursor.execute(
-                "SELECT yt_name, nico_name, twitter_name, twitter_avatar FROM authors WHERE id = ?",
-                (author_id,),
-            )
-            current_names = cursor.fetchone()
+            if author_index is not None:
+                author = author_index.get(author_id)
+                current_names = (
+                    author["yt_name"],
+                    author["nico_name"],
+                    author["twitter_name"],
+                    author["twitter_avatar"],
+                )
+            else:
+                cursor.execute(
+                    "SELECT yt_name, nico_name, twitter_name, twitter_avatar FROM authors WHERE id = ?",
+                    (author_id,),
+                )
+                current_names = cursor.fetchone()
             (
                 current_yt_name,
                 current_nico_name,
@@ -448,9 +1205,8 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
             updated = False
             if platform == "youtube":
                 if not current_yt_name or len(current_yt_name.strip()) == 0:
-                    cursor.execute(
-                        "UPDATE authors SET yt_name = ? WHERE id = ?",
-                        (csv_author_name, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "yt_name", csv_author_name
                     )
                     updated = True
                     if debug:
@@ -461,9 +1217,8 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
                     )
             elif platform == "niconico":
                 if not current_nico_name or len(current_nico_name.strip()) == 0:
-                    cursor.execute(
-                        "UPDATE authors SET nico_name = ? WHERE id = ?",
-                        (csv_author_name, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "nico_name", csv_author_name
                     )
                     updated = True
                     if debug:
@@ -474,9 +1229,8 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
                     )
             elif platform == "twitter":
                 if not current_twitter_name or len(current_twitter_name.strip()) == 0:
-                    cursor.execute(
-                        "UPDATE authors SET twitter_name = ? WHERE id = ?",
-                        (csv_author_name, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "twitter_name", csv_author_name
                     )
                     updated = True
                     if debug:
@@ -487,9 +1241,8 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
                     )
                 avatar = author_info.get("avatar")
                 if not current_twitter_avatar and avatar:
-                    cursor.execute(
-                        "UPDATE authors SET twitter_avatar = ? WHERE id = ?",
-                        (avatar, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "twitter_avatar", avatar
                     )
                     updated = True
                     if debug:
@@ -501,9 +1254,11 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
                 if (not current_yt_name or len(current_yt_name.strip()) == 0) and (
                     not current_nico_name or len(current_nico_name.strip()) == 0
                 ):
-                    cursor.execute(
-                        "UPDATE authors SET yt_name = ?, nico_name = ? WHERE id = ?",
-                        (csv_author_name, csv_author_name, author_id),
+                    _set_author_field(
+                        cursor, author_index, author_id, "yt_name", csv_author_name
+                    )
+                    _set_author_field(
+                        cursor, author_index, author_id, "nico_name", csv_author_name
                     )
                     updated = True
                     if debug:
@@ -577,6 +1332,19 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
     )
     conn.commit()
     author_id = cursor.lastrowid
+    if author_index is not None:
+        author_index.add(
+            author_id,
+            {
+                "yt_name": yt_name,
+                "yt_url": yt_url,
+                "nico_name": nico_name,
+                "nico_url": nico_url,
+                "twitter_name": twitter_name,
+                "twitter_url": twitter_url,
+                "twitter_avatar": twitter_avatar,
+            },
+        )
 
     # Show which fields were populated
     populated_fields = []
@@ -599,66 +1367,6 @@ def get_or_create_author(conn, csv_author_name, author_info, debug=False):
     return author_id
 
 
-def simulate_author_creation(csv_author_name, author_info, debug=False):
-    """Simulate author creation for dry-run mode, return mock author info"""
-    csv_author_name = clean_author_name(csv_author_name)
-
-    # Simulate the logic without database operations
-    yt_name = None
-    yt_url = None
-    nico_name = None
-    nico_url = None
-    twitter_name = None
-    twitter_url = None
-    twitter_avatar = None
-
-    if author_info and author_info.get("platform"):
-        platform = author_info["platform"]
-        metadata_name = (
-            clean_author_name(author_info.get("name"))
-            if author_info.get("name")
-            else None
-        )
-        metadata_url = author_info.get("url")
-
-        if platform == "youtube":
-            yt_name = metadata_name or csv_author_name
-            yt_url = metadata_url
-        elif platform == "niconico":
-            nico_name = metadata_name or csv_author_name
-            nico_url = metadata_url
-        elif platform == "twitter":
-            twitter_name = metadata_name or csv_author_name
-            twitter_url = metadata_url
-            twitter_avatar = author_info.get("avatar")
-    else:
-        # No platform info, use CSV name for both
-        yt_name = csv_author_name
-        nico_name = csv_author_name
-
-    # Show which fields would be populated
-    populated_fields = []
-    if yt_name:
-        populated_fields.append(f"yt_name='{yt_name}'")
-    if yt_url:
-        populated_fields.append(f"yt_url='{yt_url}'")
-    if nico_name:
-        populated_fields.append(f"nico_name='{nico_name}'")
-    if nico_url:
-        populated_fields.append(f"nico_url='{nico_url}'")
-    if twitter_name:
-        populated_fields.append(f"twitter_name='{twitter_name}'")
-    if twitter_url:
-        populated_fields.append(f"twitter_url='{twitter_url}'")
-    if twitter_avatar:
-        populated_fields.append(f"twitter_avatar='{twitter_avatar}'")
-
-    print(f"[DRY RUN] Would create author: {', '.join(populated_fields)}")
-
-    # Return display name for video assignment
-    return yt_name or nico_name or twitter_name or csv_author_name
-
-
 def get_author_display_name(conn, author_id):
     """Get author display name based on priority: yt_name > nico_name > twitter_name"""
     cursor = conn.cursor()
@@ -673,6 +1381,212 @@ def get_author_display_name(conn, author_id):
     return "Unknown"
 
 
+# Choices offered for a duplicate original_url, shared by the interactive
+# prompt and --apply-conflicts
+CONFLICT_CHOICES = {"1": "skip", "2": "overwrite", "3": "merge", "4": "add"}
+CONFLICT_MESSAGES = {
+    "skip": "⏭️  Skipped, keeping existing record",
+    "overwrite": "✅ Overwritten existing record",
+    "merge": "🔀 Intelligently merged record",
+    "add": "➕ Force added as new record",
+}
+CONFLICT_FIELDS = [
+    "title",
+    "date",
+    "repost_name",
+    "repost_url",
+    "translation_status",
+    "comment",
+]
+
+
+def apply_conflict_choice(cursor, action, existing, new):
+    """
+    Apply a conflict decision. existing is the row selected by
+    insert_video_wrapper(); new is a dict with author_id, original_url and
+    CONFLICT_FIELDS. Does not commit. Returns 'skipped' / 'updated' / 'inserted'.
+    """
+    (
+        existing_id,
+        existing_title,
+        existing_date,
+        existing_repost_name,
+        existing_repost_url,
+        existing_translation_status,
+        existing_comment,
+        existing_author_id,
+    ) = existing
+
+    if action == "skip":
+        return "skipped"
+    elif action == "overwrite":
+        # Overwrite existing record
+        cursor.execute(
+            """
+            UPDATE videos SET 
+            author = ?, original_name = ?, date = ?, 
+            repost_name = ?, repost_url = ?, translation_status = ?, comment = ?
+            WHERE id = ?
+        """,
+            (
+                new["author_id"],
+                new["title"],
+                new["date"],
+                new["repost_name"],
+                new["repost_url"],
+                new["translation_status"],
+                new["comment"],
+                existing_id,
+            ),
+        )
+        return "updated"
+    elif action == "merge":
+        # Intelligent merge
+        merged_title = new["title"] if new["title"] else existing_title
+        merged_date = new["date"] if new["date"] else existing_date
+        merged_repost_name = new["repost_name"] or existing_repost_name
+        merged_repost_url = new["repost_url"] or existing_repost_url
+        merged_comment = new["comment"] or existing_comment
+        translation_status = new["translation_status"]
+        # Choose better translation status (smaller value is better, but exclude 0)
+        if translation_status and existing_translation_status:
+            merged_translation_status = min(
+                translation_status, existing_translation_status
+            )
+        else:
+            merged_translation_status = (
+                translation_status or existing_translation_status
+            )
+
+        cursor.execute(
+            """
+            UPDATE videos SET 
+            original_name = ?, date = ?, 
+            repost_name = ?, repost_url = ?, translation_status = ?, comment = ?
+            WHERE id = ?
+        """,
+            (
+                merged_title,
+                merged_date,
+                merged_repost_name,
+                merged_repost_url,
+                merged_translation_status,
+                merged_comment,
+                existing_id,
+            ),
+        )
+        return "updated"
+    elif action == "add":
+        # Force add new record
+        cursor.execute(
+            """
+            INSERT INTO videos 
+            (author, original_name, original_url, date, repost_name, repost_url, translation_status, comment)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                new["author_id"],
+                new["title"],
+                new["original_url"],
+                new["date"],
+                new["repost_name"],
+                new["repost_url"],
+                new["translation_status"],
+                new["comment"],
+            ),
+        )
+        return "inserted"
+    raise ValueError(f"Unknown conflict action: {action}")
+
+
+def write_conflict_review(review_file, conflicts):
+    """Write deferred conflicts side by side; fill in the decision column, then --apply-conflicts"""
+    with open(review_file, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        header = ["decision", "line", "original_url", "existing_id", "new_author_id"]
+        for field in CONFLICT_FIELDS:
+            header += [f"existing_{field}", f"new_{field}"]
+        header += ["existing_author", "new_author", "supplementary_note"]
+        writer.writerow(header)
+        for conflict in conflicts:
+            existing = conflict["existing"]
+            new = conflict["new"]
+            existing_values = dict(zip(CONFLICT_FIELDS, existing[1:7]))
+            row = [
+                "",
+                conflict["line_num"],
+                new["original_url"],
+                existing[0],
+                new["author_id"],
+            ]
+            for field in CONFLICT_FIELDS:
+                row += [existing_values[field], new[field]]
+            row += [
+                conflict["existing_author"],
+                conflict["new_author"],
+                conflict["supplementary_note"],
+            ]
+            writer.writerow(["" if v is None else v for v in row])
+
+
+def apply_conflict_review(conn, review_file, dry_run=False, debug=False):
+    """Apply the decisions in a review file in one transaction"""
+    stats = {"skipped": 0, "updated": 0, "inserted": 0, "pending": 0, "errors": 0}
+    actions = set(CONFLICT_CHOICES.values())
+    with open(review_file, "r", encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    cursor = conn.cursor()
+    try:
+        for row in rows:
+            decision = row["decision"].strip().lower()
+            action = CONFLICT_CHOICES.get(decision, decision)
+            if not action:
+                stats["pending"] += 1
+                continue
+            if action not in actions:
+                print(f"❌ Line {row['line']}: unknown decision '{decision}'")
+                stats["errors"] += 1
+                continue
+
+            cursor.execute(
+                """
+                SELECT id, original_name, date, repost_name, repost_url, translation_status, comment, author FROM videos 
+                WHERE id = ?
+            """,
+                (int(row["existing_id"]),),
+            )
+            existing = cursor.fetchone()
+            if existing is None:
+                print(
+                    f"❌ Line {row['line']}: video {row['existing_id']} no longer exists"
+                )
+                stats["errors"] += 1
+                continue
+
+            new = {field: row[f"new_{field}"] or None for field in CONFLICT_FIELDS}
+            status = new["translation_status"]
+            new["translation_status"] = (
+                int(status) if status and status.isdigit() else 0
+            )
+            new["author_id"] = int(row["new_author_id"])
+            new["original_url"] = row["original_url"]
+
+            result = apply_conflict_choice(cursor, action, existing, new)
+            stats[result] += 1
+            if debug:
+                print(f"Line {row['line']}: {CONFLICT_MESSAGES[action]}")
+    except Exception:
+        conn.rollback()
+        raise
+
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+    return stats
+
+
 def insert_video_wrapper(
     conn,
     author_id,
@@ -686,6 +1600,8 @@ def insert_video_wrapper(
     debug=False,
     interactive_mode=False,
     supplementary_note=None,
+    conflict_queue=None,
+    line_num=None,
 ):
     """Video insertion wrapper function, adapted for new database structure
 
@@ -693,25 +1609,41 @@ def insert_video_wrapper(
     'inserted': Inserted new video
     'updated': Updated existing video
     'skipped': Skipped (exists and no update needed)
+    'deferred': Conflict queued in conflict_queue (interactive mode only)
     'cancelled': User cancelled operation
     """
     cursor = conn.cursor()
 
-    try:
+    try:
+        original_key = original_video_key(original_url, repost_url)
+        params = (
+            author_id,
+            title,
+            original_url,
+            date_str,
+            repost_name,
+            repost_url,
+            translation_status,
+            comment,
+            original_key,
+        )
+
+        if not interactive_mode:
+            # Auto-processing mode: insert, or merge into the row with the same key
+            return upsert_video(conn, params, debug)
+
         # Check if record with same original video link already exists
-        # If original_url is empty, skip duplicate check and insert directly
-        if original_url and original_url.strip():
+        # (rows without any link have no key and are always inserted)
+        existing = None
+        if original_key is not None:
             cursor.execute(
                 """
                 SELECT id, original_name, date, repost_name, repost_url, translation_status, comment, author FROM videos 
-                WHERE original_url = ?
+                WHERE original_key = ?
             """,
-                (original_url,),
+                (original_key,),
             )
-
             existing = cursor.fetchone()
-        else:
-            existing = None  # For empty URLs, skip duplicate check and insert new record directly
 
         if existing:
             (
@@ -725,6 +1657,35 @@ def insert_video_wrapper(
                 existing_author_id,
             ) = existing
 
+            new_record = {
+                "author_id": author_id,
+                "original_url": original_url,
+                "title": title,
+                "date": date_str,
+                "repost_name": repost_name,
+                "repost_url": repost_url,
+                "translation_status": translation_status,
+                "comment": comment,
+            }
+
+            if interactive_mode and conflict_queue is not None:
+                # Deferred mode: queue the conflict for --apply-conflicts and move on
+                conflict_queue.append(
+                    {
+                        "existing": existing,
+                        "existing_author": get_author_display_name(
+                            conn, existing_author_id
+                        ),
+                        "new": new_record,
+                        "new_author": get_author_display_name(conn, author_id),
+                        "supplementary_note": supplementary_note,
+                        "line_num": line_num,
+                    }
+                )
+                if debug:
+                    print(f"📋 Deferred conflict for review: {original_url}")
+                return "deferred"
+
             if interactive_mode:
                 # Interactive mode: Show conflict information and let user choose
                 print(f"\n🔄 Found duplicate original video link:")
@@ -783,184 +1744,22 @@ def insert_video_wrapper(
                 if choice == "q":
                     print("🛑 User chose to exit program")
                     return "cancelled"
-                elif choice == "1":
-                    print("⏭️  Skipped, keeping existing record")
-                    return "skipped"
-                elif choice == "2":
-                    # Overwrite existing record
-                    cursor.execute(
-                        """
-                        UPDATE videos SET 
-                        author = ?, original_name = ?, date = ?, 
-                        repost_name = ?, repost_url = ?, translation_status = ?, comment = ?
-                        WHERE id = ?
-                    """,
-                        (
-                            author_id,
-                            title,
-                            date_str,
-                            repost_name,
-                            repost_url,
-                            translation_status,
-                            comment,
-                            existing_id,
-                        ),
-                    )
-                    conn.commit()
-                    print("✅ Overwritten existing record")
-                    return "updated"
-                elif choice == "3":
-                    # Intelligent merge
-                    merged_title = title if title else existing_title
-                    merged_date = date_str if date_str else existing_date
-                    merged_repost_name = repost_name or existing_repost_name
-                    merged_repost_url = repost_url or existing_repost_url
-                    merged_comment = comment or existing_comment
-                    # Choose better translation status (smaller value is better, but exclude 0)
-                    if translation_status and existing_translation_status:
-                        merged_translation_status = min(
-                            translation_status, existing_translation_status
-                        )
-                    else:
-                        merged_translation_status = (
-                            translation_status or existing_translation_status
-                        )
-
-                    cursor.execute(
-                        """
-                        UPDATE videos SET 
-                        original_name = ?, date = ?, 
-                        repost_name = ?, repost_url = ?, translation_status = ?, comment = ?
-                        WHERE id = ?
-                    """,
-                        (
-                            merged_title,
-                            merged_date,
-                            merged_repost_name,
-                            merged_repost_url,
-                            merged_translation_status,
-                            merged_comment,
-                            existing_id,
-                        ),
-                    )
-                    conn.commit()
-                    print("🔀 Intelligently merged record")
-                    return "updated"
-                elif choice == "4":
-                    # Force add new record
-                    cursor.execute(
-                        """
-                        INSERT INTO videos 
-                        (author, original_name, original_url, date, repost_name, repost_url, translation_status, comment)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            author_id,
-                            title,
-                            original_url,
-                            date_str,
-                            repost_name,
-                            repost_url,
-                            translation_status,
-                            comment,
-                        ),
-                    )
-                    conn.commit()
-                    print("➕ Force added as new record")
-                    return "inserted"
 
-            else:
-                # Auto-processing mode: Intelligently merge information
-                should_update = False
-                update_fields = []
-                params = []
-
-                # If existing record has no repost info but new record does, update
-                if not existing_repost_name and repost_name:
-                    update_fields.append("repost_name = ?")
-                    params.append(repost_name)
-                    should_update = True
-
-                if not existing_repost_url and repost_url:
-                    update_fields.append("repost_url = ?")
-                    params.append(repost_url)
-                    should_update = True
-
-                # If existing record has no date but new record does, update
-                if not existing_date and date_str:
-                    update_fields.append("date = ?")
-                    params.append(date_str)
-                    should_update = True
-
-                # If existing record has no notes but new record does, update
-                if not existing_comment and comment:
-                    update_fields.append("comment = ?")
-                    params.append(comment)
-                    should_update = True
-
-                # If new record has better translation status (smaller value usually means better translation), update
-                if translation_status and (
-                    not existing_translation_status
-                    or (
-                        translation_status > 0
-                        and translation_status < existing_translation_status
-                    )
-                ):
-                    update_fields.append("translation_status = ?")
-                    params.append(translation_status)
-                    should_update = True
-
-                if should_update:
-                    params.append(existing_id)
-                    update_query = (
-                        f"UPDATE videos SET {', '.join(update_fields)} WHERE id = ?"
-                    )
-                    cursor.execute(update_query, params)
+                action = CONFLICT_CHOICES[choice]
+                result = apply_conflict_choice(cursor, action, existing, new_record)
+                if result != "skipped":
                     conn.commit()
-
-                    if debug:
-                        print(f"🔄 Auto-updated existing video info: {title}")
-                        if repost_name and not existing_repost_name:
-                            print(f"  ➕ Added repost title: {repost_name}")
-                        if repost_url and not existing_repost_url:
-                            print(f"  ➕ Added repost link: {repost_url}")
-                        if date_str and not existing_date:
-                            print(f"  ➕ Added release date: {date_str}")
-                        if comment and not existing_comment:
-                            print(f"  ➕ Added notes: {comment}")
-                        if translation_status and (
-                            not existing_translation_status
-                            or translation_status < existing_translation_status
-                        ):
-                            print(
-                                f"  🔄 Updated translation status: {get_translation_status_text(existing_translation_status)} -> {get_translation_status_text(translation_status)}"
-                            )
-
-                    return "updated"
-                else:
-                    if debug:
-                        print(
-                            f"⏭️  Video already exists and info is complete, skipping: {original_url}"
-                        )
-                    return "skipped"
+                print(CONFLICT_MESSAGES[action])
+                return result
 
         # Insert new video
         cursor.execute(
             """
             INSERT INTO videos 
-            (author, original_name, original_url, date, repost_name, repost_url, translation_status, comment)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            (author, original_name, original_url, date, repost_name, repost_url, translation_status, comment, original_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-            (
-                author_id,
-                title,
-                original_url,
-                date_str,
-                repost_name,
-                repost_url,
-                translation_status,
-                comment,
-            ),
+            params,
         )
 
         conn.commit()
@@ -987,6 +1786,71 @@ def insert_video_wrapper(
         return "error"
 
 
+# Auto-merge rules as one statement: fill empty repost name/link, date and
+# notes, and take the new translation status when the old one is unset or
+# worse (smaller non-zero value is better). The WHERE makes a no-op merge
+# write nothing, so it can be reported as skipped.
+UPSERT_VIDEO_SQL = """
+    INSERT INTO videos
+    (author, original_name, original_url, date, repost_name, repost_url, translation_status, comment, original_key)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(original_key) WHERE original_key IS NOT NULL DO UPDATE SET
+        repost_name = COALESCE(NULLIF(repost_name, ''), excluded.repost_name),
+        repost_url = COALESCE(NULLIF(repost_url, ''), excluded.repost_url),
+        date = COALESCE(NULLIF(date, ''), excluded.date),
+        comment = COALESCE(NULLIF(comment, ''), excluded.comment),
+        translation_status = CASE
+            WHEN excluded.translation_status
+                AND (NOT COALESCE(translation_status, 0)
+                     OR (excluded.translation_status > 0
+                         AND excluded.translation_status < translation_status))
+            THEN excluded.translation_status
+            ELSE translation_status
+        END
+    WHERE (COALESCE(repost_name, '') = '' AND COALESCE(excluded.repost_name, '') != '')
+        OR (COALESCE(repost_url, '') = '' AND COALESCE(excluded.repost_url, '') != '')
+        OR (COALESCE(date, '') = '' AND COALESCE(excluded.date, '') != '')
+        OR (COALESCE(comment, '') = '' AND COALESCE(excluded.comment, '') != '')
+        OR (excluded.translation_status
+            AND (NOT COALESCE(translation_status, 0)
+                 OR (excluded.translation_status > 0
+                     AND excluded.translation_status < translation_status)))
+    RETURNING id
+"""
+
+
+def upsert_video(conn, params, debug=False):
+    """
+    Auto-merge insert through the original_key index (UPSERT_VIDEO_SQL).
+    Returns 'inserted', 'updated' or 'skipped'.
+    """
+    cursor = conn.cursor()
+    # videos.id is AUTOINCREMENT: an inserted row always gets an id above the
+    # current sequence value, an updated row never does
+    last_id = cursor.execute(
+        "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'videos'"
+    ).fetchone()[0]
+    cursor.execute(UPSERT_VIDEO_SQL, params)
+    row = cursor.fetchone()
+    cursor.fetchall()
+    conn.commit()
+
+    title, original_url = params[1], params[2]
+    if row is None:
+        if debug:
+            print(
+                f"⏭️  Video already exists and info is complete, skipping: {original_url}"
+            )
+        return "skipped"
+    if row[0] > last_id:
+        if debug:
+            print(f"➕ Inserted new video: {title or 'No title'}")
+        return "inserted"
+    if debug:
+        print(f"🔄 Auto-updated existing video info (ID: {row[0]}): {title}")
+    return "updated"
+
+
 def get_translation_status_text(status):
     """Get text description of translation status"""
     status_map = {
@@ -1052,42 +1916,28 @@ def insert_video(
 
 
 def parse_csv_line(line, debug=False):
-    """Parse CSV line, return processed data"""
-    parts = [part.strip() for part in line.split(",")]
-
-    # Ensure at least 7 columns
-    while len(parts) < 7:
-        parts.append("")
-
-    author_name = parts[0]
-    original_url = parts[1]
-    repost_name = parts[2] if parts[2] else None  # Repost title
-    repost_url = parts[3] if parts[3] else None  # Repost link
-    translation_status = parts[4]
-    comment = parts[5] if parts[5] else None  # Notes (for database)
-    supplementary_note = (
-        parts[6] if parts[6] else None
-    )  # Supplementary note (for display only)
+    """Parse one CSV line (quoted fields allowed), return processed data"""
+    row = next(read_csv_rows([line]), None) or SourceRow.from_parts(0, "", [])
 
     if debug:
         print(f"Parsing CSV line:")
-        print(f"  Author: {author_name}")
-        print(f"  Original video link: {original_url}")
-        print(f"  Repost title: {repost_name}")
-        print(f"  Repost link: {repost_url}")
-        print(f"  Translation status: {translation_status}")
-        print(f"  Notes: {comment}")
-        if supplementary_note:
-            print(f"  Supplementary note: {supplementary_note}")
+        print(f"  Author: {row.author}")
+        print(f"  Original video link: {row.original_url}")
+        print(f"  Repost title: {row.repost_name}")
+        print(f"  Repost link: {row.repost_url}")
+        print(f"  Translation status: {row.translation_status}")
+        print(f"  Notes: {row.comment}")
+        if row.supplementary_note:
+            print(f"  Supplementary note: {row.supplementary_note}")
 
     return (
-        author_name,
-        original_url,
-        repost_name,
-        repost_url,
-        translation_status,
-        comment,
-        supplementary_note,
+        row.author,
+        row.original_url,
+        row.repost_name,
+        row.repost_url,
+        row.translation_status,
+        row.comment,
+        row.supplementary_note,
     )
 
 
@@ -1107,17 +1957,290 @@ def write_error_to_csv(error_file, line_num, line_content, error_msg):
         writer.writerow([line_num, line_content, error_msg])
 
 
+class RowOutcome(NamedTuple):
+    """What import_rows() did with one row (for the --dry-run report)"""
+
+    line_num: int
+    outcome: str  # inserted / updated / skipped / deferred / error / invalid
+    author_id: Optional[int]
+    original_url: str
+
+
+class SourceRow(NamedTuple):
+    """One input row, from a CSV file or from the online sheet"""
+
+    line_num: int  # CSV line number, or 1-based sheet row number
+    raw: str  # Original line content, used for the error CSV
+    column_count: int
+    author: str
+    original_url: str
+    repost_name: Optional[str]
+    repost_url: Optional[str]
+    translation_status: str
+    comment: Optional[str]  # Notes (for database)
+    supplementary_note: Optional[str]  # For display only
+
+    @classmethod
+    def from_parts(cls, line_num, raw, parts):
+        parts = [part.strip() for part in parts]
+        padded = parts + [""] * (7 - len(parts))
+        return cls(
+            line_num,
+            raw,
+            len(parts),
+            padded[0],
+            padded[1],
+            padded[2] or None,
+            padded[3] or None,
+            padded[4],
+            padded[5] or None,
+            padded[6] or None,
+        )
+
+
+# Rows per batch when streaming a CSV file: metadata is prefetched for one
+# batch at a time, so memory does not grow with the file size
+CSV_BATCH_ROWS = 500
+
+
+def read_csv_rows(lines):
+    """
+    Yield a SourceRow for every non-empty record of an iterable of CSV lines.
+    Fields follow RFC 4180 (quoted commas, doubled quotes, line breaks inside
+    quotes); line_num is the line a record starts on and raw is its exact text.
+    """
+    consumed = []
+
+    def tap():
+        for line in lines:
+            consumed.append(line)
+            yield line
+
+    # csv.reader pulls only the lines of the record it is returning, so
+    # `consumed` holds exactly that record's source text
+    reader = csv.reader(tap())
+    for parts in reader:
+        raw = "".join(consumed).strip()
+        line_num = reader.line_num - len(consumed) + 1
+        consumed.clear()
+        if not raw:
+            continue
+        yield SourceRow.from_parts(line_num, raw, parts)
+
+
+def iter_csv_rows(input_file):
+    """Stream SourceRows from a CSV file (UTF-8, with or without BOM)"""
+    with open(input_file, "r", encoding="utf-8-sig", newline="") as f:
+        yield from read_csv_rows(f)
+
+
+def iter_batches(rows, size=CSV_BATCH_ROWS):
+    """Group a row stream into lists of at most size rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _format_csv_line(parts):
+    """Quote cells the way csv.writer does, for the error CSV"""
+    buf = io.StringIO()
+    csv.writer(buf).writerow(parts)
+    return buf.getvalue().rstrip("\r\n")
+
+
+def load_upload_module():
+    """Load the Tencent Docs helpers from update/autofetch/upload.py"""
+    upload_path = Path(__file__).resolve().parent.parent / "autofetch" / "upload.py"
+    spec = importlib.util.spec_from_file_location("tdocs_upload", upload_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def iter_sheet_batches(upload, file_id, sheet_id):
+    """
+    Read the online sheet range by range, yielding one list of SourceRow per
+    range. Raises upload.SheetReadError when the sheet info or any range
+    cannot be fetched, so no rows are silently left out of the import.
+    """
+    row_count, _ = upload.get_sheet_info(file_id, sheet_id)
+    if row_count == 0:
+        raise upload.SheetReadError("could not get the sheet's row count")
+    for start, api_rows in upload.iter_api_ranges(
+        file_id, sheet_id, row_count, strict=True
+    ):
+        batch = []
+        for offset, api_row in enumerate(api_rows):
+            if upload._is_empty_api_row(api_row):
+                continue
+            parts = [upload._cell_value_to_text(cv).strip() for cv in api_row]
+            while parts and not parts[-1]:
+                parts.pop()
+            batch.append(
+                SourceRow.from_parts(start + offset + 1, _format_csv_line(parts), parts)
+            )
+        yield batch
+
+
+def prefetch(iterable, depth=2):
+    """
+    Consume iterable in a background thread so that producing the next item
+    (e.g. the next sheet range) overlaps with processing the current one.
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+
+    def producer():
+        try:
+            for item in iterable:
+                items.put((item, None))
+        except Exception as e:
+            items.put((None, e))
+        finally:
+            items.put((done, None))
+
+    threading.Thread(target=producer, daemon=True).start()
+    while True:
+        item, error = items.get()
+        if error is not None:
+            raise error
+        if item is done:
+            return
+        yield item
+
+
+class BatchConnection:
+    """
+    Wraps a sqlite3 connection so that the per-row commit() calls made by
+    get_or_create_author() / insert_video_wrapper() are batched.
+
+    Each row runs inside a SAVEPOINT, so a failing row is rolled back on its
+    own without losing the rest of the batch. The real COMMIT happens every
+    batch_rows rows or batch_seconds seconds; with both set to 0 the whole
+    run is a single transaction that is rolled back if the import aborts.
+    """
+
+    def __init__(self, conn, batch_rows=200, batch_seconds=5.0):
+        self._conn = conn
+        self.batch_rows = batch_rows
+        self.batch_seconds = batch_seconds
+        self.atomic = not batch_rows and not batch_seconds
+        self.pending = 0  # Completed rows not yet committed
+        self.commits = 0
+        self._row_open = False
+        self._batch_started = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        # Deferred: committed by maybe_flush() / finish()
+        pass
+
+    def begin_row(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+            self._batch_started = time.monotonic()
+        self._conn.execute("SAVEPOINT csv_row")
+        self._row_open = True
+
+    def end_row(self, ok):
+        if not self._row_open:
+            return
+        if not ok:
+            self._conn.execute("ROLLBACK TO csv_row")
+        self._conn.execute("RELEASE csv_row")
+        self._row_open = False
+        if ok:
+            self.pending += 1
+
+    def maybe_flush(self):
+        if self.atomic or not self.pending:
+            return
+        if (self.batch_rows and self.pending >= self.batch_rows) or (
+            self.batch_seconds
+            and time.monotonic() - self._batch_started >= self.batch_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        if self._conn.in_transaction:
+            self._conn.commit()
+            self.commits += 1
+        self.pending = 0
+        self._batch_started = time.monotonic()
+
+    def finish(self, success=True):
+        """Final commit; an aborted single-transaction import is rolled back."""
+        self.end_row(False)
+        if success or not self.atomic:
+            self.flush()
+        else:
+            self._conn.rollback()
+
+
 def process_csv(
     input_file,
     conn,
     debug=False,
-    dry_run=False,
     skip_metadata=False,
     browser_cookies=None,
     cookies_file=None,
     interactive_mode=False,
+    metadata_cache=None,
+    conflict_queue=None,
+    outcomes=None,
+    fuzzy_authors="auto",
 ):
     """Process CSV file"""
+    # Error file path
+    error_file = input_file.replace(".csv", "_errors.csv")
+
+    # The file is streamed: only one batch of rows is held (and prefetched) at a time
+    return import_rows(
+        iter_batches(iter_csv_rows(input_file)),
+        conn,
+        error_file,
+        debug,
+        skip_metadata,
+        browser_cookies,
+        cookies_file,
+        interactive_mode,
+        metadata_cache,
+        conflict_queue,
+        outcomes,
+        fuzzy_authors,
+    )
+
+
+def import_rows(
+    batches,
+    conn,
+    error_file,
+    debug=False,
+    skip_metadata=False,
+    browser_cookies=None,
+    cookies_file=None,
+    interactive_mode=False,
+    metadata_cache=None,
+    conflict_queue=None,
+    outcomes=None,
+    fuzzy_authors="auto",
+):
+    """
+    Import rows into the database.
+    batches is an iterable of row batches (each an iterable of SourceRow);
+    when conn is a BatchConnection, every row runs in its own savepoint and
+    commits are batched (see BatchConnection).
+    If outcomes is a list, one RowOutcome per row is appended to it.
+    fuzzy_authors is the AuthorIndex near-miss mode (auto / suggest / off).
+    """
+    batching = isinstance(conn, BatchConnection)
     stats = {
         "total_rows": 0,
         "processed_rows": 0,
@@ -1125,127 +2248,135 @@ def process_csv(
         "new_videos": 0,
         "updated_videos": 0,
         "skipped_videos": 0,
+        "deferred_conflicts": 0,
         "errors": 0,
         "cancelled": 0,
+        "fuzzy_author_matches": {},
+        "read_error": None,
     }
 
-    # Error file path
-    error_file = input_file.replace(".csv", "_errors.csv")
-
+    if metadata_cache is None:
+        metadata_cache = MetadataCache()
+    # Name/URL → author id index, replaces per-author table scans
+    author_index = AuthorIndex(conn, fuzzy_authors)
+    stats["fuzzy_author_matches"] = author_index.fuzzy_matches
     author_cache = {}  # Cache author info to avoid repeated metadata retrieval
     author_id_cache = {}  # Cache author IDs to avoid repeated database queries
 
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        for line_num, line in enumerate(lines, 1):
-            original_line = line.strip()
-            if not original_line:
-                continue
-
-            stats["total_rows"] += 1
-
-            # 解析CSV行
-            try:
-                parts = original_line.split(",")
-                if len(parts) < 2:
-                    if debug:
-                        print(f"Skipping line {line_num}: Incorrect format")
-                    continue
-
-                csv_author = clean_author_name(parts[0].strip())
-                original_url = parts[1].strip()
-                repost_name = (
-                    parts[2].strip() if len(parts) > 2 and parts[2].strip() else None
+        for batch in batches:
+            batch = list(batch)
+            # Phase 1: resolve metadata for the whole batch concurrently
+            if not skip_metadata:
+                metadata_cache.prefetch(
+                    [row.original_url for row in batch if row.column_count >= 2],
+                    debug,
+                    browser_cookies,
+                    cookies_file,
                 )
-                repost_url = (
-                    parts[3].strip() if len(parts) > 3 and parts[3].strip() else None
-                )
-                translation_status = parts[4].strip() if len(parts) > 4 else ""
-                comment = (
-                    parts[5].strip() if len(parts) > 5 and parts[5].strip() else None
-                )  # Notes (for database)
-                supplementary_note = (
-                    parts[6].strip() if len(parts) > 6 and parts[6].strip() else None
-                )  # For display only
-
-                # Clean Bilibili links
-                original_url = clean_bilibili_url(original_url)
-                if repost_url:
-                    repost_url = clean_bilibili_url(repost_url)
-
-                # Skip invalid lines - only require author name, other fields can be empty
-                if not csv_author:
-                    if debug:
-                        print(f"Skipping line {line_num}: Author name is empty")
-                    continue
-
-                if debug:
-                    print(f"\nProcessing line {line_num}: {csv_author}")
-                    if repost_name:
-                        print(f"  Repost title: {repost_name}")
+            # Phase 2: sequential database writes in input order
+            for row in batch:
+                line_num = row.line_num
+                original_line = row.raw
+
+                stats["total_rows"] += 1
+                row_ok = False
+                new_author_key = None
+                outcome = "invalid"
+                author_id = None
+                if batching:
+                    conn.begin_row()
+
+                # 解析CSV行
+                try:
+                    if row.column_count < 2:
+                        if debug:
+                            print(f"Skipping line {line_num}: Incorrect format")
+                        continue
+
+                    csv_author = clean_author_name(row.author)
+                    original_url = row.original_url
+                    repost_name = row.repost_name
+                    repost_url = row.repost_url
+                    translation_status = row.translation_status
+                    comment = row.comment  # Notes (for database)
+                    supplementary_note = row.supplementary_note  # For display only
+
+                    # Clean Bilibili links
+                    original_url = clean_bilibili_url(original_url)
                     if repost_url:
-                        print(f"  Repost link: {repost_url}")
-                    if comment:
-                        print(f"  Notes: {comment}")
-                    print(f"  Original video link: {original_url}")
+                        repost_url = clean_bilibili_url(repost_url)
 
-                # Get or use cached author information
-                author_info = None
-                error_occurred = False
+                    # Skip invalid lines - only require author name, other fields can be empty
+                    if not csv_author:
+                        if debug:
+                            print(f"Skipping line {line_num}: Author name is empty")
+                        continue
 
-                if csv_author not in author_cache:
-                    if not skip_metadata and original_url and original_url.strip():
-                        try:
-                            if debug:
+                    if debug:
+                        print(f"\nProcessing line {line_num}: {csv_author}")
+                        if repost_name:
+                            print(f"  Repost title: {repost_name}")
+                        if repost_url:
+                            print(f"  Repost link: {repost_url}")
+                        if comment:
+                            print(f"  Notes: {comment}")
+                        print(f"  Original video link: {original_url}")
+
+                    # Get or use cached author information
+                    author_info = None
+                    error_occurred = False
+
+                    if csv_author not in author_cache:
+                        if not skip_metadata and original_url and original_url.strip():
+                            try:
+                                if debug:
+                                    print(
+                                        f"First time encountering author '{csv_author}', getting metadata: {original_url}"
+                                    )
+                                _, _, author_info = metadata_cache.get(
+                                    original_url, debug, browser_cookies, cookies_file
+                                )
+                            except Exception as e:
+                                error_msg = str(e)
                                 print(
-                                    f"First time encountering author '{csv_author}', getting metadata: {original_url}"
+                                    f"Line {line_num} failed to get metadata: {error_msg}"
                                 )
-                            _, _, author_info = get_video_metadata(
-                                original_url, debug, browser_cookies, cookies_file
-                            )
-                        except Exception as e:
-                            error_msg = str(e)
-                            print(
-                                f"Line {line_num} failed to get metadata: {error_msg}"
-                            )
 
-                            # Record error to CSV file
-                            write_error_to_csv(
-                                error_file, line_num, original_line, error_msg
-                            )
+                                # Record error to CSV file
+                                write_error_to_csv(
+                                    error_file, line_num, original_line, error_msg
+                                )
 
-                            # Check if it's a geo restriction error
-                            if (
-                                "geo restriction" in error_msg.lower()
-                                or "not available from your location"
-                                in error_msg.lower()
-                            ):
+                                # Check if it's a geo restriction error
+                                if (
+                                    "geo restriction" in error_msg.lower()
+                                    or "not available from your location"
+                                    in error_msg.lower()
+                                ):
+                                    print(
+                                        f"  Geo restriction error, but continue processing this line"
+                                    )
+
+                                stats["errors"] += 1
+                                # Don't set error_occurred = True, continue processing this line
+                        else:
+                            if debug and not original_url:
                                 print(
-                                    f"  Geo restriction error, but continue processing this line"
+                                    f"Author '{csv_author}' has no original video link, skipping metadata retrieval"
                                 )
 
-                            stats["errors"] += 1
-                            # Don't set error_occurred = True, continue processing this line
+                        # Store author info in cache, even None should be cached to avoid repeated attempts
+                        author_cache[csv_author] = author_info
                     else:
-                        if debug and not original_url:
-                            print(
-                                f"Author '{csv_author}' has no original video link, skipping metadata retrieval"
-                            )
-
-                    # Store author info in cache, even None should be cached to avoid repeated attempts
-                    author_cache[csv_author] = author_info
-                else:
-                    author_info = author_cache[csv_author]
-                    if debug:
-                        print(f"Using cached author info: {csv_author}")
+                        author_info = author_cache[csv_author]
+                        if debug:
+                            print(f"Using cached author info: {csv_author}")
 
-                # Only skip when author metadata retrieval failed and there's no original video link
-                # If there's repost info, process even if original video info retrieval failed
+                    # Only skip when author metadata retrieval failed and there's no original video link
+                    # If there's repost info, process even if original video info retrieval failed
 
-                # Get or create author (use cache to avoid repeated database queries)
-                if not dry_run:
+                    # Get or create author (use cache to avoid repeated database queries)
                     if csv_author in author_id_cache:
                         author_id = author_id_cache[csv_author]
                         if debug:
@@ -1254,67 +2385,57 @@ def process_csv(
                             )
                     else:
                         author_id = get_or_create_author(
-                            conn, csv_author, author_info, debug
+                            conn, csv_author, author_info, debug, author_index
                         )
                         author_id_cache[csv_author] = author_id
-                else:
-                    # Dry-run mode: simulate author creation and show details
-                    if csv_author in author_id_cache:
-                        author_display_name = author_id_cache[csv_author]
-                        if debug:
+                        new_author_key = csv_author
+
+                    # Get video metadata
+                    title = None
+                    date_str = None
+                    video_error_occurred = False
+
+                    if skip_metadata or not original_url or not original_url.strip():
+                        title = (
+                            repost_name  # Use repost title as title, if none then None
+                        )
+                        date_str = None
+                        if debug and not original_url:
                             print(
-                                f"[DRY RUN] Using cached author: {author_display_name}"
+                                f"  Original video link is empty, using repost title: {title}"
                             )
                     else:
-                        author_display_name = simulate_author_creation(
-                            csv_author, author_info, debug
-                        )
-                        author_id_cache[csv_author] = author_display_name
-                    author_id = 1  # Mock ID
+                        try:
+                            title, date_str, _ = metadata_cache.get(
+                                original_url, debug, browser_cookies, cookies_file
+                            )
+                        except Exception as e:
+                            error_msg = str(e)
+                            print(
+                                f"Line {line_num} failed to get video metadata: {error_msg}"
+                            )
+
+                            # Record error to CSV file
+                            write_error_to_csv(
+                                error_file, line_num, original_line, error_msg
+                            )
 
-                # Get video metadata
-                title = None
-                date_str = None
-                video_error_occurred = False
+                            # Set to empty values
+                            title = None
+                            date_str = None
+                            video_error_occurred = True
 
-                if skip_metadata or not original_url or not original_url.strip():
-                    title = repost_name  # Use repost title as title, if none then None
-                    date_str = None
-                    if debug and not original_url:
-                        print(
-                            f"  Original video link is empty, using repost title: {title}"
-                        )
-                else:
+                    # Process translation status
                     try:
-                        title, date_str, _ = get_video_metadata(
-                            original_url, debug, browser_cookies, cookies_file
-                        )
-                    except Exception as e:
-                        error_msg = str(e)
-                        print(
-                            f"Line {line_num} failed to get video metadata: {error_msg}"
-                        )
-
-                        # Record error to CSV file
-                        write_error_to_csv(
-                            error_file, line_num, original_line, error_msg
+                        translation_status_int = (
+                            int(translation_status)
+                            if translation_status.isdigit()
+                            else 0
                         )
+                    except:
+                        translation_status_int = 0
 
-                        # Set to empty values
-                        title = None
-                        date_str = None
-                        video_error_occurred = True
-
-                # Process translation status
-                try:
-                    translation_status_int = (
-                        int(translation_status) if translation_status.isdigit() else 0
-                    )
-                except:
-                    translation_status_int = 0
-
-                # Insert video
-                if not dry_run:
+                    # Insert video
                     result = insert_video_wrapper(
                         conn,
                         author_id,
@@ -1328,47 +2449,59 @@ def process_csv(
                         debug,
                         interactive_mode,
                         supplementary_note,
+                        conflict_queue,
+                        line_num,
                     )
 
+                    outcome = result
                     if result == "inserted":
                         stats["new_videos"] += 1
                     elif result == "updated":
                         stats["updated_videos"] += 1
                     elif result == "skipped":
                         stats["skipped_videos"] += 1
+                    elif result == "deferred":
+                        stats["deferred_conflicts"] += 1
                     elif result == "cancelled":
                         stats["cancelled"] += 1
                         print("🛑 Program cancelled by user")
                         return stats
                     else:  # error
                         stats["errors"] += 1
-                else:
-                    print(f"[DRY RUN] Will add video: {title or 'No title'}")
-                    print(
-                        f"  → Assigned to author: {author_id_cache.get(csv_author, csv_author)}"
-                    )
-                    if repost_name:
-                        print(f"  Repost title: {repost_name}")
-                    if repost_url:
-                        print(f"  Repost link: {repost_url}")
-                    if comment:
-                        print(f"  Notes: {comment}")
-                    stats["new_videos"] += 1
+                    row_ok = result != "error"
+                    stats["processed_rows"] += 1
 
-                stats["processed_rows"] += 1
+                except Exception as e:
+                    error_msg = f"Error processing line {line_num}: {e}"
+                    print(error_msg)
+                    if debug:
+                        print(f"Line content: {original_line}")
 
-            except Exception as e:
-                error_msg = f"Error processing line {line_num}: {e}"
-                print(error_msg)
-                if debug:
-                    print(f"Line content: {original_line}")
+                    # Record error to CSV file
+                    write_error_to_csv(error_file, line_num, original_line, str(e))
+                    stats["errors"] += 1
+                    outcome = "error"
 
-                # Record error to CSV file
-                write_error_to_csv(error_file, line_num, original_line, str(e))
-                stats["errors"] += 1
+                finally:
+                    if outcomes is not None:
+                        outcomes.append(
+                            RowOutcome(line_num, outcome, author_id, row.original_url)
+                        )
+                    if batching:
+                        conn.end_row(row_ok)
+                        if not row_ok and new_author_key:
+                            # The author insert was rolled back with the row
+                            author_id_cache.pop(new_author_key, None)
+                        conn.maybe_flush()
+                    if author_index is not None:
+                        if row_ok or not batching:
+                            author_index.commit_row()
+                        else:
+                            author_index.rollback_row()
 
     except Exception as e:
-        print(f"Error reading CSV file: {e}")
+        print(f"Error reading rows: {e}")
+        stats["read_error"] = str(e)
         return stats
 
     # If there are errors, notify user
@@ -1378,6 +2511,43 @@ def process_csv(
     return stats
 
 
+def print_dry_run_report(conn, outcomes, first_new_author):
+    """Per-row outcomes of a dry run, read back from the in-memory copy"""
+    author_ids = {o.author_id for o in outcomes if o.author_id is not None}
+    names = dict(
+        conn.execute(
+            "SELECT id, COALESCE(yt_name, nico_name, twitter_name) FROM authors"
+        )
+        if author_ids
+        else []
+    )
+
+    labels = {
+        "inserted": "➕ insert",
+        "updated": "🔀 update",
+        "skipped": "⏭️  skip",
+        "deferred": "❓ conflict",
+        "error": "❌ error",
+        "invalid": "⚪ invalid",
+    }
+    print(f"\n=== 🧪 Dry Run: Per-row Outcome ===")
+    for o in outcomes:
+        label = labels.get(o.outcome, o.outcome)
+        author = ""
+        if o.author_id is not None:
+            new = " (new)" if o.author_id >= first_new_author else ""
+            author = f" → author {o.author_id}{new} {names.get(o.author_id) or ''}"
+        print(f"Line {o.line_num}: {label}{author}  {o.original_url}")
+
+    new_authors = [a for a in author_ids if a >= first_new_author]
+    print(f"\nNew authors: {len(new_authors)}")
+    counts = {}
+    for o in outcomes:
+        counts[o.outcome] = counts.get(o.outcome, 0) + 1
+    print("Outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+    print("*** DRY RUN - nothing was written to the database ***")
+
+
 def main():
     _default_db = str(
         Path(os.environ.get("PROJECT_ROOT", str(Path(__file__).parent.parent)))
@@ -1387,7 +2557,9 @@ def main():
     parser = argparse.ArgumentParser(
         description="Import video data from CSV file to database"
     )
-    parser.add_argument("csv_file", help="CSV file path")
+    parser.add_argument(
+        "csv_file", nargs="?", help="CSV file path (omit with --from-sheet)"
+    )
     parser.add_argument("--db-path", default=_default_db, help="Database path")
     parser.add_argument(
         "--debug",
@@ -1395,7 +2567,19 @@ def main():
         help="Enable debug mode for detailed information",
     )
     parser.add_argument(
-        "--dry-run", action="store_true", help="Check only, do not actually import"
+        "--dry-run",
+        action="store_true",
+        help="Run the real import against an in-memory copy of the database and report exact counts and per-row outcomes; the database file is not modified",
+    )
+    parser.add_argument(
+        "--fast-metadata",
+        action="store_true",
+        help="Read title/date/uploader from cheap endpoints (YouTube oEmbed + watch page, NicoNico getthumbinfo, fxtwitter) and only fall back to yt-dlp when they fail. Endpoints can be overridden with YOUTUBE_API_BASE, NICO_THUMBINFO_API_BASE and FXTWITTER_API_BASE",
+    )
+    parser.add_argument(
+        "--offline-metadata",
+        action="store_true",
+        help="Never run yt-dlp: use --metadata-cache entries only, links missing from it are treated like --skip-metadata",
     )
     parser.add_argument(
         "--skip-metadata",
@@ -1423,10 +2607,87 @@ def main():
         help="Enable auto-merge mode: intelligently handle duplicate links, skip interaction",
     )
 
+    parser.add_argument(
+        "--defer-conflicts",
+        type=str,
+        metavar="REVIEW_CSV",
+        help="Interactive mode without prompts: import all non-conflicting rows, write duplicate-link conflicts (existing and new values side by side) to REVIEW_CSV",
+    )
+    parser.add_argument(
+        "--apply-conflicts",
+        type=str,
+        metavar="REVIEW_CSV",
+        help="Apply the decisions (skip/overwrite/merge/add or 1-4) filled into a review file from --defer-conflicts, in one transaction",
+    )
+
+    parser.add_argument(
+        "--fuzzy-authors",
+        choices=["auto", "suggest", "off"],
+        default="auto",
+        help="Near-miss author names (full-width/half-width, case, punctuation, spaces): auto = reuse the existing author unless the name is ambiguous or the channel URL differs, suggest = only report, off = exact names only (default: auto)",
+    )
+    parser.add_argument(
+        "--from-sheet",
+        action="store_true",
+        help="Read rows directly from the Tencent Docs sheet configured in update/autofetch/config/upload.jsonc instead of a CSV file; commits follow --commit-every / --commit-interval",
+    )
+    parser.add_argument("--file-id", help="Tencent Docs fileId (with --from-sheet)")
+    parser.add_argument("--sheet-id", help="Tencent Docs sheetId (with --from-sheet)")
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=200,
+        help="Commit after this many imported rows (default: 200). Each row is isolated in a savepoint",
+    )
+    parser.add_argument(
+        "--commit-interval",
+        type=float,
+        default=5.0,
+        help="Also commit when this many seconds have passed since the last commit (default: 5). Use --commit-every 0 --commit-interval 0 for a single all-or-nothing transaction",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads used to prefetch metadata before the database phase (default: 4, 0 = fetch inline row by row)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="PLATFORM=RPS",
+        help="Max metadata requests per second for a platform during prefetch (youtube, niconico, twitter, bilibili, other), e.g. --rate-limit youtube=3. Repeatable",
+    )
+    parser.add_argument(
+        "--metadata-cache",
+        type=str,
+        help="JSON file to keep extracted video metadata in across runs (within a run every URL is only extracted once regardless)",
+    )
+
     args = parser.parse_args()
 
+    if args.from_sheet:
+        try:
+            upload = load_upload_module()
+        except ImportError as e:
+            print(f"Error: --from-sheet requires requests and json5: {e}")
+            sys.exit(1)
+        upload_cfg = upload.load_upload_config()
+        file_id = args.file_id or upload_cfg.get("file_id")
+        sheet_id = args.sheet_id or upload_cfg.get("sheet_id")
+        if not file_id or not sheet_id:
+            print("Error: missing file_id or sheet_id")
+            sys.exit(1)
+    elif args.apply_conflicts:
+        if not os.path.exists(args.apply_conflicts):
+            print(f"Error: review file does not exist: {args.apply_conflicts}")
+            sys.exit(1)
+    elif not args.csv_file:
+        parser.error(
+            "csv_file is required unless --from-sheet or --apply-conflicts is given"
+        )
     # Check if CSV file exists
-    if not os.path.exists(args.csv_file):
+    elif not os.path.exists(args.csv_file):
         print(f"Error: CSV file does not exist: {args.csv_file}")
         sys.exit(1)
 
@@ -1441,10 +2702,51 @@ def main():
         print("Unable to connect to database")
         sys.exit(1)
 
+    if args.apply_conflicts:
+        try:
+            print(f"\nApplying conflict decisions: {args.apply_conflicts}")
+            if args.dry_run:
+                print("*** DRY RUN mode - Database will not be actually modified ***")
+            result = apply_conflict_review(
+                conn, args.apply_conflicts, args.dry_run, args.debug
+            )
+            print(f"\n=== 📊 Conflict Review Applied ===")
+            print(f"Updated videos: {result['updated']}")
+            print(f"Added videos: {result['inserted']}")
+            print(f"Skipped: {result['skipped']}")
+            print(f"No decision yet: {result['pending']}")
+            print(f"Errors: {result['errors']}")
+        finally:
+            conn.close()
+        return
+
+    if args.dry_run:
+        # Exact dry run: same code path, but on a throwaway copy
+        start = time.monotonic()
+        work_conn = copy_to_memory(conn)
+        print(
+            f"*** DRY RUN: database copied into memory in {time.monotonic() - start:.2f}s ***"
+        )
+    else:
+        work_conn = conn
+    ensure_original_key(work_conn, args.debug)
+    first_new_author = work_conn.execute(
+        "SELECT COALESCE(MAX(id), 0) + 1 FROM authors"
+    ).fetchone()[0]
+    db = BatchConnection(work_conn, args.commit_every, args.commit_interval)
+    outcomes = [] if args.dry_run else None
+    finished = False
     try:
-        print(f"\nStarting CSV file processing: {args.csv_file}")
+        if args.from_sheet:
+            print(f"\nStarting sheet import: fileId={file_id} sheetId={sheet_id}")
+        else:
+            print(f"\nStarting CSV file processing: {args.csv_file}")
         if args.dry_run:
             print("*** DRY RUN mode - Database will not be actually modified ***")
+        if args.offline_metadata:
+            print("*** Offline metadata - only cached metadata is used ***")
+        elif args.fast_metadata:
+            print("*** Fast metadata - yt-dlp only as fallback ***")
         if args.skip_metadata:
             print(
                 "*** Skip metadata mode - Use titles from CSV, do not get release dates ***"
@@ -1467,17 +2769,78 @@ def main():
         else:
             print("*** 🤖 Auto-merge mode: Intelligently handle duplicate links ***")
 
-        # Process CSV
-        stats = process_csv(
-            args.csv_file,
-            conn,
-            args.debug,
-            args.dry_run,
-            args.skip_metadata,
-            args.cookies_from_browser,
-            args.cookies,
-            interactive_mode,
+        rate_limits = {}
+        for spec in args.rate_limit:
+            platform, _, rate = spec.partition("=")
+            try:
+                rate_limits[platform.strip()] = float(rate)
+            except ValueError:
+                print(f"Error: invalid --rate-limit '{spec}', expected PLATFORM=RPS")
+                sys.exit(1)
+        metadata_cache = MetadataCache(
+            args.metadata_cache,
+            args.workers,
+            rate_limits,
+            args.offline_metadata,
+            args.fast_metadata,
         )
+        conflict_queue = None
+        if args.dry_run and interactive_mode:
+            # Never prompt during a dry run; conflicts are only reported
+            conflict_queue = []
+            print("*** Duplicate links are reported as conflicts, not prompted ***")
+        elif args.defer_conflicts and interactive_mode:
+            conflict_queue = []
+            print(
+                f"*** 📋 Deferred conflicts: duplicates go to {args.defer_conflicts} for review ***"
+            )
+        if args.metadata_cache:
+            print(
+                f"*** Metadata cache: {args.metadata_cache} ({len(metadata_cache.disk)} entries) ***"
+            )
+
+        if args.from_sheet:
+            # Ranges are fetched in the background while earlier ones are imported
+            stats = import_rows(
+                prefetch(iter_sheet_batches(upload, file_id, sheet_id)),
+                db,
+                f"sheet-{sheet_id}_errors.csv",
+                args.debug,
+                args.skip_metadata,
+                args.cookies_from_browser,
+                args.cookies,
+                interactive_mode,
+                metadata_cache,
+                conflict_queue,
+                outcomes,
+                args.fuzzy_authors,
+            )
+        else:
+            # Process CSV
+            stats = process_csv(
+                args.csv_file,
+                db,
+                args.debug,
+                args.skip_metadata,
+                args.cookies_from_browser,
+                args.cookies,
+                interactive_mode,
+                metadata_cache,
+                conflict_queue,
+                outcomes,
+                args.fuzzy_authors,
+            )
+
+        if stats["read_error"]:
+            # Left unfinished: the finally block keeps completed rows, or
+            # rolls everything back when importing in one transaction
+            print(
+                f"\n❌ Import aborted, not every row could be read: {stats['read_error']}"
+            )
+            sys.exit(1)
+
+        db.finish()
+        finished = True
 
         # Print statistics
         print(f"\n=== 📊 Processing Complete ===")
@@ -1488,9 +2851,64 @@ def main():
         print(f"Skipped videos: {stats['skipped_videos']}")
         if stats["cancelled"] > 0:
             print(f"User cancelled: {stats['cancelled']}")
+        if conflict_queue is not None:
+            print(f"Deferred conflicts: {stats['deferred_conflicts']}")
         print(f"Error rows: {stats['errors']}")
+        fuzzy_matches = stats["fuzzy_author_matches"]
+        if fuzzy_matches:
+            resolved = [n for n, m in fuzzy_matches.items() if m[1] == "resolved"]
+            suggested = [n for n, m in fuzzy_matches.items() if m[1] == "suggested"]
+            print(
+                f"Fuzzy author matches: {len(resolved)} new authors avoided, "
+                f"{len(suggested)} suggested"
+            )
+            for name in suggested[:20]:
+                author_id, _, reason = fuzzy_matches[name]
+                print(f"   💡 '{name}' ~ author ID {author_id} ({reason})")
+        cache_stats = metadata_cache.stats
+        print(
+            f"Metadata extractions: {cache_stats['extractions']} "
+            f"(prefetched: {cache_stats['prefetched']}, failed: {cache_stats['failed']}, "
+            f"reused in run: {cache_stats['cache_hits']}, "
+            f"from disk cache: {cache_stats['disk_hits']})"
+        )
+        if args.offline_metadata:
+            print(
+                f"Links missing from the metadata cache: {cache_stats['offline_misses']}"
+            )
+        if args.fast_metadata:
+            print(
+                f"Fast metadata: {FAST_METADATA_STATS['resolved']} resolved, "
+                f"{FAST_METADATA_STATS['fallback']} fell back to yt-dlp"
+            )
+        ydl_stats = YDL_POOL.stats
+        if ydl_stats["created"]:
+            print(
+                f"yt-dlp instances: {ydl_stats['created']} "
+                f"(reused: {ydl_stats['reused']}, browser cookie loads: {ydl_stats['cookie_loads']})"
+            )
+        if not args.dry_run:
+            print(f"Commits: {db.commits}")
+        metadata_cache.save()
+        if outcomes is not None:
+            print_dry_run_report(work_conn, outcomes, first_new_author)
+        elif conflict_queue:
+            write_conflict_review(args.defer_conflicts, conflict_queue)
+            print(
+                f"\n📋 {len(conflict_queue)} conflicts written to {args.defer_conflicts}"
+            )
+            print(
+                "   Fill in the decision column (skip/overwrite/merge/add), then run:"
+            )
+            print(f"   python3 csv-import.py --apply-conflicts {args.defer_conflicts}")
 
     finally:
+        if not finished:
+            # Interrupted: keep completed rows unless running as one transaction
+            db.finish(success=False)
+        YDL_POOL.close()
+        if work_conn is not conn:
+            work_conn.close()
         conn.close()
 
 
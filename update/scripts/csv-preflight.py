@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Offline preflight check for csv-import.py input
+
+Validates a CSV in one pass before any metadata request is made, using the
+same parsing and link canonicalization as csv-import.py and the original_key
+values already in the database. Nothing is fetched and nothing is written to
+the database.
+
+Checks (severity / code):
+    error    too_few_columns      fewer than 2 columns
+    error    empty_author         no author name
+    error    bad_status           translation status is not 0-5
+    error    malformed_url        not an http(s) link
+    error    short_link           b23.tv short link, resolving it needs a request
+    warning  no_links             neither an original nor a repost link
+    warning  missing_status       empty translation status (imported as 0)
+    warning  unknown_platform     original link is not YouTube / NicoNico / X / Bilibili
+    warning  av_id                Bilibili av link, av-to-bv.py has to convert it later
+    warning  non_canonical_url    link differs from its canonical form, or is a bare
+                                  NicoNico id such as sm22894363 (auto-fix)
+    warning  duplicate_in_file    same original_key as an earlier row
+    info     author_whitespace    author name has extra whitespace (auto-fix)
+    info     exists_in_db         original_key already in the database
+
+Exit code: 1 when an issue at or above --fail-on (default: error) was found,
+so a pipeline can refuse to start the import:
+    python3 csv-preflight.py input.csv && python3 csv-import.py input.csv
+
+Usage:
+python3 csv-preflight.py input.csv
+python3 csv-preflight.py input.csv --report report.json --fixed-csv input_fixed.csv
+python3 csv-preflight.py input.csv --report - --fail-on warning
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+SEVERITIES = ("info", "warning", "error")
+
+VALID_STATUSES = {"0", "1", "2", "3", "4", "5"}
+HTTP_URL = re.compile(r"^https?://[^\s/?#]+\.[^\s/?#]+[^\s]*$", re.IGNORECASE)
+SHORT_LINK = re.compile(r"^https?://(?:www\.)?b23\.tv/", re.IGNORECASE)
+AV_LINK = re.compile(r"bilibili\.com/video/av\d+", re.IGNORECASE)
+NICO_BARE_ID = re.compile(r"^(?:sm|nm|so)\d+$")
+
+
+def load_csv_import():
+    path = Path(__file__).resolve().parent / "csv-import.py"
+    spec = importlib.util.spec_from_file_location("csv_import", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_db_keys(csv_import, db_path):
+    """original_key of every video, computed the same way when the column is missing"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(videos)")}
+        if "original_key" in columns:
+            return {
+                row[0]
+                for row in conn.execute(
+                    "SELECT original_key FROM videos WHERE original_key IS NOT NULL"
+                )
+            }
+        keys = set()
+        for original_url, repost_url in conn.execute(
+            "SELECT original_url, repost_url FROM videos"
+        ):
+            key = csv_import.original_video_key(original_url, repost_url)
+            if key:
+                keys.add(key)
+        return keys
+    finally:
+        conn.close()
+
+
+class Preflight:
+    """Collects issues per row; check_row() is called once for every SourceRow"""
+
+    def __init__(self, csv_import, db_keys=None):
+        self.ci = csv_import
+        self.db_keys = db_keys
+        self.seen_keys = {}  # original_key → first line
+        self.rows = 0
+        self.row_reports = []
+        self.fixed_rows = []
+
+    def _check_url(self, issues, field, url, fixes):
+        if NICO_BARE_ID.match(url):
+            canonical = f"https://www.nicovideo.jp/watch/{url}"
+            issues.append(
+                (
+                    "warning",
+                    "non_canonical_url",
+                    field,
+                    url,
+                    "bare NicoNico id",
+                    canonical,
+                )
+            )
+            fixes[field] = canonical
+            return canonical
+        if not HTTP_URL.match(url):
+            issues.append(("error", "malformed_url", field, url, "not an http(s) link"))
+            return None
+        if SHORT_LINK.match(url):
+            issues.append(
+                (
+                    "error",
+                    "short_link",
+                    field,
+                    url,
+                    "short link, open it and paste the full video link",
+                )
+            )
+            return None
+        if AV_LINK.search(url):
+            issues.append(
+                ("warning", "av_id", field, url, "av link, prefer the BV link")
+            )
+        canonical = self.ci.canonical_video_url(url)
+        if canonical != url:
+            issues.append(
+                (
+                    "warning",
+                    "non_canonical_url",
+                    field,
+                    url,
+                    "link is not in canonical form",
+                    canonical,
+                )
+            )
+            fixes[field] = canonical
+        return canonical
+
+    def check_row(self, row):
+        self.rows += 1
+        issues = []
+        fixes = {}
+
+        if row.column_count < 2:
+            issues.append(
+                (
+                    "error",
+                    "too_few_columns",
+                    None,
+                    row.raw,
+                    f"{row.column_count} column(s), at least author and link are needed",
+                )
+            )
+        else:
+            author = self.ci.clean_author_name(row.author)
+            if not author:
+                issues.append(("error", "empty_author", "author", "", "no author name"))
+            elif author != row.author:
+                issues.append(
+                    (
+                        "info",
+                        "author_whitespace",
+                        "author",
+                        row.author,
+                        "extra whitespace in author name",
+                        author,
+                    )
+                )
+                fixes["author"] = author
+
+            status = row.translation_status
+            if not status:
+                issues.append(
+                    (
+                        "warning",
+                        "missing_status",
+                        "translation_status",
+                        "",
+                        "empty, imported as 0 (Not Set)",
+                    )
+                )
+            elif status not in VALID_STATUSES:
+                issues.append(
+                    (
+                        "error",
+                        "bad_status",
+                        "translation_status",
+                        status,
+                        "expected 0-5",
+                    )
+                )
+
+            original = repost = None
+            if row.original_url:
+                original = self._check_url(
+                    issues, "original_url", row.original_url, fixes
+                )
+                if original and self.ci.video_platform(original) == "other":
+                    issues.append(
+                        (
+                            "warning",
+                            "unknown_platform",
+                            "original_url",
+                            row.original_url,
+                            "not a YouTube / NicoNico / X / Bilibili link",
+                        )
+                    )
+            if row.repost_url:
+                repost = self._check_url(issues, "repost_url", row.repost_url, fixes)
+
+            if not row.original_url and not row.repost_url:
+                issues.append(
+                    ("warning", "no_links", None, "", "no original or repost link")
+                )
+            elif (original or not row.original_url) and (repost or not row.repost_url):
+                # Same as original_video_key(), on the already canonical links
+                key = original or "repost:" + repost
+                first_line = self.seen_keys.setdefault(key, row.line_num)
+                if first_line != row.line_num:
+                    issues.append(
+                        (
+                            "warning",
+                            "duplicate_in_file",
+                            None,
+                            key,
+                            f"same video as line {first_line}",
+                        )
+                    )
+                if self.db_keys is not None and key in self.db_keys:
+                    issues.append(
+                        ("info", "exists_in_db", None, key, "already in the database")
+                    )
+
+        if issues:
+            self.row_reports.append(self._row_report(row, issues))
+        self.fixed_rows.append(self._fixed_parts(row, fixes))
+
+    @staticmethod
+    def _row_report(row, issues):
+        entries = []
+        for severity, code, field, value, message, *fix in issues:
+            entry = {
+                "severity": severity,
+                "code": code,
+                "field": field,
+                "value": value,
+                "message": message,
+            }
+            if fix:
+                entry["fix"] = fix[0]
+            entries.append(entry)
+        return {
+            "line": row.line_num,
+            "severity": max((e["severity"] for e in entries), key=SEVERITIES.index),
+            "raw": row.raw,
+            "issues": entries,
+        }
+
+    @staticmethod
+    def _fixed_parts(row, fixes):
+        if row.column_count < 2:
+            return None
+        parts = [
+            fixes.get("author", row.author),
+            fixes.get("original_url", row.original_url),
+            row.repost_name or "",
+            fixes.get("repost_url", row.repost_url or ""),
+            row.translation_status,
+            row.comment or "",
+            row.supplementary_note or "",
+        ]
+        return parts[: max(row.column_count, 2)]
+
+    def summary(self):
+        counts = {severity: 0 for severity in SEVERITIES}
+        by_code = {}
+        fixable = 0
+        for report in self.row_reports:
+            for issue in report["issues"]:
+                counts[issue["severity"]] += 1
+                by_code[issue["code"]] = by_code.get(issue["code"], 0) + 1
+                fixable += "fix" in issue
+        return {
+            "rows": self.rows,
+            "rows_with_issues": len(self.row_reports),
+            **counts,
+            "auto_fixable": fixable,
+            "by_code": dict(sorted(by_code.items())),
+        }
+
+
+def write_fixed_csv(path, fixed_rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        for parts in fixed_rows:
+            if parts is not None:
+                writer.writerow(parts)
+
+
+def main():
+    _default_db = str(
+        Path(os.environ.get("PROJECT_ROOT", str(Path(__file__).parent.parent.parent)))
+        / "backend"
+        / "random-2hu-stuff.db"
+    )
+    parser = argparse.ArgumentParser(
+        description="Offline preflight check for csv-import.py input"
+    )
+    parser.add_argument("csv_file", help="CSV file to check")
+    parser.add_argument("--db-path", default=_default_db, help="Database path")
+    parser.add_argument(
+        "--no-db", action="store_true", help="Skip the duplicate check against the DB"
+    )
+    parser.add_argument(
+        "--report", help="Write the JSON report to this file ('-' for stdout)"
+    )
+    parser.add_argument(
+        "--fixed-csv", help="Write a copy of the CSV with the auto-fixes applied"
+    )
+    parser.add_argument(
+        "--fail-on",
+        choices=["error", "warning", "never"],
+        default="error",
+        help="Lowest severity that makes the exit code 1 (default: error)",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv_file):
+        print(f"Error: CSV file does not exist: {args.csv_file}", file=sys.stderr)
+        return 1
+
+    csv_import = load_csv_import()
+    quiet = args.report == "-"
+    start = time.perf_counter()
+
+    db_keys = None
+    if not args.no_db:
+        if os.path.exists(args.db_path):
+            db_keys = load_db_keys(csv_import, args.db_path)
+        elif not quiet:
+            print(f"⚠️  Database not found, skipping DB duplicate check: {args.db_path}")
+
+    preflight = Preflight(csv_import, db_keys)
+    for row in csv_import.iter_csv_rows(args.csv_file):
+        preflight.check_row(row)
+    elapsed = time.perf_counter() - start
+
+    summary = preflight.summary()
+    failed = args.fail_on != "never" and any(
+        summary[severity] for severity in SEVERITIES[SEVERITIES.index(args.fail_on) :]
+    )
+    report = {
+        "file": args.csv_file,
+        "db_path": args.db_path if db_keys is not None else None,
+        "db_keys": len(db_keys) if db_keys is not None else None,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "passed": not failed,
+        "summary": summary,
+        "rows": preflight.row_reports,
+    }
+
+    if args.report == "-":
+        json.dump(report, sys.stdout, ensure_ascii=False)
+        print()
+    elif args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False)
+    if args.fixed_csv:
+        write_fixed_csv(args.fixed_csv, preflight.fixed_rows)
+
+    if not quiet:
+        for row_report in preflight.row_reports[:30]:
+            if row_report["severity"] == "info":
+                continue
+            for issue in row_report["issues"]:
+                icon = {"error": "❌", "warning": "⚠️ ", "info": "ℹ️ "}[issue["severity"]]
+                fix = f" → {issue['fix']}" if "fix" in issue else ""
+                print(
+                    f"{icon} line {row_report['line']}: {issue['code']}: "
+                    f"{issue['message']}{fix}"
+                )
+        print(
+            f"\n📋 {summary['rows']} rows checked in {elapsed * 1000:.0f} ms: "
+            f"{summary['error']} errors, {summary['warning']} warnings, "
+            f"{summary['info']} info ({summary['auto_fixable']} auto-fixable)"
+        )
+        if args.report:
+            print(f"📄 Report: {args.report}")
+        if args.fixed_csv:
+            print(f"🛠️  Fixed CSV: {args.fixed_csv}")
+        print("❌ Preflight failed" if failed else "✅ Preflight passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -42,8 +42,21 @@ db = sqlite3.connect("$DB_PATH")
 db.row_factory = sqlite3.Row
 tmpdir = "$TMPDIR"
 
-for table in ("authors", "videos"):
-    rows = db.execute(f"SELECT * FROM {table}").fetchall()
+# 只导出 Dolt 中已有的列；videos.original_key 等本地派生列（csv-import.py 维护）不推送
+COLUMNS = {
+    "authors": [
+        "id", "yt_name", "yt_url", "yt_avatar", "nico_name", "nico_url",
+        "nico_avatar", "twitter_name", "twitter_url", "twitter_avatar", "comment",
+    ],
+    "videos": [
+        "id", "author", "original_name", "original_url", "original_thumbnail",
+        "date", "repost_name", "repost_url", "repost_thumbnail",
+        "translation_status", "comment",
+    ],
+}
+
+for table, columns in COLUMNS.items():
+    rows = db.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
     if not rows:
         continue
     out = os.path.join(tmpdir, f"{table}.csv")
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Local image mirror for thumbnails and avatars
+
+Downloads every image referenced by videos.original_thumbnail /
+repost_thumbnail and authors.yt_avatar / nico_avatar / twitter_avatar once,
+stores it content-addressed under the mirror directory and generates WebP
+variants sized for the frontend cards:
+
+    <mirror>/<sha[:2]>/<sha>.<ext>          the original bytes
+    <mirror>/<sha[:2]>/<sha>-<width>.webp   one per width in VARIANT_WIDTHS
+
+Per URL the table image_mirror records the file, the intrinsic dimensions,
+the variants (JSON {width: path}), a placeholder, ETag / Last-Modified and
+the last error. The placeholder is a data: URI of the image scaled down to
+at most 16px (WebP, ~100-300 bytes), for the API to ship inline so the cards
+can show a blurred preview with the right aspect ratio before the image
+loads. Rows mirrored before placeholders existed get theirs from the local
+file, without a download.
+Runs only download URLs that are not in image_mirror yet, so a changed
+thumbnail URL is fetched again and an interrupted run resumes where it
+stopped; --retry-errors also retries URLs that failed before.
+
+backend/server.cjs serves the mirror directory under /api/mirror/ and adds
+<column>_src (the local copy, or the remote URL when not mirrored) and
+<column>_srcset (the variants) to the API rows. The frontend cards still
+read the raw columns; switching them to _src / _srcset is a follow-up.
+
+get-db.sh rebuilds the database from Dolt; it carries image_mirror over
+with --copy-state-from, so the mirror does not start from scratch.
+
+Usage:
+python3 image-mirror.py                          # mirror everything not mirrored yet
+python3 image-mirror.py --workers 16 --limit 500
+python3 image-mirror.py --columns original_thumbnail,repost_thumbnail
+python3 image-mirror.py --copy-state-from old.db # keep mirror state across a rebuild
+python3 bench-image-placeholders.py              # throughput on generated images
+"""
+
+import argparse
+import base64
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from PIL import Image
+
+
+def load_thumbnail_updater():
+    path = Path(__file__).resolve().parent / "thumbnail-updater.py"
+    spec = importlib.util.spec_from_file_location("thumbnail_updater", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Same worker pool and HTTP session setup as thumbnail-updater.py
+_thumbnail_updater = load_thumbnail_updater()
+iter_resolved = _thumbnail_updater.iter_resolved
+make_session = _thumbnail_updater.make_session
+
+# Image columns and the kind of card they are shown on
+IMAGE_COLUMNS = {
+    "original_thumbnail": ("videos", "thumbnail"),
+    "repost_thumbnail": ("videos", "thumbnail"),
+    "yt_avatar": ("authors", "avatar"),
+    "nico_avatar": ("authors", "avatar"),
+    "twitter_avatar": ("authors", "avatar"),
+}
+
+# VideoCard.vue thumbnails are 60-300px high in a 16:9-ish box, HomeAuthorCard.vue
+# avatars fill a card background; larger variants are skipped for small sources
+VARIANT_WIDTHS = {
+    "thumbnail": (160, 320, 640),
+    "avatar": (96, 320),
+}
+WEBP_QUALITY = 80
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS image_mirror (
+        url TEXT PRIMARY KEY,
+        sha256 TEXT,
+        path TEXT,
+        width INTEGER,
+        height INTEGER,
+        variants TEXT,
+        placeholder TEXT,
+        etag TEXT,
+        last_modified TEXT,
+        status INTEGER,
+        error TEXT,
+        fetched_at TEXT
+    )
+"""
+MIRROR_FIELDS = (
+    "url",
+    "sha256",
+    "path",
+    "width",
+    "height",
+    "variants",
+    "placeholder",
+    "etag",
+    "last_modified",
+    "status",
+    "error",
+    "fetched_at",
+)
+
+
+def ensure_schema(conn):
+    with conn:
+        conn.execute(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(image_mirror)")}
+        if "placeholder" not in columns:
+            conn.execute("ALTER TABLE image_mirror ADD COLUMN placeholder TEXT")
+
+
+def pending_images(conn, columns, retry_errors=False, limit=None):
+    """(url, kind) for every referenced image that still needs mirroring"""
+    selects = [
+        f"SELECT {column} AS url, '{IMAGE_COLUMNS[column][1]}' AS kind "
+        f"FROM {IMAGE_COLUMNS[column][0]} "
+        f"WHERE {column} LIKE 'http%'"
+        for column in columns
+    ]
+    condition = "m.url IS NULL"
+    if retry_errors:
+        condition += " OR m.sha256 IS NULL"
+    query = f"""
+        SELECT i.url, MIN(i.kind)
+        FROM ({" UNION ALL ".join(selects)}) i
+        LEFT JOIN image_mirror m ON m.url = i.url
+        WHERE {condition}
+        GROUP BY i.url
+    """
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return conn.execute(query).fetchall()
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _save_variants(image, sha, directory, widths):
+    """WebP variants no wider than the source (the smallest is always made)"""
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    variants = {}
+    for width in widths:
+        if width > image.width and variants:
+            break
+        target = min(width, image.width)
+        path = directory / f"{sha}-{width}.webp"
+        if not path.exists():
+            height = max(1, round(image.height * target / image.width))
+            resized = image.resize((target, height), Image.LANCZOS)
+            buf = io.BytesIO()
+            resized.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+            _write_atomic(path, buf.getvalue())
+        variants[str(width)] = f"{directory.name}/{path.name}"
+    return variants
+
+
+def make_placeholder(image):
+    """data: URI of `image` scaled to fit PLACEHOLDER_SIZE, aspect ratio kept"""
+    small = image.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    if small.mode not in ("RGB", "RGBA"):
+        small = small.convert("RGBA" if "transparency" in small.info else "RGB")
+    buf = io.BytesIO()
+    small.save(buf, "WEBP", quality=PLACEHOLDER_QUALITY, method=6)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def placeholder_from_file(path):
+    """
+    Worker: (width, height, placeholder) of a mirrored file. JPEGs are decoded
+    at a reduced scale (draft), which is most of the work saved.
+    """
+    with Image.open(path) as image:
+        size = image.size
+        image.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        image.load()
+        return size[0], size[1], make_placeholder(image)
+
+
+def mirror_image(url, kind, session, mirror_dir):
+    """
+    Worker: download one image, store it and its variants.
+    Returns an image_mirror row as a dict; failures are recorded in "error".
+    """
+    row = dict.fromkeys(MIRROR_FIELDS)
+    row["url"] = url
+    row["fetched_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    try:
+        resp = session.get(url, timeout=20)
+        row["status"] = resp.status_code
+        if resp.status_code != 200:
+            row["error"] = f"HTTP {resp.status_code}"
+            return row
+        data = resp.content
+        if len(data) > MAX_IMAGE_BYTES:
+            row["error"] = f"too large ({len(data)} bytes)"
+            return row
+
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        sha = hashlib.sha256(data).hexdigest()
+        directory = Path(mirror_dir) / sha[:2]
+        directory.mkdir(parents=True, exist_ok=True)
+        ext = (image.format or "bin").lower().replace("jpeg", "jpg")
+        original = directory / f"{sha}.{ext}"
+        if not original.exists():
+            _write_atomic(original, data)
+
+        row.update(
+            sha256=sha,
+            path=f"{directory.name}/{original.name}",
+            width=image.width,
+            height=image.height,
+            variants=json.dumps(
+                _save_variants(image, sha, directory, VARIANT_WIDTHS[kind])
+            ),
+            placeholder=make_placeholder(image),
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def save_row(conn, row):
+    conn.execute(
+        f"INSERT OR REPLACE INTO image_mirror ({', '.join(MIRROR_FIELDS)}) "
+        f"VALUES ({', '.join('?' for _ in MIRROR_FIELDS)})",
+        [row[field] for field in MIRROR_FIELDS],
+    )
+
+
+def copy_state(conn, source_db):
+    """
+    Copy image_mirror rows from another database (e.g. before a rebuild);
+    columns the older table does not have yet stay NULL
+    """
+    conn.execute("ATTACH DATABASE ? AS previous", (source_db,))
+    try:
+        found = conn.execute(
+            "SELECT 1 FROM previous.sqlite_master "
+            "WHERE type = 'table' AND name = 'image_mirror'"
+        ).fetchone()
+        if not found:
+            return 0
+        present = {
+            row[1] for row in conn.execute("PRAGMA previous.table_info(image_mirror)")
+        }
+        fields = ", ".join(field for field in MIRROR_FIELDS if field in present)
+        with conn:
+            cur = conn.execute(
+                f"INSERT OR REPLACE INTO image_mirror ({fields}) "
+                f"SELECT {fields} FROM previous.image_mirror"
+            )
+        return cur.rowcount
+    finally:
+        conn.execute("DETACH DATABASE previous")
+
+
+def backfill_placeholders(conn, mirror_dir, workers=8, commit_every=500):
+    """
+    Placeholders (and dimensions) for mirrored rows that have none, computed
+    from the local files on `workers` threads. Returns (filled, missing files).
+    """
+    rows = conn.execute(
+        "SELECT url, path FROM image_mirror "
+        "WHERE sha256 IS NOT NULL AND placeholder IS NULL"
+    ).fetchall()
+    if not rows:
+        return 0, 0
+    print(f"Computing {len(rows)} placeholders from mirrored files")
+
+    def resolve(row):
+        try:
+            return placeholder_from_file(Path(mirror_dir) / row[1])
+        except (OSError, Image.DecompressionBombError) as e:
+            return e
+
+    filled = missing = 0
+    try:
+        for (url, path), result in iter_resolved(rows, workers, resolve):
+            if isinstance(result, Exception):
+                missing += 1
+                print(f"  ❌ {path}: {type(result).__name__}: {result}")
+                continue
+            conn.execute(
+                "UPDATE image_mirror SET width = ?, height = ?, placeholder = ? "
+                "WHERE url = ?",
+                (*result, url),
+            )
+            filled += 1
+            if filled % commit_every == 0:
+                conn.commit()
+    finally:
+        conn.commit()
+    return filled, missing
+
+
+def mirror_images(
+    conn,
+    mirror_dir,
+    columns=tuple(IMAGE_COLUMNS),
+    workers=8,
+    limit=None,
+    retry_errors=False,
+    commit_every=100,
+    debug=False,
+):
+    """Mirror pending images; downloads run on `workers` threads, writes on this one"""
+    images = pending_images(conn, columns, retry_errors, limit)
+    print(f"Found {len(images)} images to mirror")
+    stats = {"processed": 0, "mirrored": 0, "errors": 0, "bytes": 0}
+    if not images:
+        return stats
+
+    session = make_session(workers)
+    start = time.monotonic()
+    pending = 0
+    try:
+        for (url, kind), row in iter_resolved(
+            images, workers, lambda task: mirror_image(*task, session, mirror_dir)
+        ):
+            stats["processed"] += 1
+            save_row(conn, row)
+            if row["error"]:
+                stats["errors"] += 1
+                print(f"  ❌ {url}: {row['error']}")
+            else:
+                stats["mirrored"] += 1
+                stats["bytes"] += os.path.getsize(Path(mirror_dir) / row["path"])
+                if debug:
+                    print(
+                        f"  ✅ {url} → {row['path']} ({row['width']}x{row['height']})"
+                    )
+            pending += 1
+            if pending >= commit_every:
+                conn.commit()
+                pending = 0
+            if stats["processed"] % 500 == 0:
+                print(
+                    f"  {stats['processed']}/{len(images)} "
+                    f"({time.monotonic() - start:.0f}s)"
+                )
+    finally:
+        conn.commit()
+    return stats
+
+
+def main():
+    project_root = Path(
+        os.environ.get("PROJECT_ROOT", str(Path(__file__).parent.parent.parent))
+    )
+    parser = argparse.ArgumentParser(
+        description="Mirror thumbnails and avatars locally with WebP variants"
+    )
+    parser.add_argument(
+        "--db-path",
+        default=str(project_root / "backend" / "random-2hu-stuff.db"),
+        help="Database path",
+    )
+    parser.add_argument(
+        "--mirror-dir",
+        default=str(project_root / "backend" / "mirror"),
+        help="Directory for the mirrored files (default: backend/mirror)",
+    )
+    parser.add_argument(
+        "--columns",
+        default=",".join(IMAGE_COLUMNS),
+        help=f"Comma-separated image columns (default: {','.join(IMAGE_COLUMNS)})",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Download threads (default: 8)"
+    )
+    parser.add_argument("--limit", type=int, help="Mirror at most this many images")
+    parser.add_argument(
+        "--retry-errors",
+        action="store_true",
+        help="Also retry URLs whose previous download failed",
+    )
+    parser.add_argument(
+        "--copy-state-from",
+        metavar="OLD_DB",
+        help="Copy image_mirror from another database first (used by get-db.sh)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Print every image")
+    args = parser.parse_args()
+
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in IMAGE_COLUMNS]
+    if unknown:
+        print(f"Error: unknown image column(s): {', '.join(unknown)}")
+        return 1
+    if not os.path.exists(args.db_path):
+        print(f"Error: Database file does not exist: {args.db_path}")
+        return 1
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        ensure_schema(conn)
+        if args.copy_state_from:
+            if not os.path.exists(args.copy_state_from):
+                print(f"Error: Database file does not exist: {args.copy_state_from}")
+                return 1
+            copied = copy_state(conn, args.copy_state_from)
+            print(f"✅ Copied {copied} image_mirror rows from {args.copy_state_from}")
+            return 0
+
+        print(f"Mirror directory: {args.mirror_dir}")
+        filled, missing = backfill_placeholders(conn, args.mirror_dir, args.workers)
+        if filled or missing:
+            print(
+                f"Placeholders from mirrored files: {filled} ({missing} files missing)"
+            )
+        start = time.monotonic()
+        stats = mirror_images(
+            conn,
+            args.mirror_dir,
+            columns,
+            args.workers,
+            args.limit,
+            args.retry_errors,
+            debug=args.debug,
+        )
+        elapsed = time.monotonic() - start
+        total = conn.execute(
+            "SELECT COUNT(*), COUNT(sha256), COUNT(placeholder) FROM image_mirror"
+        ).fetchone()
+
+        print(f"\n=== 📊 Mirror Complete ===")
+        print(f"Images processed: {stats['processed']} in {elapsed:.1f}s")
+        print(f"Mirrored: {stats['mirrored']} ({stats['bytes'] / 1024 / 1024:.1f} MiB)")
+        print(f"Errors: {stats['errors']}")
+        print(
+            f"image_mirror: {total[1]} of {total[0]} URLs mirrored, "
+            f"{total[2]} with placeholder"
+        )
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
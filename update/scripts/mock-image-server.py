@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Local image server for image-mirror.py and the thumbnail tooling
+
+Serves deterministic generated images, so mirroring, revalidation and
+placeholder generation can be tested and benchmarked without hotlinking:
+    GET|HEAD /{W}x{H}/{name}.{jpg|png|webp}     W x H image, colours derived from name
+    ...?v=N                                     different content (a "changed" image)
+Names containing "missing" return 404, "gone" 410, "broken" a non-image body,
+"nohead" answer HEAD with 405, and "changing" images change content (and
+ETag) with every --generation, to test revalidation.
+Responses carry ETag / Last-Modified and honour If-None-Match /
+If-Modified-Since with 304.
+
+Usage:
+python3 mock-image-server.py                 # listen on 127.0.0.1:8767
+python3 mock-image-server.py --latency 0.05
+python3 mock-image-server.py --generation 2    # "changing" images look different
+"""
+
+import argparse
+import hashlib
+import io
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image, ImageDraw
+
+FORMATS = {
+    "jpg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+}
+LAST_MODIFIED = formatdate(1704186000, usegmt=True)
+
+
+def render_image(width, height, name, version="1", ext="jpg"):
+    """Deterministic image bytes for (size, name, version, format)"""
+    seed = hashlib.sha256(f"{name}:{version}".encode()).digest()
+    image = Image.new("RGB", (width, height), tuple(seed[:3]))
+    draw = ImageDraw.Draw(image)
+    for i in range(4):
+        x0, y0 = seed[3 + i] * width // 256, seed[7 + i] * height // 256
+        draw.rectangle(
+            (x0, y0, x0 + width // 3, y0 + height // 3),
+            fill=tuple(seed[11 + 3 * i :][:3]),
+        )
+    buf = io.BytesIO()
+    image.save(buf, FORMATS[ext][0], quality=85)
+    return buf.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    generation = 0
+    requests = 0
+    lock = threading.Lock()
+    cache = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/plain", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD" and status != 304:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        with ImageHandler.lock:
+            ImageHandler.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split("/") if p]
+        version = parse_qs(parsed.query).get("v", ["1"])[0]
+        try:
+            size, filename = parts
+            width, height = (int(n) for n in size.split("x"))
+            name, ext = filename.rsplit(".", 1)
+            assert ext in FORMATS and 0 < width <= 4096 and 0 < height <= 4096
+        except (ValueError, AssertionError):
+            return self._send(404, b"Not Found")
+        if "nohead" in name and self.command == "HEAD":
+            return self._send(405, b"Method Not Allowed")
+        if "changing" in name:
+            version = f"{version}.{self.generation}"
+        if "missing" in name:
+            return self._send(404, b"Not Found")
+        if "gone" in name:
+            return self._send(410, b"Gone")
+        if "broken" in name:
+            return self._send(200, b"<html>not an image</html>", FORMATS[ext][1])
+
+        key = (width, height, name, version, ext)
+        with ImageHandler.lock:
+            body = ImageHandler.cache.get(key)
+        if body is None:
+            body = render_image(width, height, name, version, ext)
+            with ImageHandler.lock:
+                ImageHandler.cache[key] = body
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        headers = [("ETag", etag), ("Last-Modified", LAST_MODIFIED)]
+        if self.headers.get("If-None-Match") == etag or (
+            not self.headers.get("If-None-Match")
+            and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            return self._send(304, b"", FORMATS[ext][1], headers)
+        self._send(200, body, FORMATS[ext][1], headers)
+
+    do_HEAD = do_GET
+
+
+def start_server(host="127.0.0.1", port=0, latency=0.0, generation=0):
+    """
+    Start in a background thread, return (server, base_url); port=0 picks a
+    free port. server.RequestHandlerClass.generation can be changed later.
+    """
+    handler = type(
+        "BoundImageHandler",
+        (ImageHandler,),
+        {"latency": latency, "generation": generation},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generated-image fixture server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Delay per request in seconds"
+    )
+    parser.add_argument(
+        "--generation",
+        type=int,
+        default=0,
+        help='Content generation of the "changing" images',
+    )
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.host, args.port, args.latency, args.generation)
+    print(f"🖼️  Image fixtures: {base_url}/640x360/example.jpg")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Local fixture server for csv-import.py --fast-metadata
+
+Serves the four endpoints the fast resolvers use, with deterministic
+fixtures derived from the video id:
+    GET /oembed?url=https://www.youtube.com/watch?v=ID   YouTube oEmbed JSON
+    GET /watch?v=ID                                      YouTube watch page (microdata)
+    GET /getthumbinfo/smN                                NicoNico thumbinfo XML
+    GET /{screen_name}/status/{id}                       fxtwitter status JSON
+    GET /{screen_name}                                   fxtwitter user JSON
+    GET|HEAD /vi/{id}/{name}.jpg                         i.ytimg.com thumbnail
+    GET|HEAD /thumbnails/{n}/{n}[.M|.L]                  NicoNico thumbnail
+    GET /x/web-interface/view?bvid=BV...|aid=N           Bilibili view JSON
+Ids containing "missing" return 404 (YouTube, X) or status="fail" (NicoNico),
+nm* ids are served as channel videos, and X statuses ending in 0 have no video.
+YouTube ids containing "nomax" have no maxresdefault.jpg, NicoNico thumbnails of
+odd numbers have no .L variant. Bilibili ids containing "missing" / "hidden" /
+"deleted" return codes -404 / 62002 / 62006, "broken" returns code -400 without
+data; covers are served with an http:// URL, as the real API does.
+
+Usage:
+python3 mock-metadata-server.py                  # listen on 127.0.0.1:8766
+python3 mock-metadata-server.py --latency 0.2
+
+With csv-import.py:
+YOUTUBE_API_BASE=http://127.0.0.1:8766 \
+NICO_THUMBINFO_API_BASE=http://127.0.0.1:8766/getthumbinfo \
+FXTWITTER_API_BASE=http://127.0.0.1:8766 \
+python3 csv-import.py input.csv --fast-metadata
+
+With thumbnail-updater.py:
+YTIMG_BASE=http://127.0.0.1:8766 \
+NICO_THUMBINFO_API_BASE=http://127.0.0.1:8766/getthumbinfo \
+BILIBILI_API_BASE=http://127.0.0.1:8766 \
+python3 thumbnail-updater.py --probe-quality
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.sax.saxutils import escape
+
+
+def fixture_channel(video_id):
+    return f"channel{sum(map(ord, video_id)) % 97:02d}"
+
+
+def youtube_oembed(video_id):
+    channel = fixture_channel(video_id)
+    return {
+        "title": f"Video {video_id}",
+        "author_name": channel,
+        "author_url": f"https://www.youtube.com/@{channel}",
+        "type": "video",
+        "provider_name": "YouTube",
+    }
+
+
+def youtube_watch_page(video_id):
+    channel = fixture_channel(video_id)
+    return f"""<!DOCTYPE html><html><head>
+<meta name="title" content="Video {escape(video_id)}">
+</head><body>
+<span itemprop="author" itemscope itemtype="http://schema.org/Person">
+<link itemprop="url" href="http://www.youtube.com/@{channel}">
+<link itemprop="name" content="{channel}"></span>
+<meta itemprop="datePublished" content="2024-01-02T05:00:00-08:00">
+<meta itemprop="uploadDate" content="2024-01-02T05:00:00-08:00">
+</body></html>"""
+
+
+# Minimal valid JPEG (1x1), served for every existing thumbnail
+JPEG_1X1 = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909"
+    "080a0c140d0c0b0b0c1912130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30"
+    "313434341f27393d38323c2e333432ffc0000b080001000101011100ffc4001f0000010501"
+    "010101010100000000000000000102030405060708090a0bffc400b5100002010303020403"
+    "050504040000017d01020300041105122131410613516107227114328191a1082342b1c115"
+    "52d1f02433627282090a161718191a25262728292a3435363738393a434445464748494a53"
+    "5455565758595a636465666768696a737475767778797a838485868788898a929394959697"
+    "98999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7c8c9cad2d3d4d5d6d7d8"
+    "d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3ffd9"
+)
+
+
+def thumbnail_exists(parts):
+    if parts[0] == "vi":
+        return not (parts[2].startswith("maxres") and "nomax" in parts[1])
+    number = parts[1]
+    return not (parts[2].endswith(".L") and int(number) % 2)
+
+
+def nico_thumbinfo(video_id, base_url=""):
+    if "missing" in video_id:
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<nicovideo_thumb_response status="fail"><error>'
+            "<code>NOT_FOUND</code><description>not found or invalid</description>"
+            "</error></nicovideo_thumb_response>"
+        )
+    number = re.sub(r"\D", "", video_id)
+    if video_id.startswith("nm"):
+        owner = "<ch_id>2632720</ch_id><ch_name>Channel</ch_name>"
+    else:
+        user_id = sum(map(ord, video_id)) % 100000
+        owner = (
+            f"<user_id>{user_id}</user_id>"
+            f"<user_nickname>{fixture_channel(video_id)}</user_nickname>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<nicovideo_thumb_response status="ok"><thumb>'
+        f"<video_id>{escape(video_id)}</video_id>"
+        f"<title>Nico {escape(video_id)}</title>"
+        f"<thumbnail_url>{base_url}/thumbnails/{number}/{number}</thumbnail_url>"
+        "<first_retrieve>2024-01-02T08:30:00+09:00</first_retrieve>"
+        f"{owner}</thumb></nicovideo_thumb_response>"
+    )
+
+
+def bilibili_view(bvid=None, aid=None):
+    video_id = bvid or f"av{aid}"
+    for marker, code, message in (
+        ("missing", -404, "啥都木有"),
+        ("hidden", 62002, "稿件不可见"),
+        ("deleted", 62006, "稿件已删除"),
+        ("broken", -400, "请求错误"),
+    ):
+        if marker in video_id.lower():
+            return {"code": code, "message": message, "ttl": 1}
+    return {
+        "code": 0,
+        "message": "0",
+        "ttl": 1,
+        "data": {
+            "bvid": bvid or "BV1xx411c7mD",
+            "aid": int(aid or 170001),
+            "title": f"Repost {video_id}",
+            "pic": f"http://i0.hdslb.com/bfs/archive/{video_id.lower()}.jpg",
+        },
+    }
+
+
+def fxtwitter_user(screen_name):
+    return {
+        "code": 200,
+        "user": {
+            "screen_name": screen_name,
+            "name": screen_name.title(),
+            "avatar_url": f"https://pbs.twimg.com/profile_images/1/{screen_name}_normal.jpg",
+        },
+    }
+
+
+def fxtwitter_status(screen_name, status_id):
+    media = {} if status_id.endswith("0") else {"videos": [{"url": "video.mp4"}]}
+    return {
+        "code": 200,
+        "tweet": {
+            "id": status_id,
+            "text": f"Clip {status_id}\nhttps://t.co/abc",
+            "created_timestamp": 1704186000,
+            "author": fxtwitter_user(screen_name)["user"],
+            "media": media,
+        },
+    }
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        raw = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(raw)
+
+    def _json(self, body, status=200):
+        self._send(status, json.dumps(body), "application/json")
+
+    def do_GET(self):
+        with FixtureHandler.lock:
+            FixtureHandler.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = [unquote(p) for p in parsed.path.split("/") if p]
+
+        if parts == ["oembed"]:
+            video_id = query.get("url", [""])[0].rsplit("v=", 1)[-1]
+            if not video_id or "missing" in video_id:
+                return self._send(404, "Not Found", "text/plain")
+            return self._json(youtube_oembed(video_id))
+        if parts == ["watch"]:
+            video_id = query.get("v", [""])[0]
+            if not video_id or "missing" in video_id:
+                return self._send(404, "Not Found", "text/html")
+            return self._send(
+                200, youtube_watch_page(video_id), "text/html; charset=utf-8"
+            )
+        if parts == ["x", "web-interface", "view"]:
+            return self._json(
+                bilibili_view(query.get("bvid", [None])[0], query.get("aid", [None])[0])
+            )
+        if len(parts) == 3 and parts[0] in ("vi", "thumbnails"):
+            if not thumbnail_exists(parts):
+                return self._send(404, "Not Found", "text/plain")
+            return self._send(200, JPEG_1X1, "image/jpeg")
+        if len(parts) == 2 and parts[0] == "getthumbinfo":
+            base_url = f"http://{self.headers.get('Host', '')}"
+            return self._send(
+                200, nico_thumbinfo(parts[1], base_url), "text/xml; charset=utf-8"
+            )
+        if len(parts) == 3 and parts[1] == "status":
+            if "missing" in parts[2]:
+                return self._json({"code": 404, "message": "NOT_FOUND"}, 404)
+            return self._json(fxtwitter_status(parts[0], parts[2]))
+        if len(parts) == 1:
+            return self._json(fxtwitter_user(parts[0]))
+        self._send(404, "Not Found", "text/plain")
+
+    do_HEAD = do_GET
+
+
+def start_server(host="127.0.0.1", port=0, latency=0.0):
+    """Start in a background thread, return (server, base_url); port=0 picks a free port"""
+    handler = type("BoundFixtureHandler", (FixtureHandler,), {"latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture server for --fast-metadata")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Delay per request in seconds"
+    )
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.host, args.port, args.latency)
+    print(f"📡 Metadata fixtures: {base_url}")
+    print(f"   YOUTUBE_API_BASE={base_url}")
+    print(f"   NICO_THUMBINFO_API_BASE={base_url}/getthumbinfo")
+    print(f"   FXTWITTER_API_BASE={base_url}")
+    print(f"   YTIMG_BASE={base_url}")
+    print(f"   BILIBILI_API_BASE={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,21 +15,83 @@ Optional arguments:
 --update-original: Update original video thumbnails
 --update-repost: Update repost video thumbnails
 --force: Force update existing thumbnails
+--no-derive: Use yt-dlp for every URL instead of deriving YouTube / NicoNico / Bilibili thumbnails
+--probe-quality: HEAD-check the larger derived variants (YouTube maxres, NicoNico .L/.M)
+--workers: Threads resolving thumbnails concurrently (default 4, 0 = one at a time)
+--rate-limit: PLATFORM=RPS request rate per platform, repeatable
+--commit-every: Commit after this many updated videos (default 100)
+--ignore-backoff: Also retry links whose earlier failures put them in backoff
+--revalidate: Check the stored thumbnail URLs first and re-extract the gone / changed ones
+--revalidate-workers: Concurrent thumbnail checks (default 32)
+--copy-state-from: Copy thumbnail_jobs / thumbnail_checks from another database (used by get-db.sh)
 --cookies: Netscape formatted cookie file to read cookies from
 --cookies-from-browser: Extract cookies from specified browser to handle restricted videos
                        Supported browsers: brave, chrome, chromium, edge, firefox, opera, safari, vivaldi, whale, qutebrowser
                        Format: BROWSER[+KEYRING][:PROFILE][::CONTAINER]
                        Supported keyrings: basictext, gnomekeyring, kwallet, kwallet5, kwallet6
+
+Every looked-up link gets a row in thumbnail_jobs (url, status, error_class,
+last_error, attempts, last_attempt, next_attempt). A failed link is not tried
+again before next_attempt; the wait grows with every failure and depends on
+the error class (JOB_BACKOFF), so deleted or private videos stop costing
+requests on every run. Videos are read page by page (keyset on priority, id),
+links that never failed first.
+
+--revalidate checks every stored thumbnail URL with a HEAD request
+(conditional on the ETag / Last-Modified of the previous check, GET when the
+server refuses HEAD) and records the result in thumbnail_checks (url, status,
+etag, last_modified, result, checked_at). Thumbnails found gone (404 / 410)
+or changed (new ETag / Last-Modified) are then re-extracted like missing
+ones; errors and rate limiting (403, 429, 5xx) are recorded but not acted on.
+A gone thumbnail is never replaced by itself: when derivation yields the same
+URL, yt-dlp is asked instead, and if that finds nothing new either the link
+is recorded as a gone job.
 """
 
 import argparse
 import os
+import re
 import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from urllib.parse import urlparse
 
+import requests
 import yt_dlp
+from requests.adapters import HTTPAdapter
+
+# Thumbnail derivation endpoints; override to point at a local fixture server
+# (see mock-metadata-server.py)
+YTIMG_BASE = os.environ.get("YTIMG_BASE", "https://i.ytimg.com")
+NICO_THUMBINFO_API_BASE = os.environ.get(
+    "NICO_THUMBINFO_API_BASE", "https://ext.nicovideo.jp/api/getthumbinfo"
+)
+BILIBILI_API_BASE = os.environ.get("BILIBILI_API_BASE", "https://api.bilibili.com")
+
+YOUTUBE_ID_PATTERN = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|live/|embed/)|youtu\.be/)"
+    r"([A-Za-z0-9_-]{11})"
+)
+NICO_ID_PATTERN = re.compile(r"(?:nicovideo\.jp|nico\.ms)/(?:watch/)?((?:sm|nm|so)\d+)")
+BILIBILI_ID_PATTERN = re.compile(
+    r"bilibili\.com/video/(?:(BV[0-9A-Za-z]{10})|av(\d+))", re.IGNORECASE
+)
+
+# view API codes for videos that are gone; yt-dlp would fail on them as well
+BILIBILI_GONE_CODES = {
+    -404: "不存在",
+    62002: "稿件不可见",
+    62004: "稿件审核中",
+    62006: "稿件已删除",
+}
+
+
+class ThumbnailUnavailable(Exception):
+    """The platform says the video is gone; no point in trying yt-dlp"""
 
 
 def create_connection(db_path):
@@ -156,6 +218,570 @@ def get_video_thumbnail(url, debug=False, browser_cookies=None, cookies_file=Non
         raise e
 
 
+# Requests per second allowed per platform (same defaults as csv-import.py)
+DEFAULT_RATE_LIMITS = {
+    "youtube": 2.0,
+    "niconico": 1.0,
+    "twitter": 1.0,
+    "bilibili": 1.0,
+    "other": 1.0,
+}
+
+
+class RateLimiter:
+    """Spaces out request starts so that at most `rate` start per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next_start = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def video_platform(url):
+    """Platform name used for per-platform rate limits"""
+    if "youtube.com" in url or "youtu.be" in url:
+        return "youtube"
+    if "nicovideo.jp" in url or "nico.ms" in url:
+        return "niconico"
+    if "twitter.com" in url or "x.com" in url:
+        return "twitter"
+    if "bilibili.com" in url or "b23.tv" in url:
+        return "bilibili"
+    return "other"
+
+
+def resolve_video_thumbnails(
+    steps,
+    limiters,
+    debug=False,
+    browser_cookies=None,
+    cookies_file=None,
+    session=None,
+    probe=False,
+):
+    """
+    Worker: fetch the thumbnails of one video's ("fetch", kind, url, attempts,
+    gone_thumbnail) steps. Returns {kind: (thumbnail, error, source)} with
+    source "derived" or "yt-dlp"; errors are returned, not raised. Without a
+    session every URL goes through yt-dlp. gone_thumbnail (the stored URL that
+    --revalidate found gone) is not an answer: a derived match falls back to
+    yt-dlp, and a yt-dlp match is a ThumbnailUnavailable error.
+    """
+    results = {}
+    for step in steps:
+        if step[0] != "fetch":
+            continue
+        kind, url, gone_thumbnail = step[1], step[2], step[4]
+        platform = video_platform(url)
+        if session is not None:
+            try:
+                # YouTube rules need no request before the (optional) probes
+                if platform in ("niconico", "bilibili"):
+                    limiters[platform].wait()
+                thumbnail = derive_thumbnail(url, session, probe)
+                if thumbnail and thumbnail != gone_thumbnail:
+                    results[kind] = (thumbnail, None, "derived")
+                    continue
+                if thumbnail and debug:
+                    print(f"Derived thumbnail for {url} is the gone one, using yt-dlp")
+            except ThumbnailUnavailable as e:
+                results[kind] = (None, e, "derived")
+                continue
+            except Exception as e:
+                if debug:
+                    print(f"Deriving thumbnail failed for {url}, using yt-dlp: {e}")
+        limiters[platform].wait()
+        try:
+            thumbnail = get_video_thumbnail(url, debug, browser_cookies, cookies_file)
+            if thumbnail and thumbnail == gone_thumbnail:
+                raise ThumbnailUnavailable(
+                    f"thumbnail {thumbnail} is gone and no other one was found"
+                )
+            results[kind] = (thumbnail, None, "yt-dlp")
+        except Exception as e:
+            results[kind] = (None, e, "yt-dlp")
+    return results
+
+
+def iter_resolved(tasks, workers, resolve):
+    """
+    Yield (task, resolve(task)) for every task. With workers > 0 the calls run
+    on a thread pool, at most workers * 4 in flight, in completion order;
+    with 0 they run inline in input order.
+    """
+    if workers <= 0:
+        for task in tasks:
+            yield task, resolve(task)
+        return
+    tasks = iter(tasks)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        for task in tasks:
+            running[pool.submit(resolve, task)] = task
+            if len(running) >= workers * 4:
+                break
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                next_task = next(tasks, None)
+                if next_task is not None:
+                    running[pool.submit(resolve, next_task)] = next_task
+                yield task, future.result()
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Backoff per error class: (wait after the first failure, max wait); the wait
+# doubles with every further failed attempt
+JOB_BACKOFF = {
+    "gone": (30 * DAY, 180 * DAY),
+    "restricted": (7 * DAY, 90 * DAY),
+    "no_thumbnail": (7 * DAY, 90 * DAY),
+    "transient": (HOUR, 2 * DAY),
+}
+RESTRICTED_ERROR = re.compile(
+    r"private|members[- ]only|sign in|log ?in|confirm your age|country|region|"
+    r"geo[- ]?(?:restrict|block)|copyright|premium|\b403\b|非公开|地域|区域|版权|专享",
+    re.IGNORECASE,
+)
+GONE_ERROR = re.compile(
+    r"removed|deleted|does not exist|no longer|not found|\b404\b|\b410\b|"
+    r"video unavailable|已删除|不存在|失效",
+    re.IGNORECASE,
+)
+JOB_PAGE_SIZE = 500
+
+JOBS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS thumbnail_jobs (
+        url TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        error_class TEXT,
+        last_error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_attempt TEXT,
+        next_attempt TEXT
+    )
+"""
+JOB_FIELDS = (
+    "url",
+    "status",
+    "error_class",
+    "last_error",
+    "attempts",
+    "last_attempt",
+    "next_attempt",
+)
+
+
+def classify_error(error):
+    """Error class of a failed lookup (a key of JOB_BACKOFF)"""
+    if isinstance(error, ThumbnailUnavailable):
+        return "gone"
+    message = str(error)
+    if RESTRICTED_ERROR.search(message):
+        return "restricted"
+    if GONE_ERROR.search(message):
+        return "gone"
+    return "transient"
+
+
+def next_attempt_time(now, error_class, attempts):
+    """When a link that has failed `attempts` times in a row may be tried again"""
+    base, cap = JOB_BACKOFF[error_class]
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return now + timedelta(seconds=delay)
+
+
+def format_time(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def ensure_table(conn, name, ddl, temporary=False):
+    """Create table `name`; with temporary (dry run) a TEMP table if it is missing"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    if exists:
+        return
+    if temporary:
+        ddl = ddl.replace("CREATE TABLE", "CREATE TEMP TABLE")
+    with conn:
+        conn.execute(ddl)
+
+
+def shadow_table(conn, name, ddl):
+    """
+    Dry run: a TEMP copy of table `name` (empty if the table does not exist).
+    Unqualified names resolve to the temp schema first, so every later read
+    and write of `name` on this connection uses the copy, never the file.
+    """
+    temp_exists = conn.execute(
+        "SELECT 1 FROM sqlite_temp_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    if temp_exists:
+        return
+    main_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    conn.execute(ddl.replace("CREATE TABLE IF NOT EXISTS", "CREATE TEMP TABLE"))
+    if main_exists:
+        conn.execute(f"INSERT INTO temp.{name} SELECT * FROM main.{name}")
+
+
+def copy_state(conn, source_db):
+    """
+    Copy thumbnail_jobs / thumbnail_checks rows from another database (e.g.
+    before a rebuild); returns {table: rows copied}
+    """
+    tables = {
+        "thumbnail_jobs": (JOBS_SCHEMA, JOB_FIELDS),
+        "thumbnail_checks": (CHECKS_SCHEMA, CHECK_FIELDS),
+    }
+    copied = {}
+    conn.execute("ATTACH DATABASE ? AS previous", (source_db,))
+    try:
+        for table, (ddl, fields) in tables.items():
+            ensure_table(conn, table, ddl)
+            found = conn.execute(
+                "SELECT 1 FROM previous.sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            ).fetchone()
+            if not found:
+                copied[table] = 0
+                continue
+            with conn:
+                cur = conn.execute(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(fields)}) "
+                    f"SELECT {', '.join(fields)} FROM previous.{table}"
+                )
+            copied[table] = cur.rowcount
+        return copied
+    finally:
+        conn.execute("DETACH DATABASE previous")
+
+
+CHECKS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS thumbnail_checks (
+        url TEXT PRIMARY KEY,
+        status INTEGER,
+        etag TEXT,
+        last_modified TEXT,
+        result TEXT NOT NULL,
+        checked_at TEXT
+    )
+"""
+CHECK_FIELDS = ("url", "status", "etag", "last_modified", "result", "checked_at")
+# Results that make update_thumbnails() look the thumbnail up again
+STALE_RESULTS = ("gone", "changed")
+
+
+def make_session(workers):
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0"
+    adapter = HTTPAdapter(pool_maxsize=max(workers, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def check_thumbnail(url, etag, last_modified, session):
+    """
+    Worker: revalidate one stored thumbnail against the previous check's
+    validators. Returns (status, etag, last_modified, result) with result
+    "ok", "changed", "gone" or "error"; validators are kept on 304 / errors.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    elif last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        resp = session.head(url, headers=headers, timeout=10, allow_redirects=True)
+        if resp.status_code in (405, 501):
+            # No HEAD support; stream so that only the headers are read
+            resp = session.get(url, headers=headers, timeout=10, stream=True)
+            resp.close()
+    except requests.RequestException:
+        return None, etag, last_modified, "error"
+
+    status = resp.status_code
+    if status == 304:
+        return status, etag, last_modified, "ok"
+    if status in (404, 410):
+        return status, None, None, "gone"
+    if status != 200:
+        return status, etag, last_modified, "error"
+    new_etag = resp.headers.get("ETag")
+    new_last_modified = resp.headers.get("Last-Modified")
+    if etag and new_etag:
+        changed = new_etag != etag
+    elif last_modified and new_last_modified:
+        changed = new_last_modified != last_modified
+    else:
+        changed = False  # First check, or no validators to compare
+    return status, new_etag, new_last_modified, "changed" if changed else "ok"
+
+
+def revalidate_thumbnails(
+    conn,
+    update_original=True,
+    update_repost=True,
+    workers=32,
+    limit=None,
+    dry_run=False,
+    debug=False,
+):
+    """
+    Check stored thumbnail URLs (least recently checked first) on `workers`
+    threads and record the results in thumbnail_checks. Changed images are
+    also dropped from image_mirror, so image-mirror.py fetches them again.
+    With dry_run the results only go to a TEMP copy of thumbnail_checks
+    (which update_thumbnails() then reads) and nothing is committed.
+    """
+    if dry_run:
+        shadow_table(conn, "thumbnail_checks", CHECKS_SCHEMA)
+    else:
+        ensure_table(conn, "thumbnail_checks", CHECKS_SCHEMA)
+    columns = [
+        f"{kind}_thumbnail"
+        for kind, enabled in (("original", update_original), ("repost", update_repost))
+        if enabled
+    ]
+    stats = {"checked": 0, "ok": 0, "changed": 0, "gone": 0, "error": 0}
+    if not columns:
+        return stats
+    selects = " UNION ".join(
+        f"SELECT {column} AS url FROM videos" for column in columns
+    )
+    query = f"""
+        SELECT t.url, c.etag, c.last_modified
+        FROM ({selects}) t
+        LEFT JOIN thumbnail_checks c ON c.url = t.url
+        WHERE t.url LIKE 'http%'
+        ORDER BY c.checked_at IS NOT NULL, c.checked_at
+    """
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    urls = conn.execute(query).fetchall()
+    print(f"Revalidating {len(urls)} thumbnail URLs")
+    mirrored = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'image_mirror'"
+    ).fetchone()
+
+    session = make_session(workers)
+    start = time.monotonic()
+    try:
+        for (url, etag, last_modified), (status, *validators, result) in iter_resolved(
+            urls, workers, lambda task: check_thumbnail(*task, session)
+        ):
+            stats["checked"] += 1
+            stats[result] += 1
+            if result != "ok" or debug:
+                print(f"  {result:<7} {status or '-'} {url}")
+            checked_at = format_time(datetime.now(timezone.utc))
+            conn.execute(
+                f"INSERT OR REPLACE INTO thumbnail_checks ({', '.join(CHECK_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in CHECK_FIELDS)})",
+                (url, status, *validators, result, checked_at),
+            )
+            if result == "changed" and mirrored and not dry_run:
+                conn.execute("DELETE FROM image_mirror WHERE url = ?", (url,))
+            if stats["checked"] % 1000 == 0:
+                if not dry_run:
+                    conn.commit()
+                print(
+                    f"  {stats['checked']}/{len(urls)} "
+                    f"({time.monotonic() - start:.0f}s)"
+                )
+    finally:
+        if not dry_run:
+            conn.commit()
+    return stats
+
+
+def iter_pages(conn, query, params, page_size=JOB_PAGE_SIZE, limit=None):
+    """
+    Rows of `query` page by page. The query selects id first and priority
+    last, and continues after :last_priority / :last_id with at most
+    :page_size rows, so writes made in between never shift a page. A row
+    whose priority rose past the cursor through those writes is not yielded
+    a second time.
+    """
+    last_priority, last_id = -1, -1
+    remaining = limit
+    seen = set()
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = conn.execute(
+            query,
+            {
+                **params,
+                "last_priority": last_priority,
+                "last_id": last_id,
+                "page_size": size,
+            },
+        ).fetchall()
+        if not rows:
+            return
+        for row in rows:
+            if row[0] not in seen:
+                seen.add(row[0])
+                if remaining is not None:
+                    remaining -= 1
+                yield row
+        last_priority, last_id = rows[-1][-1], rows[-1][0]
+        if len(rows) < size:
+            return
+
+
+class ThumbnailWriter:
+    """
+    Applies thumbnail UPDATEs on the calling thread and commits every
+    commit_every videos (0 = once at the end) instead of once per video.
+    """
+
+    def __init__(self, conn, commit_every=100):
+        self.conn = conn
+        self.commit_every = commit_every
+        self.pending = 0
+        self.commits = 0
+
+    def write(self, video_id, updated_fields, update_params):
+        self.conn.execute(
+            f"UPDATE videos SET {', '.join(updated_fields)} WHERE id = ?",
+            [*update_params, video_id],
+        )
+        # The new thumbnails start with a clean check record (update_params
+        # holds only thumbnail URLs), so a stale mark is not picked up again
+        self.conn.executemany(
+            "DELETE FROM thumbnail_checks WHERE url = ?",
+            [(url,) for url in update_params],
+        )
+        self.pending += 1
+        if self.commit_every and self.pending >= self.commit_every:
+            self.flush()
+
+    def record_job(self, url, now, attempts=0, error_class=None, error=None):
+        """Remember the outcome of looking up `url`; attempts counts earlier failures"""
+        if error_class is None:
+            row = (url, "ok", None, None, 0, format_time(now), None)
+        else:
+            attempts += 1
+            row = (
+                url,
+                "failed",
+                error_class,
+                str(error)[:500] if error is not None else None,
+                attempts,
+                format_time(now),
+                format_time(next_attempt_time(now, error_class, attempts)),
+            )
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO thumbnail_jobs ({', '.join(JOB_FIELDS)}) "
+            f"VALUES ({', '.join('?' for _ in JOB_FIELDS)})",
+            row,
+        )
+        self.conn.execute(
+            "INSERT OR IGNORE INTO temp.run_jobs (url) VALUES (?)", (url,)
+        )
+
+    def flush(self):
+        if self.conn.in_transaction:
+            self.conn.commit()
+            self.commits += 1
+        self.pending = 0
+
+    def finish(self):
+        self.flush()
+
+
+def thumbnail_candidates(url, session):
+    """
+    Thumbnail URLs for a video link without yt-dlp, best first; the last one is
+    always reliable. YouTube needs no request (i.ytimg.com/vi/ID/...), NicoNico
+    one getthumbinfo call, Bilibili one view API call (bilibili_cover).
+    Returns None for platforms without a rule.
+    """
+    m = YOUTUBE_ID_PATTERN.search(url)
+    if m:
+        return [
+            f"{YTIMG_BASE}/vi/{m.group(1)}/maxresdefault.jpg",
+            f"{YTIMG_BASE}/vi/{m.group(1)}/hqdefault.jpg",
+        ]
+    m = NICO_ID_PATTERN.search(url)
+    if m:
+        import xml.etree.ElementTree as ET
+
+        resp = session.get(f"{NICO_THUMBINFO_API_BASE}/{m.group(1)}", timeout=10)
+        resp.raise_for_status()
+        root = ET.fromstring(resp.content)
+        thumbnail = root.findtext("thumb/thumbnail_url")
+        if root.get("status") != "ok" or not thumbnail:
+            return None  # Deleted / private; let yt-dlp report why
+        return [f"{thumbnail}.L", f"{thumbnail}.M", thumbnail]
+    m = BILIBILI_ID_PATTERN.search(url)
+    if m:
+        return [bilibili_cover(m.group(1) or f"av{m.group(2)}", session)]
+    return None
+
+
+def bilibili_cover(video_id, session):
+    """
+    Cover of a BV / av id from the web-interface view API, always https.
+    Raises ThumbnailUnavailable (with the id and reason) for deleted, hidden
+    or missing videos.
+    """
+    if video_id.lower().startswith("av"):
+        params = {"aid": video_id[2:]}
+    else:
+        params = {"bvid": video_id}
+    resp = session.get(
+        f"{BILIBILI_API_BASE}/x/web-interface/view", params=params, timeout=10
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    code = data.get("code", -1)
+    if code in BILIBILI_GONE_CODES:
+        raise ThumbnailUnavailable(
+            f"{video_id}: {BILIBILI_GONE_CODES[code]} (code {code})"
+        )
+    pic = (data.get("data") or {}).get("pic") if code == 0 else None
+    if not pic:
+        raise ValueError(f"{video_id}: code={code} {data.get('message', '')}")
+    return re.sub(r"^(?:https?:)?//", "https://", pic)
+
+
+def derive_thumbnail(url, session, probe=False):
+    """
+    Thumbnail from the URL rules in thumbnail_candidates(), or None when there
+    is no rule. With probe, the first candidate answering a HEAD with 200 wins.
+    """
+    candidates = thumbnail_candidates(url, session)
+    if not candidates:
+        return None
+    if probe:
+        for candidate in candidates[:-1]:
+            try:
+                resp = session.head(candidate, timeout=10, allow_redirects=True)
+                if resp.status_code == 200:
+                    return candidate
+            except requests.RequestException:
+                pass
+    return candidates[-1]
+
+
 def update_thumbnails(
     conn,
     debug=False,
@@ -166,33 +792,110 @@ def update_thumbnails(
     force=False,
     browser_cookies=None,
     cookies_file=None,
+    workers=4,
+    rate_limits=None,
+    commit_every=100,
+    derive=True,
+    probe=False,
+    ignore_backoff=False,
 ):
-    """Update video thumbnails"""
+    """
+    Update video thumbnails. Thumbnails are resolved by `workers` threads
+    under per-platform rate limits; UPDATEs are written by this thread in
+    batches of commit_every videos. With derive, YouTube / NicoNico / Bilibili
+    thumbnails come from the URL or a lightweight API (derive_thumbnail) and
+    yt-dlp is only used for the other platforms and as a fallback.
+    Links whose thumbnail_jobs row is in backoff are skipped unless
+    ignore_backoff; every lookup outcome is recorded there.
+    """
     cursor = conn.cursor()
+    limiters = {
+        platform: RateLimiter(rate)
+        for platform, rate in {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}.items()
+    }
+    session = make_session(workers) if derive else None
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    ensure_table(conn, "thumbnail_jobs", JOBS_SCHEMA, temporary=dry_run)
+    ensure_table(conn, "thumbnail_checks", CHECKS_SCHEMA, temporary=dry_run)
+    # Links looked up in this run (filled by ThumbnailWriter.record_job)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS run_jobs (url TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.run_jobs")
+
+    # Per kind: the link needs a lookup, and its job (if any) is due
+    kinds = []
+    if update_original:
+        kinds.append(("original", "oj", "oc"))
+    if update_repost:
+        kinds.append(("repost", "rj", "rc"))
+    if not kinds:
+        print("❌ No thumbnail type specified for update")
+        return {"processed": 0, "updated": 0, "errors": 0, "commits": 0}
 
-    # Build query conditions
     conditions = []
-    if update_original and not force:
-        conditions.append(
-            "(original_url IS NOT NULL AND original_url != '' AND original_url != '未转载' AND (original_thumbnail IS NULL OR original_thumbnail = ''))"
-        )
-    elif update_original and force:
-        conditions.append(
-            "(original_url IS NOT NULL AND original_url != '' AND original_url != '未转载')"
+    priorities = []
+    stale = ", ".join(f"'{result}'" for result in STALE_RESULTS)
+    for kind, job, check in kinds:
+        condition = f"v.{kind}_url IS NOT NULL AND v.{kind}_url != '' AND v.{kind}_url != '未转载'"
+        if not force:
+            condition += (
+                f" AND (v.{kind}_thumbnail IS NULL OR v.{kind}_thumbnail = ''"
+                f" OR {check}.result IN ({stale}))"
+            )
+        if not ignore_backoff:
+            condition += (
+                f" AND ({job}.next_attempt IS NULL OR {job}.next_attempt <= :now)"
+            )
+        # A link looked up in this run does not qualify again: its attempts,
+        # and with them the priority, have changed under the keyset cursor
+        condition += f" AND v.{kind}_url NOT IN (SELECT url FROM temp.run_jobs)"
+        conditions.append(f"({condition})")
+        # Links that never failed first, then the ones with the fewest failures
+        priorities.append(
+            f"CASE WHEN {condition} THEN COALESCE({job}.attempts, 0) ELSE 1000000 END"
         )
+    priority = (
+        priorities[0] if len(priorities) == 1 else f"MIN({', '.join(priorities)})"
+    )
+    where_clause = " OR ".join(conditions)
 
-    if update_repost and not force:
-        conditions.append(
-            "(repost_url IS NOT NULL AND repost_url != '' AND repost_url != '未转载' AND (repost_thumbnail IS NULL OR repost_thumbnail = ''))"
-        )
-    elif update_repost and force:
-        conditions.append(
-            "(repost_url IS NOT NULL AND repost_url != '' AND repost_url != '未转载')"
+    base_query = f"""
+        FROM videos v
+        LEFT JOIN thumbnail_jobs oj ON oj.url = v.original_url
+        LEFT JOIN thumbnail_jobs rj ON rj.url = v.repost_url
+        LEFT JOIN thumbnail_checks oc ON oc.url = v.original_thumbnail
+        LEFT JOIN thumbnail_checks rc ON rc.url = v.repost_thumbnail
+        WHERE {where_clause}
+    """
+    query = f"""
+        SELECT * FROM (
+            SELECT v.id, v.original_url, v.original_thumbnail,
+                   v.repost_url, v.repost_thumbnail, v.comment,
+                   oj.attempts, oj.error_class, oj.next_attempt,
+                   rj.attempts, rj.error_class, rj.next_attempt,
+                   oc.result, rc.result,
+                   {priority} AS priority
+            {base_query}
         )
-
-    if not conditions:
-        print("❌ No thumbnail type specified for update")
-        return {"processed": 0, "updated": 0, "errors": 0}
+        WHERE (priority, id) > (:last_priority, :last_id)
+        ORDER BY priority, id
+        LIMIT :page_size
+    """
+    params = {"now": format_time(now)}
+    total = cursor.execute(f"SELECT COUNT(*) {base_query}", params).fetchone()[0]
+    if limit:
+        total = min(total, limit)
+    print(f"Found {total} videos to process")
+    if not ignore_backoff:
+        backed_off = cursor.execute(
+            "SELECT COUNT(*) FROM thumbnail_jobs WHERE next_attempt > ?",
+            (params["now"],),
+        ).fetchone()[0]
+        if backed_off:
+            print(
+                f"⏳ {backed_off} links in backoff after failed attempts "
+                f"(--ignore-backoff to retry them now)"
+            )
 
     delete_keywords = [
         "已删除",
@@ -213,120 +916,122 @@ def update_thumbnails(
         "无补档",
     ]
 
-    where_clause = " OR ".join(conditions)
-    query = f"SELECT id, original_url, original_thumbnail, repost_url, repost_thumbnail, comment FROM videos WHERE {where_clause}"
-
-    if limit:
-        query += f" LIMIT {limit}"
-
-    cursor.execute(query)
-    videos = cursor.fetchall()
-
-    print(f"Found {len(videos)} videos to process")
-
     stats = {
         "processed": 0,
         "updated": 0,
         "errors": 0,
         "original_updated": 0,
         "repost_updated": 0,
+        "derived": 0,
+        "extracted": 0,
+        "backed_off": 0,
     }
 
-    for video in videos:
-        (
-            video_id,
-            original_url,
-            original_thumbnail,
-            repost_url,
-            repost_thumbnail,
-            comment,
-        ) = video
-        stats["processed"] += 1
+    labels = {"original": "Original video", "repost": "Repost video"}
 
+    def plan(video):
+        """(video_id, steps): what to fetch, everything else is decided up front"""
+        video_id, original_url, original_thumbnail, repost_url, repost_thumbnail = (
+            video[:5]
+        )
+        comment = video[5]
+        jobs = {"original": video[6:9], "repost": video[9:12]}
+        checks = {"original": video[12], "repost": video[13]}
         skip_original = comment and any(kw in comment for kw in delete_keywords)
-
-        print(f"\nProcessing video ID {video_id} ({stats['processed']}/{len(videos)})")
-
-        updated_fields = []
-        update_params = []
-
-        # Process original video thumbnail
-        if update_original and original_url and original_url != "未转载":
-            should_update_original = force or not original_thumbnail
-
-            if should_update_original:
-                if skip_original:
-                    print(
-                        f"  ⏭️  Original video skipped: comment contains delete keyword"
+        steps = []
+        for kind, url, thumbnail in (
+            ("original", original_url, original_thumbnail),
+            ("repost", repost_url, repost_thumbnail),
+        ):
+            if kind == "original" and not update_original:
+                continue
+            if kind == "repost" and not update_repost:
+                continue
+            if not url or url == "未转载":
+                continue
+            attempts, error_class, next_attempt = jobs[kind]
+            if thumbnail and not force and checks[kind] not in STALE_RESULTS:
+                steps.append(
+                    ("skip", f"{labels[kind]} already has thumbnail, skipping")
+                )
+            elif kind == "original" and skip_original:
+                steps.append(
+                    ("skip", "Original video skipped: comment contains delete keyword")
+                )
+            elif not ignore_backoff and next_attempt and next_attempt > params["now"]:
+                steps.append(
+                    (
+                        "skip",
+                        f"{labels[kind]} skipped: {error_class}, {attempts} failed "
+                        f"attempt(s), next try after {next_attempt}",
                     )
-                else:
-                    try:
-                        print(f"  Getting original video thumbnail: {original_url}")
-                        new_thumbnail = get_video_thumbnail(
-                            original_url, debug, browser_cookies, cookies_file
-                        )
-
-                        if new_thumbnail:
-                            if not dry_run:
-                                updated_fields.append("original_thumbnail = ?")
-                                update_params.append(new_thumbnail)
-                                stats["original_updated"] += 1
-
-                            print(f"  ✅ Original video thumbnail: {new_thumbnail}")
-                        else:
-                            print(f"  ⚠️  Original video thumbnail not obtained")
-
-                    except Exception as e:
-                        print(f"  ❌ Original video thumbnail failed: {e}")
-                        stats["errors"] += 1
+                )
             else:
-                print(f"  ⏭️  Original video already has thumbnail, skipping")
+                gone = thumbnail if checks[kind] == "gone" else None
+                steps.append(("fetch", kind, url, attempts or 0, gone))
+        return video_id, steps
 
-        # Process repost video thumbnail
-        if update_repost and repost_url and repost_url != "未转载":
-            should_update_repost = force or not repost_thumbnail
+    pages = iter_pages(conn, query, params, limit=limit)
+    plans = (plan(video) for video in pages)
 
-            if should_update_repost:
-                try:
-                    print(f"  Getting repost video thumbnail: {repost_url}")
-                    new_thumbnail = get_video_thumbnail(
-                        repost_url, debug, browser_cookies, cookies_file
-                    )
-
-                    if new_thumbnail:
-                        if not dry_run:
-                            updated_fields.append("repost_thumbnail = ?")
-                            update_params.append(new_thumbnail)
-                            stats["repost_updated"] += 1
+    def resolve(plan):
+        return resolve_video_thumbnails(
+            plan[1], limiters, debug, browser_cookies, cookies_file, session, probe
+        )
 
-                        print(f"  ✅ Repost video thumbnail: {new_thumbnail}")
+    writer = ThumbnailWriter(conn, commit_every)
+    try:
+        # Results arrive in completion order; all writes happen on this thread
+        for (video_id, steps), results in iter_resolved(plans, workers, resolve):
+            stats["processed"] += 1
+            print(f"\nProcessing video ID {video_id} ({stats['processed']}/{total})")
+
+            updated_fields = []
+            update_params = []
+            for step in steps:
+                if step[0] == "skip":
+                    print(f"  ⏭️  {step[1]}")
+                    continue
+                kind, url, attempts = step[1], step[2], step[3]
+                label = labels[kind]
+                new_thumbnail, error, source = results[kind]
+                stats["derived" if source == "derived" else "extracted"] += 1
+                print(f"  Getting {label.lower()} thumbnail: {url}")
+                if not dry_run:
+                    if error is not None:
+                        error_class = classify_error(error)
                     else:
-                        print(f"  ⚠️  Repost video thumbnail not obtained")
+                        error_class = None if new_thumbnail else "no_thumbnail"
+                    writer.record_job(url, now, attempts, error_class, error)
+                    stats["backed_off"] += error_class is not None
+                if error is not None:
+                    print(f"  ❌ {label} thumbnail failed: {error}")
+                    stats["errors"] += 1
+                elif new_thumbnail:
+                    if not dry_run:
+                        updated_fields.append(f"{kind}_thumbnail = ?")
+                        update_params.append(new_thumbnail)
+                        stats[f"{kind}_updated"] += 1
+                    print(f"  ✅ {label} thumbnail: {new_thumbnail}")
+                else:
+                    print(f"  ⚠️  {label} thumbnail not obtained")
 
+            # Update database
+            if updated_fields and not dry_run:
+                try:
+                    writer.write(video_id, updated_fields, update_params)
+                    stats["updated"] += 1
+                    print(f"  💾 Database updated")
                 except Exception as e:
-                    print(f"  ❌ Repost video thumbnail failed: {e}")
+                    print(f"  ❌ Database update failed: {e}")
                     stats["errors"] += 1
-            else:
-                print(f"  ⏭️  Repost video already has thumbnail, skipping")
-
-        # Update database
-        if updated_fields and not dry_run:
-            try:
-                update_params.append(video_id)
-                update_query = (
-                    f"UPDATE videos SET {', '.join(updated_fields)} WHERE id = ?"
-                )
-                cursor.execute(update_query, update_params)
-                conn.commit()
+            elif updated_fields and dry_run:
+                print(f"  [DRY RUN] Will update: {', '.join(updated_fields)}")
                 stats["updated"] += 1
-                print(f"  💾 Database updated")
-            except Exception as e:
-                print(f"  ❌ Database update failed: {e}")
-                stats["errors"] += 1
-        elif updated_fields and dry_run:
-            print(f"  [DRY RUN] Will update: {', '.join(updated_fields)}")
-            stats["updated"] += 1
+    finally:
+        writer.finish()
 
+    stats["commits"] = writer.commits
     return stats
 
 
@@ -551,6 +1256,57 @@ def main():
         type=str,
         help="Netscape formatted file to read cookies from and dump cookie jar in",
     )
+    parser.add_argument(
+        "--no-derive",
+        dest="derive",
+        action="store_false",
+        help="Use yt-dlp for every URL instead of deriving YouTube (i.ytimg.com), NicoNico (getthumbinfo) and Bilibili (view API) thumbnails from the link",
+    )
+    parser.add_argument(
+        "--probe-quality",
+        action="store_true",
+        help="HEAD-check the larger derived thumbnails (YouTube maxresdefault, NicoNico .L/.M) and fall back to the always-present size",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads resolving thumbnails concurrently (default: 4, 0 = one at a time)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="PLATFORM=RPS",
+        help="Max thumbnail requests per second for a platform (youtube, niconico, twitter, bilibili, other), e.g. --rate-limit bilibili=2. Repeatable",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=100,
+        help="Commit after this many updated videos (default: 100, 0 = once at the end)",
+    )
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Check the stored thumbnail URLs (HEAD / conditional GET) first and re-extract the ones that are gone or changed",
+    )
+    parser.add_argument(
+        "--revalidate-workers",
+        type=int,
+        default=32,
+        help="Concurrent thumbnail checks for --revalidate (default: 32)",
+    )
+    parser.add_argument(
+        "--ignore-backoff",
+        action="store_true",
+        help="Also retry links that are waiting in thumbnail_jobs after failed attempts",
+    )
+    parser.add_argument(
+        "--copy-state-from",
+        metavar="OLD_DB",
+        help="Copy thumbnail_jobs / thumbnail_checks from another database and exit (used by get-db.sh)",
+    )
     parser.add_argument(
         "--fix-http-links",
         action="store_true",
@@ -559,6 +1315,15 @@ def main():
 
     args = parser.parse_args()
 
+    rate_limits = {}
+    for spec in args.rate_limit:
+        platform, _, rate = spec.partition("=")
+        try:
+            rate_limits[platform.strip()] = float(rate)
+        except ValueError:
+            print(f"Error: invalid --rate-limit '{spec}', expected PLATFORM=RPS")
+            sys.exit(1)
+
     # Check if database file exists
     if not os.path.exists(args.db_path):
         print(f"Error: Database file does not exist: {args.db_path}")
@@ -571,6 +1336,15 @@ def main():
         sys.exit(1)
 
     try:
+        if args.copy_state_from:
+            if not os.path.exists(args.copy_state_from):
+                print(f"Error: Database file does not exist: {args.copy_state_from}")
+                sys.exit(1)
+            copied = copy_state(conn, args.copy_state_from)
+            for table, rows in copied.items():
+                print(f"✅ Copied {rows} {table} rows from {args.copy_state_from}")
+            return
+
         print(f"Starting thumbnail update")
         print(f"Database: {args.db_path}")
 
@@ -584,6 +1358,10 @@ def main():
             print(f"*** Using cookies from file: {args.cookies} ***")
         if args.limit:
             print(f"*** Limiting to {args.limit} records ***")
+        if args.workers > 0:
+            print(f"*** Resolving with {args.workers} workers ***")
+        if args.ignore_backoff:
+            print("*** Ignoring backoff - Will retry links that failed before ***")
 
         update_types = []
         if args.update_original:
@@ -601,6 +1379,28 @@ def main():
             print(f"Records fixed: {fix_stats['updated']}")
             print()
 
+        if args.revalidate:
+            print("\n🔍 Revalidating stored thumbnails...")
+            start = time.monotonic()
+            check_stats = revalidate_thumbnails(
+                conn,
+                update_original=args.update_original,
+                update_repost=args.update_repost,
+                workers=args.revalidate_workers,
+                limit=args.limit,
+                dry_run=args.dry_run,
+                debug=args.debug,
+            )
+            print(
+                f"\n=== 🔍 Revalidation complete ({time.monotonic() - start:.1f}s) ==="
+            )
+            print(f"Thumbnails checked: {check_stats['checked']}")
+            print(f"Unchanged: {check_stats['ok']}")
+            print(f"Changed: {check_stats['changed']}")
+            print(f"Gone: {check_stats['gone']}")
+            print(f"Check errors (not acted on): {check_stats['error']}")
+            print()
+
         # Update thumbnails
         stats = update_thumbnails(
             conn,
@@ -612,6 +1412,12 @@ def main():
             force=args.force,
             browser_cookies=args.cookies_from_browser,
             cookies_file=args.cookies,
+            workers=args.workers,
+            rate_limits=rate_limits,
+            commit_every=args.commit_every,
+            derive=args.derive,
+            probe=args.probe_quality,
+            ignore_backoff=args.ignore_backoff,
         )
 
         # Print statistics
@@ -621,6 +1427,16 @@ def main():
         print(f"Original video thumbnails updated: {stats['original_updated']}")
         print(f"Repost video thumbnails updated: {stats['repost_updated']}")
         print(f"Errors: {stats['errors']}")
+        if stats.get("backed_off"):
+            print(f"Links put in backoff: {stats['backed_off']}")
+        looked_up = stats.get("derived", 0) + stats.get("extracted", 0)
+        if looked_up:
+            print(
+                f"Derived without yt-dlp: {stats['derived']} of {looked_up} thumbnails "
+                f"({stats['derived'] / looked_up:.0%})"
+            )
+        if not args.dry_run:
+            print(f"Commits: {stats['commits']}")
 
     finally:
         conn.close()
@@ -66,15 +66,24 @@ def get_current_stats(conn):
     """Get current database statistics (same query as /api/stats endpoint)"""
     cursor = conn.cursor()
     cursor.execute(
-        """
-        SELECT 
-            COUNT(DISTINCT a.id) as totalAuthors,
-            COUNT(v.id) as totalVideos,
-            COUNT(CASE WHEN v.translation_status IN (1, 2) THEN 1 END) as translatedVideos
-        FROM authors a
-        LEFT JOIN videos v ON a.id = v.author
-    """
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'global_stats'"
     )
+    if cursor.fetchone():
+        # Kept current by triggers, see author-stats.py
+        cursor.execute(
+            "SELECT total_authors, total_videos, translated_videos FROM global_stats WHERE id = 1"
+        )
+    else:
+        cursor.execute(
+            """
+            SELECT 
+                COUNT(DISTINCT a.id) as totalAuthors,
+                COUNT(v.id) as totalVideos,
+                COUNT(CASE WHEN v.translation_status IN (1, 2) THEN 1 END) as translatedVideos
+            FROM authors a
+            LEFT JOIN videos v ON a.id = v.author
+        """
+        )
 
     result = cursor.fetchone()
     if result: